@@ -0,0 +1,153 @@
+"""
+pytest-benchmark suite for CSVLegislativeDataService at several dataset scales.
+
+Times loading, the listing aggregates, the detail lookups, rendering the
+bills table and the exports, against generated datasets (see generate.py).
+The file is not collected by a plain `pytest` run; name it to run it:
+
+    pytest benchmarks/bench_service.py --bench-scales=small,medium,large \\
+        --bench-data=/tmp/quorum-datasets --benchmark-autosave
+
+--benchmark-autosave keeps each run's results under .benchmarks/, and a later
+run compares against the last one saved, failing on a regression:
+
+    pytest benchmarks/bench_service.py --benchmark-compare \\
+        --benchmark-compare-fail=median:15%
+"""
+
+import pytest
+
+from legislative.services.base import TableQuery
+from legislative.services.columnar import read_snapshot
+from legislative.services.csv_service import CSVLegislativeDataService
+from legislative.services.export import EXPORT_FORMATS
+from legislative.services.snapshot import DatasetSnapshot, read_csv_tables
+
+from .render_table import SPONSOR_LINK, TITLE_LINK
+
+# Rounds of the benchmarks that take seconds at the larger scales
+SLOW_ROUNDS = 3
+
+BILL_LINKS = [
+    {**SPONSOR_LINK, "link_when": lambda rows: rows["sponsor"] != "Unknown Sponsor"},
+    TITLE_LINK,
+]
+
+EXPORTS = {
+    "bills": "iter_bills_export",
+    "vote_positions": "iter_vote_positions_export",
+    "vote_matrix": "iter_vote_matrix_export",
+}
+
+
+@pytest.fixture(scope="session")
+def service(dataset_folder):
+    """Service over the dataset, loaded from its snapshot and warmed"""
+    service = CSVLegislativeDataService(data_folder=dataset_folder)
+    service.warm(service.snapshot)
+    return service
+
+
+@pytest.fixture(scope="session")
+def tables(dataset_folder):
+    return read_snapshot(dataset_folder)
+
+
+@pytest.fixture(autouse=True)
+def dataset_info(benchmark, scale, service):
+    benchmark.extra_info.update(
+        scale=scale,
+        legislators=len(service.legislators),
+        bills=len(service.bills),
+        roll_calls=len(service.votes),
+        vote_results=len(service.vote_results),
+    )
+
+
+def fresh_snapshot(service, tables):
+    """A snapshot of tables with no index, tallies or listings derived yet"""
+    return (DatasetSnapshot(tables, service.snapshot.signature),), {}
+
+
+@pytest.mark.benchmark(group="load")
+def test_load_csv(benchmark, service, dataset_folder):
+    """Parsing the CSVs and computing the listing aggregates, as without a snapshot"""
+
+    def load():
+        snapshot = DatasetSnapshot(
+            read_csv_tables(dataset_folder), service.snapshot.signature
+        )
+        service.warm(snapshot)
+
+    benchmark.pedantic(load, rounds=SLOW_ROUNDS)
+
+
+@pytest.mark.benchmark(group="load")
+def test_load_snapshot(benchmark, service):
+    """Reading the binary snapshot with its groupings and tallies, then warming"""
+    benchmark.pedantic(
+        lambda: service.warm(service.datasets.load()), rounds=SLOW_ROUNDS
+    )
+
+
+@pytest.mark.benchmark(group="aggregates")
+@pytest.mark.parametrize(
+    "method", ["get_complete_bills_data", "get_complete_legislators_data"]
+)
+def test_complete_data(benchmark, service, tables, method):
+    """A listing computed from the tables alone, index and tallies included"""
+
+    def compute(snapshot):
+        with service.pinned(snapshot):
+            return getattr(service, method)()
+
+    benchmark.pedantic(
+        compute, setup=lambda: fresh_snapshot(service, tables), rounds=SLOW_ROUNDS
+    )
+
+
+@pytest.mark.benchmark(group="details")
+def test_get_bill_by_id(benchmark, service):
+    """Details of the bill with the most votes"""
+    bills = service.get_complete_bills_frame()
+    bill_id = int(bills["id"].iloc[bills["total_votes"].argmax()])
+    assert benchmark(service.get_bill_by_id, bill_id) is not None
+
+
+@pytest.mark.benchmark(group="details")
+def test_get_legislator_by_id(benchmark, service):
+    """Details of the legislator with the most votes"""
+    legislators = service.get_complete_legislators_frame()
+    legislator_id = int(legislators["id"].iloc[legislators["total_votes"].argmax()])
+    assert benchmark(service.get_legislator_by_id, legislator_id) is not None
+
+
+@pytest.mark.benchmark(group="render")
+@pytest.mark.parametrize("page_size", [50, None], ids=["page", "all"])
+def test_render_bills_table(benchmark, service, page_size):
+    """The bills listing table, one page of it or all of it"""
+    rows = service.query_bills(TableQuery(page_size=page_size)).rows
+    benchmark(service.render_table, rows, BILL_LINKS)
+
+
+@pytest.mark.benchmark(group="export")
+@pytest.mark.parametrize(
+    "export, format_name",
+    [
+        ("bills", "csv"),
+        ("vote_positions", "csv"),
+        ("vote_positions", "parquet"),
+        ("vote_matrix", "csv"),
+    ],
+)
+def test_export(benchmark, service, export, format_name):
+    """A whole download serialized, chunk by chunk"""
+    export_format = EXPORT_FORMATS[format_name]
+    if not export_format.available:
+        pytest.skip(f"{format_name} needs pyarrow")
+
+    def serialize():
+        chunks = getattr(service, EXPORTS[export])()
+        return sum(len(part) for part in export_format.serialize(chunks))
+
+    benchmark.extra_info["bytes"] = benchmark.pedantic(serialize, rounds=SLOW_ROUNDS)
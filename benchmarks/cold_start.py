@@ -0,0 +1,36 @@
+"""
+Cold-start load time of the four tables: CSV parsing versus the columnar binary snapshot.
+
+    python -m benchmarks.cold_start
+"""
+
+import tempfile
+
+from .common import make_dataset, setup_django, timed, write_dataset
+
+N_LEGISLATORS = 435
+BILL_COUNTS = [100, 1000, 5000]
+
+
+def main():
+    setup_django()
+    from legislative.services.columnar import read_snapshot, write_snapshot
+    from legislative.services.snapshot import read_csv_tables
+
+    print(f"{'results':>10} {'csv':>12} {'snapshot':>12} {'speedup':>8}")
+    for bills in BILL_COUNTS:
+        with tempfile.TemporaryDirectory() as folder:
+            write_dataset(folder, *make_dataset(N_LEGISLATORS, [bills]))
+            write_snapshot(read_csv_tables(folder), folder)
+
+            csv_ms = timed(read_csv_tables, folder, repeat=3)
+            snapshot_ms = timed(read_snapshot, folder, repeat=3)
+
+            print(
+                f"{bills * N_LEGISLATORS:>10} {csv_ms:>10.1f}ms "
+                f"{snapshot_ms:>10.1f}ms {csv_ms / snapshot_ms:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Shared helpers for the standalone benchmark scripts in this folder"""
+
+import os
+import time
+
+import django
+import numpy as np
+import pandas as pd
+
+
+def setup_django():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "quorum.settings")
+    django.setup()
+
+
+def timed(fn, *args, repeat=5, **kwargs):
+    """Best-of-`repeat` wall time of fn(*args, **kwargs) in milliseconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def write_dataset(folder, legislators, bills, votes, vote_results):
+    """Write the four tables as CSVs in the layout CSVLegislativeDataService reads"""
+    os.makedirs(folder, exist_ok=True)
+    for name, frame in (
+        ("legislators", legislators),
+        ("bills", bills),
+        ("votes", votes),
+        ("vote_results", vote_results),
+    ):
+        frame.to_csv(os.path.join(folder, f"{name}.csv"), index=False)
+
+
+def make_dataset(n_legislators, bills_per_sponsor, seed=0):
+    """
+    Build a dataset where legislator i sponsors bills_per_sponsor[i] bills,
+    each bill has one roll call and every legislator votes on every roll call.
+    """
+    rng = np.random.default_rng(seed)
+
+    legislator_ids = np.arange(1, n_legislators + 1)
+    legislators = pd.DataFrame(
+        {"id": legislator_ids, "name": [f"Rep. Synthetic {i}" for i in legislator_ids]}
+    )
+
+    sponsor_ids = np.repeat(legislator_ids[: len(bills_per_sponsor)], bills_per_sponsor)
+    bill_ids = np.arange(1, len(sponsor_ids) + 1)
+    bills = pd.DataFrame(
+        {
+            "id": bill_ids,
+            "title": [f"H.R. {i}: Synthetic Act" for i in bill_ids],
+            "sponsor_id": sponsor_ids,
+        }
+    )
+
+    votes = pd.DataFrame({"id": bill_ids, "bill_id": bill_ids})
+
+    vote_results = pd.DataFrame(
+        {
+            "id": np.arange(1, len(bill_ids) * n_legislators + 1),
+            "legislator_id": np.tile(legislator_ids, len(bill_ids)),
+            "vote_id": np.repeat(bill_ids, n_legislators),
+            "vote_type": rng.integers(1, 3, size=len(bill_ids) * n_legislators),
+        }
+    )
+
+    return legislators, bills, votes, vote_results
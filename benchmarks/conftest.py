@@ -0,0 +1,42 @@
+"""
+Options and datasets for the pytest-benchmark suite in bench_service.py.
+
+Every benchmark runs once per scale given with --bench-scales, against a
+dataset from benchmarks.generate. Datasets are written under --bench-data
+(a temporary folder by default) and reused when already there, so the
+larger scales are generated only once.
+"""
+
+import pytest
+
+from .generate import SCALES, ensure_dataset
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("legislative benchmarks")
+    group.addoption(
+        "--bench-scales",
+        default="small,medium",
+        help=f"Comma separated dataset scales to benchmark, of: {', '.join(SCALES)}",
+    )
+    group.addoption(
+        "--bench-data",
+        default=None,
+        help="Folder keeping the generated datasets between runs",
+    )
+
+
+def pytest_generate_tests(metafunc):
+    if "scale" in metafunc.fixturenames:
+        scales = metafunc.config.getoption("--bench-scales").split(",")
+        unknown = [scale for scale in scales if scale not in SCALES]
+        if unknown:
+            raise pytest.UsageError(f"Unknown scales {unknown}, use any of {list(SCALES)}")
+        metafunc.parametrize("scale", scales, scope="session")
+
+
+@pytest.fixture(scope="session")
+def dataset_folder(scale, request, tmp_path_factory):
+    """CSVs and binary snapshot of the scale's dataset"""
+    root = request.config.getoption("--bench-data") or tmp_path_factory.mktemp("data")
+    return ensure_dataset(root, scale)
@@ -0,0 +1,86 @@
+"""
+Size and serialization time of the bills export in each download format.
+
+Streams a synthetic bills export through every serializer the download
+endpoints offer, and times reading the result back into a typed DataFrame.
+
+    python -m benchmarks.export_formats
+"""
+
+import gzip
+import io
+import time
+
+import pandas as pd
+
+from .common import setup_django
+from .render_table import bills_rows
+
+ROW_COUNTS = [100_000, 1_000_000]
+CHUNK_ROWS = 10_000
+
+
+def chunks(frame):
+    for start in range(0, len(frame), CHUNK_ROWS):
+        yield frame.iloc[start: start + CHUNK_ROWS]
+
+
+def read_back(name, content):
+    if name == "csv":
+        return pd.read_csv(io.BytesIO(content))
+    if name == "ndjson":
+        return pd.read_json(io.BytesIO(content), lines=True)
+    if name == "parquet":
+        import pyarrow.parquet as pq
+
+        return pq.read_table(io.BytesIO(content)).to_pandas()
+
+    import pyarrow as pa
+
+    return pa.ipc.open_stream(content).read_all().to_pandas()
+
+
+def main():
+    setup_django()
+    from legislative.services.export import EXPORT_FORMATS
+
+    print(
+        f"{'rows':>9} {'format':>8} {'size':>9} {'gzipped':>9} "
+        f"{'serialize':>10} {'read back':>10}"
+    )
+    for n_rows in ROW_COUNTS:
+        # The dtypes the CSV service's listing frames have
+        frame = pd.DataFrame(bills_rows(n_rows)).astype(
+            {
+                "id": "int32",
+                "sponsor_id": "int32",
+                "title": "category",
+                "sponsor": "category",
+            }
+        )
+        for name, export_format in EXPORT_FORMATS.items():
+            if not export_format.available:
+                print(f"{n_rows:>9} {name:>8} {'needs pyarrow':>9}")
+                continue
+
+            start = time.perf_counter()
+            content = b"".join(export_format.serialize(chunks(frame)))
+            serialize_ms = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            read_back(name, content)
+            read_ms = (time.perf_counter() - start) * 1000
+
+            gzipped = (
+                f"{len(gzip.compress(content, 6)) / 1e6:>7.1f}MB"
+                if export_format.compressible
+                else f"{'-':>9}"
+            )
+            print(
+                f"{n_rows:>9} {name:>8} {len(content) / 1e6:>7.1f}MB {gzipped} "
+                f"{serialize_ms:>8.0f}ms {read_ms:>8.0f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""
+Deterministic synthetic datasets in the layout of data/*.csv, up to ~100M vote results.
+
+The same spec and seed always produce the same files. Bills get a geometric
+number of roll calls (most have one, a few have many) spread out in time,
+legislators vote along party lines with some absences, and a share of bill
+sponsors and vote results refer to legislators missing from legislators.csv,
+as in the real data. vote_results is generated and written a chunk of roll
+calls at a time, so memory stays flat whatever the scale.
+
+    python -m benchmarks.generate /tmp/quorum-medium --scale medium --snapshot
+"""
+
+import argparse
+import dataclasses
+import os
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+FIRST_NAMES = [
+    "Alex", "Barbara", "Carlos", "Diana", "Ed", "Fatima", "Greg", "Hannah",
+    "Ilhan", "James", "Karen", "Luis", "Maria", "Nancy", "Omar", "Pat",
+    "Raja", "Susan", "Tom", "Veronica", "Will", "Yvette", "Zoe",
+]
+LAST_NAMES = [
+    "Adams", "Baker", "Castro", "Davis", "Evans", "Foster", "Garcia", "Harris",
+    "Ito", "Johnson", "Kim", "Lopez", "Miller", "Nguyen", "Owens", "Patel",
+    "Quinn", "Rogers", "Smith", "Turner", "Underwood", "Vargas", "Walker",
+    "Young",
+]
+STATES = [
+    "AK", "AL", "AR", "AZ", "CA", "CO", "CT", "DE", "FL", "GA", "HI", "IA",
+    "ID", "IL", "IN", "KS", "KY", "LA", "MA", "MD", "ME", "MI", "MN", "MO",
+    "MS", "MT", "NC", "ND", "NE", "NH", "NJ", "NM", "NV", "NY", "OH", "OK",
+    "OR", "PA", "RI", "SC", "SD", "TN", "TX", "UT", "VA", "VT", "WA", "WI",
+    "WV", "WY",
+]
+SUBJECTS = [
+    "Infrastructure", "Health Care", "Education", "Energy", "Veterans",
+    "Agriculture", "Housing", "Broadband", "Water", "Border Security",
+    "Small Business", "Tax Relief", "Climate", "Postal Service", "Defense",
+]
+KINDS = ["Act", "Reform Act", "Investment Act", "Protection Act", "Modernization Act"]
+
+PARTIES = np.array(["D", "R", "I"])
+PARTY_SHARES = [0.5, 0.48, 0.02]
+# Probability of a yea by party (D, R, I) for partisan and bipartisan roll calls
+YEA_PROBABILITIES = np.array(
+    [
+        [0.96, 0.06, 0.5],
+        [0.05, 0.95, 0.5],
+        [0.88, 0.82, 0.85],
+    ]
+)
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    legislators: int = 435
+    bills: int = 1_000
+    # Mean number of roll calls per bill
+    roll_calls_per_bill: float = 1.5
+    # Share of legislators voting in each roll call
+    turnout: float = 0.95
+    # Share of bills sponsored by a legislator missing from legislators.csv
+    missing_sponsors: float = 0.02
+    # Share of vote results cast by a legislator missing from legislators.csv
+    missing_legislators: float = 0.005
+    seed: int = 0
+
+    @property
+    def approximate_results(self):
+        return int(
+            self.bills * self.roll_calls_per_bill * self.legislators * self.turnout
+        )
+
+
+SCALES = {
+    "small": DatasetSpec(bills=200),
+    "medium": DatasetSpec(bills=2_000),
+    "large": DatasetSpec(legislators=535, bills=15_000),
+    "xlarge": DatasetSpec(legislators=535, bills=130_000),
+}
+
+# Roll calls generated and written at once
+CHUNK_ROLL_CALLS = 2_000
+
+
+def unique_ids(rng, size, start):
+    """size increasing ids from start on, with random gaps as in the real data"""
+    return start + np.cumsum(rng.integers(1, 40, size=size))
+
+
+def make_tables(spec: DatasetSpec):
+    """legislators, bills and votes, plus the parties and former members used for results"""
+    rng = np.random.default_rng(spec.seed)
+
+    legislator_ids = unique_ids(rng, spec.legislators, 400_000)
+    # Legislators who left: sponsors and voters missing from legislators.csv
+    former_ids = unique_ids(rng, max(spec.legislators // 10, 1), 2_000_000)
+    parties = rng.choice(len(PARTIES), size=spec.legislators, p=PARTY_SHARES)
+    names = [
+        f"Rep. {first} {last} ({party}-{state}-{district})"
+        for first, last, party, state, district in zip(
+            rng.choice(FIRST_NAMES, spec.legislators),
+            rng.choice(LAST_NAMES, spec.legislators),
+            PARTIES[parties],
+            rng.choice(STATES, spec.legislators),
+            rng.integers(1, 20, spec.legislators),
+        )
+    ]
+    legislators = pd.DataFrame({"id": legislator_ids, "name": names})
+
+    bill_ids = unique_ids(rng, spec.bills, 2_900_000)
+    sponsors = rng.choice(legislator_ids, spec.bills)
+    missing = rng.random(spec.bills) < spec.missing_sponsors
+    sponsors[missing] = rng.choice(former_ids, int(missing.sum()))
+    titles = [
+        f"{chamber} {number}: {subject} {kind}"
+        for chamber, number, subject, kind in zip(
+            rng.choice(["H.R.", "S."], spec.bills, p=[0.7, 0.3]),
+            np.arange(1, spec.bills + 1),
+            rng.choice(SUBJECTS, spec.bills),
+            rng.choice(KINDS, spec.bills),
+        )
+    ]
+    bills = pd.DataFrame({"id": bill_ids, "title": titles, "sponsor_id": sponsors})
+    # Listed in no particular order, like the source files
+    bills = bills.iloc[rng.permutation(spec.bills)].reset_index(drop=True)
+
+    # A bill's roll calls are spread out in time, interleaved with other bills'
+    roll_calls = rng.geometric(1 / spec.roll_calls_per_bill, size=spec.bills)
+    vote_bills = rng.permutation(np.repeat(bill_ids, roll_calls))
+    votes = pd.DataFrame(
+        {"id": unique_ids(rng, len(vote_bills), 3_300_000), "bill_id": vote_bills}
+    )
+
+    return legislators, bills, votes, parties, former_ids
+
+
+def iter_vote_results(spec: DatasetSpec, legislators, votes, parties, former_ids):
+    """vote_results DataFrames, one per CHUNK_ROLL_CALLS roll calls, in roll call order"""
+    legislator_ids = legislators["id"].to_numpy()
+    vote_ids = votes["id"].to_numpy()
+    next_id = 90_000_000
+
+    for chunk, start in enumerate(range(0, len(vote_ids), CHUNK_ROLL_CALLS)):
+        # Seeded per chunk, so results do not depend on what was drawn before
+        rng = np.random.default_rng([spec.seed, chunk])
+        chunk_votes = vote_ids[start: start + CHUNK_ROLL_CALLS]
+
+        present = rng.random((len(chunk_votes), len(legislator_ids))) < spec.turnout
+        lean = rng.choice(len(YEA_PROBABILITIES), size=len(chunk_votes), p=[0.4, 0.3, 0.3])
+        yea = rng.random(present.shape) < YEA_PROBABILITIES[lean][:, parties]
+
+        rows, columns = np.nonzero(present)
+        voters = legislator_ids[columns]
+        missing = rng.random(len(voters)) < spec.missing_legislators
+        voters[missing] = rng.choice(former_ids, int(missing.sum()))
+
+        yield pd.DataFrame(
+            {
+                "id": np.arange(next_id, next_id + len(rows)),
+                "legislator_id": voters,
+                "vote_id": chunk_votes[rows],
+                "vote_type": np.where(yea[rows, columns], 1, 2),
+            }
+        )
+        next_id += len(rows)
+
+
+def generate(folder, spec: DatasetSpec, snapshot=False, progress=None):
+    """
+    Write the dataset of spec to folder as CSVs, and as a binary snapshot
+    too when asked; returns the number of vote results
+    """
+    from legislative.services.columnar import SnapshotWriter
+    from legislative.services.schema import apply_schema
+
+    os.makedirs(folder, exist_ok=True)
+    legislators, bills, votes, parties, former_ids = make_tables(spec)
+    for name, frame in (("legislators", legislators), ("bills", bills), ("votes", votes)):
+        frame.to_csv(os.path.join(folder, f"{name}.csv"), index=False)
+
+    writer = SnapshotWriter(folder) if snapshot else None
+    if writer:
+        for name, frame in (("legislators", legislators), ("bills", bills), ("votes", votes)):
+            writer.write_table(name, frame)
+
+    results = 0
+    try:
+        with open(
+            os.path.join(folder, "vote_results.csv"), "w", encoding="utf-8", newline=""
+        ) as file:
+            file.write("id,legislator_id,vote_id,vote_type\n")
+            for chunk in iter_vote_results(spec, legislators, votes, parties, former_ids):
+                chunk.to_csv(file, header=False, index=False)
+                if writer:
+                    writer.append(
+                        "vote_results", apply_schema("vote_results", chunk, strict=True)
+                    )
+                results += len(chunk)
+                if progress:
+                    progress(results)
+    except BaseException:
+        if writer:
+            writer.abort()
+        raise
+
+    # Finished after the CSVs are closed, so the snapshot is the newer
+    if writer:
+        writer.finish()
+    return results
+
+
+def dataset_folder(root, scale):
+    """Folder under root for the dataset of the scale, named after its spec"""
+    spec = SCALES[scale]
+    return os.path.join(
+        root, "-".join([scale, *(str(value) for value in dataclasses.astuple(spec))])
+    )
+
+
+def ensure_dataset(root, scale):
+    """
+    Folder under root holding the dataset of the scale, with its binary
+    snapshot; generated unless a fresh one is already there
+    """
+    from legislative.services.columnar import snapshot_is_fresh
+    from legislative.services.snapshot import csv_paths
+
+    folder = dataset_folder(root, scale)
+    if not (os.path.exists(folder) and snapshot_is_fresh(folder, csv_paths(folder))):
+        generate(folder, SCALES[scale], snapshot=True)
+    return folder
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("folder")
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    for field in dataclasses.fields(DatasetSpec):
+        parser.add_argument(
+            f"--{field.name.replace('_', '-')}",
+            type=field.type,
+            help=f"Overrides the {field.name} of the scale",
+        )
+    parser.add_argument(
+        "--snapshot", action="store_true", help="Also write the binary snapshot"
+    )
+    args = parser.parse_args()
+
+    spec = dataclasses.replace(
+        SCALES[args.scale],
+        **{
+            field.name: getattr(args, field.name)
+            for field in dataclasses.fields(DatasetSpec)
+            if getattr(args, field.name) is not None
+        },
+    )
+
+    from .common import setup_django
+
+    setup_django()
+    start = time.perf_counter()
+    print(f"{spec} (~{spec.approximate_results:,} vote results)")
+    results = generate(
+        args.folder,
+        spec,
+        snapshot=args.snapshot,
+        progress=lambda rows: print(f"\r{rows:,} vote results", end="", flush=True),
+    )
+    print(f"\r{results:,} vote results written to {args.folder} "
+          f"in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
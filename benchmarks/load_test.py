@@ -0,0 +1,364 @@
+"""
+End-to-end HTTP load test of the legislative views, reporting throughput and
+latency percentiles per route.
+
+Starts the WSGI application the way a pre-forking server would: --workers
+processes accepting on one listening socket, each loading the dataset itself
+(or sharing the parent's with --preload) and serving requests from a pool of
+--threads threads. --clients client threads then request a weighted mix of the
+routes of legislative/urls.py for --duration seconds, after a --warmup whose
+requests are not counted. Each client sends its next request once the previous
+response is read in full, over a new connection.
+
+    python -m benchmarks.load_test --scale medium --workers 4 --threads 2 --clients 16
+    python -m benchmarks.load_test --data data --mix bills=1,bill_detail=3
+
+With --url the load is sent to a server already running instead, e.g. gunicorn
+with the worker settings under test; --data must then name the folder it serves,
+from which bill and legislator ids are drawn.
+"""
+
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import socket
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer
+
+import numpy as np
+import pandas as pd
+
+from .common import setup_django
+from .generate import SCALES, dataset_folder, ensure_dataset
+
+# Listing pages drawn from
+LISTING_PAGES = 20
+
+# Route name in legislative/urls.py: (default weight, path builder). Downloads
+# of every vote take seconds at the larger scales and metrics is no page, so
+# both are left out by default.
+ROUTES = {
+    "index": (2, lambda ids, rng: "/"),
+    "bills": (10, lambda ids, rng: f"/bills/?page={rng.integers(1, LISTING_PAGES)}"),
+    "legislators": (
+        6,
+        lambda ids, rng: f"/legislators/?page={rng.integers(1, LISTING_PAGES)}",
+    ),
+    "bill_detail": (20, lambda ids, rng: f"/bills/{ids.bill(rng)}/"),
+    "legislator_detail": (12, lambda ids, rng: f"/legislators/{ids.legislator(rng)}/"),
+    "download_bills": (1, lambda ids, rng: "/bills/download/"),
+    "download_legislators": (1, lambda ids, rng: "/legislator/download/"),
+    "download_votes": (0, lambda ids, rng: "/votes/download/?format=parquet"),
+    "metrics": (0, lambda ids, rng: "/metrics/"),
+    "api_bills": (8, lambda ids, rng: "/api/bills/?sort=-total_votes"),
+    "api_bill": (8, lambda ids, rng: f"/api/bills/{ids.bill(rng)}/"),
+    "api_bill_votes": (6, lambda ids, rng: f"/api/bills/{ids.bill(rng)}/votes/"),
+    "api_bill_roll_calls": (
+        4,
+        lambda ids, rng: f"/api/bills/{ids.bill(rng)}/roll-calls/",
+    ),
+    "api_legislators": (5, lambda ids, rng: "/api/legislators/?sort=-total_votes"),
+    "api_legislator": (5, lambda ids, rng: f"/api/legislators/{ids.legislator(rng)}/"),
+    "api_legislator_votes": (
+        6,
+        lambda ids, rng: f"/api/legislators/{ids.legislator(rng)}/votes/",
+    ),
+}
+
+PERCENTILES = (50, 95, 99)
+
+
+@dataclass(frozen=True)
+class DatasetIds:
+    """Bill and legislator ids of the dataset, requested uniformly"""
+
+    bills: np.ndarray
+    legislators: np.ndarray
+
+    @classmethod
+    def read(cls, folder):
+        def ids(name):
+            return pd.read_csv(os.path.join(folder, f"{name}.csv"), usecols=["id"])[
+                "id"
+            ].to_numpy()
+
+        return cls(bills=ids("bills"), legislators=ids("legislators"))
+
+    def bill(self, rng):
+        return self.bills[rng.integers(len(self.bills))]
+
+    def legislator(self, rng):
+        return self.legislators[rng.integers(len(self.legislators))]
+
+
+def parse_mix(text):
+    """
+    {route: weight} from "route=weight,..." (routes left out get no requests),
+    or the default weights when text is empty
+    """
+    if not text:
+        return {name: weight for name, (weight, _) in ROUTES.items() if weight}
+
+    mix = {}
+    for item in text.split(","):
+        name, _, weight = item.partition("=")
+        if name not in ROUTES:
+            raise ValueError(f"Unknown route {name!r}, use any of: {', '.join(ROUTES)}")
+        try:
+            mix[name] = float(weight or 1)
+        except ValueError:
+            raise ValueError(f"Invalid weight {weight!r} for route {name}")
+        if mix[name] < 0:
+            raise ValueError(f"Invalid weight {weight!r} for route {name}")
+    mix = {name: weight for name, weight in mix.items() if weight}
+    if not mix:
+        raise ValueError("The mix requests no route")
+    return mix
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+
+class PooledWSGIServer(WSGIServer):
+    """
+    WSGIServer accepting on a listening socket shared with other worker
+    processes, handing each connection to a fixed pool of threads
+    """
+
+    def __init__(self, listening, threads):
+        self.listening = listening
+        self.pool = ThreadPoolExecutor(threads, thread_name_prefix="load-test-worker")
+        super().__init__(listening.getsockname(), QuietHandler)
+
+    def server_bind(self):
+        self.socket.close()
+        self.socket = self.listening
+        self.server_name, self.server_port = self.socket.getsockname()[:2]
+        self.setup_environ()
+
+    def server_activate(self):
+        # Listening already, in the parent process
+        pass
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self.process_request_thread, request, client_address)
+
+    def process_request_thread(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:  # pylint: disable=broad-except
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+
+def warm_service():
+    """Load and warm the dataset, as the first requests would"""
+    from legislative.services import legislative_service
+
+    legislative_service.get_complete_bills_data()
+    legislative_service.get_complete_legislators_data()
+
+
+def serve(listening, threads, ready):
+    from django.core.wsgi import get_wsgi_application
+
+    application = get_wsgi_application()
+    warm_service()
+    server = PooledWSGIServer(listening, threads)
+    server.set_app(application)
+    ready.put(os.getpid())
+    server.serve_forever(poll_interval=0.1)
+
+
+def start_server(workers, threads, preload, timeout=600):
+    """Worker processes serving on a free local port; returns (url, processes)"""
+    listening = socket.create_server(("127.0.0.1", 0), backlog=1024)
+    # Every worker waits on the socket; those losing an accept go back to waiting
+    listening.setblocking(False)
+    if preload:
+        warm_service()
+
+    context = multiprocessing.get_context("fork")
+    ready = context.Queue()
+    processes = [
+        context.Process(target=serve, args=(listening, threads, ready), daemon=True)
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    for _ in processes:
+        ready.get(timeout=timeout)
+
+    host, port = listening.getsockname()[:2]
+    listening.close()
+    return f"http://{host}:{port}", processes
+
+
+def client(url, ids, mix, seed, warmup_until, stop_at, results):
+    """Request routes of the mix until stop_at; appends (route, status, seconds, bytes)"""
+    parts = urlsplit(url)
+    rng = np.random.default_rng(seed)
+    names = list(mix)
+    weights = np.array(list(mix.values()))
+    weights = weights / weights.sum()
+
+    while True:
+        name = names[rng.choice(len(names), p=weights)]
+        path = ROUTES[name][1](ids, rng)
+        start = time.perf_counter()
+        if start >= stop_at:
+            return
+
+        size = 0
+        connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=300)
+        try:
+            connection.request("GET", f"{parts.path.rstrip('/')}{path}")
+            response = connection.getresponse()
+            while chunk := response.read(64 * 1024):
+                size += len(chunk)
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            status = 0
+        finally:
+            connection.close()
+
+        if start >= warmup_until:
+            results.append((name, status, time.perf_counter() - start, size))
+
+
+def run_clients(url, ids, mix, clients, duration, warmup, seed=0):
+    """Results of all the clients: one (route, status, seconds, bytes) per request"""
+    results = []
+    warmup_until = time.perf_counter() + warmup
+    stop_at = warmup_until + duration
+    threads = [
+        threading.Thread(
+            target=client,
+            args=(url, ids, mix, [seed, number], warmup_until, stop_at, results),
+            daemon=True,
+        )
+        for number in range(clients)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def summarize(results, duration):
+    """Requests, errors, requests/s, latency percentiles (ms) and mean size per route"""
+    frame = pd.DataFrame(results, columns=["route", "status", "seconds", "bytes"])
+    frame["error"] = ~frame["status"].between(200, 399)
+
+    def stats(rows):
+        latencies = rows["seconds"].to_numpy() * 1000
+        return {
+            "requests": len(rows),
+            "errors": int(rows["error"].sum()),
+            "rps": len(rows) / duration,
+            **{
+                f"p{percentile}": float(np.percentile(latencies, percentile))
+                for percentile in PERCENTILES
+            },
+            "kb": rows["bytes"].mean() / 1024,
+        }
+
+    summary = {name: stats(rows) for name, rows in frame.groupby("route", sort=False)}
+    summary = dict(sorted(summary.items(), key=lambda item: -item[1]["requests"]))
+    if len(frame):
+        summary["all"] = stats(frame)
+    return summary
+
+
+def print_summary(summary):
+    percentiles = "".join(f"{f'p{percentile}':>10}" for percentile in PERCENTILES)
+    print(
+        f"{'route':<22}{'requests':>9}{'errors':>8}{'req/s':>9}{percentiles}{'KB':>10}"
+    )
+    for name, stats in summary.items():
+        latencies = "".join(
+            f"{stats[f'p{percentile}']:>8.1f}ms" for percentile in PERCENTILES
+        )
+        print(
+            f"{name:<22}{stats['requests']:>9}{stats['errors']:>8}"
+            f"{stats['rps']:>9.1f}{latencies}{stats['kb']:>10.1f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    data = parser.add_mutually_exclusive_group()
+    data.add_argument("--scale", choices=SCALES, default="small",
+                      help="Generate a synthetic dataset of this scale to serve")
+    data.add_argument("--data", help="Serve this dataset folder instead")
+    parser.add_argument("--data-root", default=os.path.join(tempfile.gettempdir(),
+                                                            "quorum-datasets"),
+                        help="Folder keeping the generated datasets between runs")
+    parser.add_argument("--url", help="Load an already running server instead")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=4,
+                        help="Request threads of each worker")
+    parser.add_argument("--preload", action="store_true",
+                        help="Load the dataset before forking the workers")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=20, help="Seconds measured")
+    parser.add_argument("--warmup", type=float, default=3,
+                        help="Seconds of requests sent first and not measured")
+    parser.add_argument("--mix", default="",
+                        help="route=weight,... of the requests, of: " + ", ".join(ROUTES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Also write the summary to this file")
+    args = parser.parse_args()
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as error:
+        parser.error(str(error))
+    if args.url and not args.data:
+        parser.error("--url needs --data, the folder the server serves")
+
+    setup_django()
+    from django.conf import settings
+
+    # Set before legislative.services is first imported, creating the service
+    folder = args.data or dataset_folder(args.data_root, args.scale)
+    settings.LEGISLATIVE_DATA_FOLDER = folder
+    if not args.data:
+        ensure_dataset(args.data_root, args.scale)
+    ids = DatasetIds.read(folder)
+
+    processes = []
+    url = args.url
+    if url is None:
+        url, processes = start_server(args.workers, args.threads, args.preload)
+        print(f"Serving {folder} at {url} with {args.workers} workers "
+              f"of {args.threads} threads")
+
+    try:
+        results = run_clients(
+            url, ids, mix, args.clients, args.duration, args.warmup, args.seed
+        )
+    finally:
+        for process in processes:
+            process.terminate()
+
+    summary = summarize(results, args.duration)
+    print_summary(summary)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump({"args": vars(args), "routes": summary}, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
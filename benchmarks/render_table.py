@@ -0,0 +1,115 @@
+"""
+Render time of the bills table for 10k, 100k and 1M rows.
+
+Compares the vectorized render_table against the previous row-wise
+DataFrame.apply link formatting followed by DataFrame.to_html.
+
+    python -m benchmarks.render_table
+"""
+
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from .common import setup_django, timed
+
+ROW_COUNTS = [10_000, 100_000, 1_000_000]
+# The row-wise path takes minutes at 1M rows
+APPLY_MAX_ROWS = 100_000
+
+SPONSOR_LINK = {
+    "column_name": "sponsor",
+    "url_pattern": "legislators",
+    "name": "sponsor",
+    "item_id": "sponsor_id",
+    "css_class": "legislator-link",
+}
+TITLE_LINK = {
+    "column_name": "title",
+    "url_pattern": "bills",
+    "name": "title",
+    "item_id": "id",
+    "css_class": "bill-link",
+}
+
+
+def bills_rows(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    sponsor_ids = rng.integers(1, 500, size=n_rows)
+    return pd.DataFrame(
+        {
+            "id": np.arange(1, n_rows + 1),
+            "title": [f"H.R. {i}: Synthetic Act" for i in range(1, n_rows + 1)],
+            "sponsor_id": sponsor_ids,
+            "sponsor": np.where(
+                sponsor_ids % 10 == 0,
+                "Unknown Sponsor",
+                [f"Rep. Synthetic {i}" for i in sponsor_ids],
+            ),
+            "total_votes": rng.integers(0, 435, size=n_rows),
+            "yea_votes": rng.integers(0, 218, size=n_rows),
+            "nay_votes": rng.integers(0, 218, size=n_rows),
+        }
+    ).to_dict("records")
+
+
+def apply_render(service, data):
+    """render_table as it was before link columns were vectorized"""
+    frame = pd.DataFrame(data)
+    should_link = {"sponsor": lambda row: row["sponsor"] != "Unknown Sponsor"}
+
+    def format_cell(row, item, should_link_fn):
+        return (
+            service.make_link(
+                f"/{item['url_pattern']}/{row[item['item_id']]}/",
+                row[item["item_id"]],
+                row[item["name"]],
+                item["css_class"],
+            )
+            if not should_link_fn or should_link_fn(row)
+            else row[item["name"]]
+        )
+
+    for item in (SPONSOR_LINK, TITLE_LINK):
+        frame[item["column_name"]] = frame.apply(
+            partial(
+                format_cell,
+                item=item,
+                should_link_fn=should_link.get(item["column_name"]),
+            ),
+            axis=1,
+        )
+    frame = frame.drop(columns=["id", "sponsor_id"])
+    return frame.to_html(
+        classes="table table-striped table-hover",
+        justify="left",
+        escape=False,
+        index=False,
+        border=0,
+    )
+
+
+def main():
+    setup_django()
+    from legislative.services.csv_service import CSVLegislativeDataService
+
+    service = CSVLegislativeDataService()
+    links = [
+        {**SPONSOR_LINK, "link_when": lambda rows: rows["sponsor"] != "Unknown Sponsor"},
+        TITLE_LINK,
+    ]
+
+    print(f"{'rows':>10} {'vectorized':>12} {'apply + to_html':>16}")
+    for n_rows in ROW_COUNTS:
+        rows = bills_rows(n_rows)
+        vectorized_ms = timed(service.render_table, rows, links, repeat=3)
+        if n_rows <= APPLY_MAX_ROWS:
+            apply_ms = f"{timed(apply_render, service, rows, repeat=1):>14.0f}ms"
+        else:
+            apply_ms = f"{'skipped':>16}"
+        print(f"{n_rows:>10} {vectorized_ms:>10.0f}ms {apply_ms}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Latency of get_legislator_by_id versus the number of bills the legislator sponsored.
+
+Compares the shared per-bill tally join against the previous per-sponsored-bill
+scans over votes and vote_results.
+
+    python -m benchmarks.sponsored_bills
+"""
+
+import tempfile
+
+from .common import make_dataset, setup_django, timed, write_dataset
+
+N_LEGISLATORS = 435
+SPONSORED_COUNTS = [1, 10, 100, 1000]
+
+
+def per_bill_scan(service, legislator_id):
+    """The sponsored-bills loop as it was before the shared tallies"""
+    details = []
+    sponsored_bills = service.bills[service.bills["sponsor_id"] == legislator_id]
+    for _, bill in sponsored_bills.iterrows():
+        bill_vote_query = service.votes[service.votes["bill_id"] == bill["id"]]
+        vote_id = bill_vote_query.iloc[0]["id"]
+        bill_votes = service.vote_results[service.vote_results["vote_id"] == vote_id]
+        details.append(
+            (
+                len(bill_votes[bill_votes["vote_type"] == 1]),
+                len(bill_votes[bill_votes["vote_type"] == 2]),
+                len(bill_votes),
+            )
+        )
+    return details
+
+
+def main():
+    setup_django()
+    from legislative.services.csv_service import CSVLegislativeDataService
+
+    print(
+        f"{'sponsored':>10} {'results':>10} {'tallies':>12} "
+        f"{'detail':>12} {'per-bill scan':>14}"
+    )
+    for sponsored in SPONSORED_COUNTS:
+        with tempfile.TemporaryDirectory() as folder:
+            write_dataset(folder, *make_dataset(N_LEGISLATORS, [sponsored]))
+            service = CSVLegislativeDataService(data_folder=folder)
+            service.index  # load tables and build the index outside the timings
+
+            tally_ms = timed(service.get_bill_vote_counts, repeat=1)
+            detail_ms = timed(service.get_legislator_by_id, 1)
+            scan_ms = timed(per_bill_scan, service, 1, repeat=1)
+
+            print(
+                f"{sponsored:>10} {len(service.vote_results):>10} {tally_ms:>10.1f}ms "
+                f"{detail_ms:>10.1f}ms {scan_ms:>12.1f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
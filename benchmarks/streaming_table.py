@@ -0,0 +1,79 @@
+"""
+Time to first chunk and peak memory of a whole-listing bills table.
+
+Compares stream_table, which formats FrameRecords rows one chunk at a time,
+against building the full render_table string from a list of dicts.
+
+    python -m benchmarks.streaming_table
+"""
+
+import time
+import tracemalloc
+
+import numpy as np
+
+from .common import setup_django
+from .render_table import SPONSOR_LINK, TITLE_LINK, bills_rows
+
+ROW_COUNTS = [10_000, 100_000, 1_000_000]
+# Building the whole page takes minutes at 1M rows under tracemalloc
+WHOLE_MAX_ROWS = 100_000
+
+
+def measure(render):
+    """(first chunk ms, total ms, peak traced MB) of consuming render()"""
+    start = time.perf_counter()
+    chunks = iter(render())
+    next(chunks)
+    first_ms = (time.perf_counter() - start) * 1000
+    for _ in chunks:
+        pass
+    total_ms = (time.perf_counter() - start) * 1000
+
+    # Peak memory on a second pass, tracemalloc slows allocation down
+    tracemalloc.start()
+    for _ in render():
+        pass
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return first_ms, total_ms, peak / 1e6
+
+
+def main():
+    setup_django()
+    import pandas as pd
+
+    from legislative.services.base import FrameRecords
+    from legislative.services.csv_service import CSVLegislativeDataService
+
+    service = CSVLegislativeDataService()
+    links = [
+        {**SPONSOR_LINK, "link_when": lambda rows: rows["sponsor"] != "Unknown Sponsor"},
+        TITLE_LINK,
+    ]
+
+    print(
+        f"{'rows':>10} {'':>10} {'first chunk':>12} {'total':>10} {'peak':>10}"
+    )
+    for n_rows in ROW_COUNTS:
+        frame = pd.DataFrame(bills_rows(n_rows))
+        frame["title"] = frame["title"].astype("category")
+        frame["sponsor"] = frame["sponsor"].astype("category")
+        rows = FrameRecords(frame, np.arange(n_rows))
+
+        renderers = [("streamed", lambda: service.stream_table(rows, links))]
+        if n_rows <= WHOLE_MAX_ROWS:
+            renderers.append(
+                ("whole", lambda: [service.render_table(list(rows), links)])
+            )
+
+        for label, render in renderers:
+            first_ms, total_ms, peak_mb = measure(render)
+            print(
+                f"{n_rows:>10} {label:>10} {first_ms:>10.0f}ms "
+                f"{total_ms:>8.0f}ms {peak_mb:>8.0f}MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Memory footprint of the loaded tables and listing aggregation time, with
+default pandas inference versus the schema registry dtypes.
+
+    python -m benchmarks.table_memory
+"""
+
+import os
+import tempfile
+
+from .common import make_dataset, setup_django, timed, write_dataset
+
+N_LEGISLATORS = 435
+N_BILLS = 5000
+
+
+def main():
+    setup_django()
+    import pandas as pd
+
+    from legislative.services import snapshot
+    from legislative.services.csv_service import CSVLegislativeDataService
+
+    def read_inferred(data_folder):
+        return {
+            table: pd.read_csv(os.path.join(data_folder, f"{table}.csv"))
+            for table in snapshot.TABLES
+        }
+
+    with tempfile.TemporaryDirectory() as folder:
+        write_dataset(folder, *make_dataset(N_LEGISLATORS, [N_BILLS]))
+
+        print(f"{'dtypes':>9} {'tables':>10} {'bills agg':>11} {'legislators agg':>16}")
+        for label, reader in (
+            ("inferred", read_inferred),
+            ("schema", snapshot.read_csv_tables),
+        ):
+            tables = reader(folder)
+            size = sum(
+                frame.memory_usage(deep=True).sum() for frame in tables.values()
+            )
+
+            service = CSVLegislativeDataService(data_folder=folder)
+            snap = snapshot.DatasetSnapshot(tables, snapshot.file_signature(folder))
+
+            def aggregate(method):
+                # Time the merge/format step over fresh tallies each round
+                with service.pinned(snap):
+                    snap._derived.clear()
+                    method()
+
+            bills_ms = timed(aggregate, service.get_complete_bills_data)
+            legislators_ms = timed(aggregate, service.get_complete_legislators_data)
+            print(
+                f"{label:>9} {size / 2**20:>8.1f}MB {bills_ms:>9.1f}ms "
+                f"{legislators_ms:>14.1f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
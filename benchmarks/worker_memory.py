@@ -0,0 +1,89 @@
+"""
+Per-worker memory with private in-process tables versus the memory-mapped binary snapshot.
+
+Starts several worker processes the way gunicorn/uvicorn would (each one
+loading the dataset itself), has each serve the listing and detail queries,
+and reports RSS and PSS (RSS with shared pages split between their users)
+while all workers are alive. Linux only (/proc/self/smaps_rollup).
+
+    python -m benchmarks.worker_memory
+"""
+
+import multiprocessing
+import tempfile
+
+from .common import make_dataset, setup_django, write_dataset
+
+N_WORKERS = 4
+N_LEGISLATORS = 435
+N_BILLS = 5000
+
+
+def memory_kb():
+    fields = {}
+    with open("/proc/self/smaps_rollup", encoding="utf-8") as file:
+        for line in file:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return fields["Rss"], fields["Pss"]
+
+
+def worker(folder, mmap, barrier, results):
+    setup_django()
+    from django.conf import settings
+
+    settings.LEGISLATIVE_DATA_MMAP = mmap
+    from legislative.services.csv_service import CSVLegislativeDataService
+
+    service = CSVLegislativeDataService(data_folder=folder)
+    service.get_complete_bills_data()
+    service.get_complete_legislators_data()
+    service.get_bill_by_id(1)
+    service.get_legislator_by_id(1)
+
+    # Measure only once every worker holds its dataset
+    barrier.wait()
+    results.put(memory_kb())
+    barrier.wait()
+
+
+def measure(folder, mmap):
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(N_WORKERS)
+    results = context.Queue()
+    processes = [
+        context.Process(target=worker, args=(folder, mmap, barrier, results))
+        for _ in range(N_WORKERS)
+    ]
+    for process in processes:
+        process.start()
+    samples = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return samples
+
+
+def main():
+    setup_django()
+    from legislative.services.columnar import write_snapshot
+    from legislative.services.snapshot import read_csv_tables
+
+    with tempfile.TemporaryDirectory() as folder:
+        write_dataset(folder, *make_dataset(N_LEGISLATORS, [N_BILLS]))
+        write_snapshot(read_csv_tables(folder), folder)
+
+        print(f"{N_WORKERS} workers, {N_LEGISLATORS * N_BILLS} vote results")
+        print(f"{'mode':>8} {'RSS/worker':>12} {'PSS/worker':>12} {'PSS total':>12}")
+        for mode, mmap in (("private", False), ("mmap", True)):
+            samples = measure(folder, mmap)
+            rss = sum(rss for rss, _ in samples) / len(samples)
+            pss = sum(pss for _, pss in samples)
+            print(
+                f"{mode:>8} {rss / 1024:>10.1f}MB {pss / len(samples) / 1024:>10.1f}MB "
+                f"{pss / 1024:>10.1f}MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -2,4 +2,5 @@
 echo "BUILD START"
 python3.9 -m pip install -r requirements.txt
 python3.9 manage.py collectstatic --noinput
+python3.9 manage.py build_snapshot
 echo "BUILD END"
\ No newline at end of file
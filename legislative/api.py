@@ -0,0 +1,252 @@
+"""
+JSON API over the legislative service.
+
+Listings, records and vote breakdowns come from the same service methods as
+the HTML views, as plain values: no link or badge markup is built for them.
+Every endpoint takes fields= (comma separated columns to return). Listings
+and vote breakdowns are paginated with an opaque cursor, followed through
+the `next` URL of each page.
+"""
+
+import base64
+import binascii
+import json
+from functools import wraps
+
+import pandas as pd
+from django.http import HttpResponse, JsonResponse
+
+from .cache import conditional_per_dataset
+from .services import legislative_service
+from .services.base import BILL_COLUMNS, LEGISLATOR_COLUMNS, TableQuery
+from .services.export import plain_frame
+from .services.records import BillVote, LegislatorVote, RollCall
+from .services.rendering import data_chunks
+from .views import (BILLS_SORT_COLUMNS, LEGISLATORS_SORT_COLUMNS,
+                    MAX_PAGE_SIZE, positive_int, sort_param)
+
+DEFAULT_LIMIT = 50
+# Listing columns holding text, whose cursors carry a string sort value
+TEXT_COLUMNS = {"title", "sponsor", "legislator"}
+
+
+class BadRequest(Exception):
+    """Invalid parameter, reported to the client with a 400"""
+
+
+def json_error(message, status):
+    return JsonResponse({"error": message}, status=status)
+
+
+def api_view(view):
+    """Reports BadRequest raised by the view as a JSON 400"""
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return view(request, *args, **kwargs)
+        except BadRequest as error:
+            return json_error(str(error), 400)
+
+    return wrapper
+
+
+def requested_fields(request, columns):
+    """Columns named by the fields parameter, in the order given; all by default"""
+    fields = [field for field in request.GET.get("fields", "").split(",") if field]
+    unknown = [field for field in fields if field not in columns]
+    if unknown:
+        raise BadRequest(
+            f"Unknown fields {', '.join(unknown)}, use any of: {', '.join(columns)}"
+        )
+    return fields or list(columns)
+
+
+def requested_limit(request):
+    return min(positive_int(request.GET.get("limit"), DEFAULT_LIMIT), MAX_PAGE_SIZE)
+
+
+def encode_cursor(state) -> str:
+    data = json.dumps(state, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def decode_cursor(request):
+    """The state of the cursor parameter, None on the first page"""
+    cursor = request.GET.get("cursor")
+    if not cursor:
+        return None
+    padding = "=" * (-len(cursor) % 4)
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor + padding))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise BadRequest("Invalid cursor")
+    if not isinstance(state, dict):
+        raise BadRequest("Invalid cursor")
+    return state
+
+
+def next_url(request, state):
+    if state is None:
+        return None
+    params = request.GET.copy()
+    params["cursor"] = encode_cursor(state)
+    return f"{request.path}?{params.urlencode()}"
+
+
+def page_response(request, rows: pd.DataFrame, count, next_state):
+    """
+    {"count", "next", "results"} page. The rows are serialized by pandas in
+    one pass rather than converted to dicts first.
+    """
+    meta = json.dumps({"count": count, "next": next_url(request, next_state)})
+    results = plain_frame(rows).to_json(orient="records")
+    return HttpResponse(
+        f'{meta[:-1]}, "results": {results}}}', content_type="application/json"
+    )
+
+
+def listing_page(request, query_listing, columns, sort_columns):
+    """
+    One page of a listing. The cursor is a keyset cursor: it holds the sort
+    order and the (sort value, id) of the last row sent, so following pages
+    are found by seeking rather than by skipping rows.
+    """
+    fields = requested_fields(request, columns)
+    sort, descending = sort_param(request, sort_columns)
+    sort_name = f"{'-' if descending else ''}{sort or ''}"
+    key_column = sort or "id"
+
+    after = None
+    state = decode_cursor(request)
+    if state is not None:
+        after = state.get("after")
+        value_type = str if key_column in TEXT_COLUMNS else int
+        if (
+            state.get("sort") != sort_name
+            or not isinstance(after, list)
+            or len(after) != 2
+            or not isinstance(after[0], value_type)
+            or not isinstance(after[1], int)
+        ):
+            raise BadRequest("Cursor does not match this listing and sort order")
+
+    limit = requested_limit(request)
+    # One row more than asked for tells whether there is a next page
+    page = query_listing(
+        TableQuery(
+            page_size=limit + 1,
+            sort=sort,
+            descending=descending,
+            search=request.GET.get("q", "").strip(),
+            after=None if after is None else tuple(after),
+        )
+    )
+    rows = next(data_chunks(page.rows, limit + 1)).reindex(columns=columns)
+
+    next_state = None
+    if len(rows) > limit:
+        rows = rows.iloc[:limit]
+        key = list(dict.fromkeys([key_column, "id"]))
+        last = rows.iloc[-1:][key].to_dict("records")[0]
+        next_state = {"sort": sort_name, "after": [last[key_column], last["id"]]}
+
+    return page_response(request, rows[fields], page.total, next_state)
+
+
+def frame_page(request, rows: pd.DataFrame, columns):
+    """
+    One page of a vote breakdown or roll call list; the cursor holds the
+    offset of the next row
+    """
+    fields = requested_fields(request, columns)
+    state = decode_cursor(request) or {"offset": 0}
+    offset = state.get("offset")
+    if not isinstance(offset, int) or offset < 0:
+        raise BadRequest("Invalid cursor")
+
+    stop = offset + requested_limit(request)
+    next_state = {"offset": stop} if stop < len(rows) else None
+    return page_response(request, rows.iloc[offset:stop][fields], len(rows), next_state)
+
+
+def json_value(value):
+    """Missing values (NaN, pd.NA) as null: NaN is not valid JSON"""
+    return None if pd.isna(value) else value
+
+
+def record_response(request, record, columns):
+    fields = requested_fields(request, columns)
+    return JsonResponse({field: json_value(record[field]) for field in fields})
+
+
+@conditional_per_dataset()
+@api_view
+def bills(request):
+    return listing_page(
+        request, legislative_service.query_bills, BILL_COLUMNS, BILLS_SORT_COLUMNS
+    )
+
+
+@conditional_per_dataset()
+@api_view
+def legislators(request):
+    return listing_page(
+        request,
+        legislative_service.query_legislators,
+        LEGISLATOR_COLUMNS,
+        LEGISLATORS_SORT_COLUMNS,
+    )
+
+
+@conditional_per_dataset()
+@api_view
+def bill(request, bill_id):
+    record = legislative_service.get_bill_record(int(bill_id))
+    if record is None:
+        return json_error("Bill not found", 404)
+    return record_response(request, record, BILL_COLUMNS)
+
+
+@conditional_per_dataset()
+@api_view
+def legislator(request, legislator_id):
+    record = legislative_service.get_legislator_record(int(legislator_id))
+    if record is None:
+        return json_error("Legislator not found", 404)
+    return record_response(request, record, LEGISLATOR_COLUMNS)
+
+
+@conditional_per_dataset()
+@api_view
+def bill_votes(request, bill_id):
+    """How each legislator voted in one roll call, the first unless roll_call is given"""
+    vote_id = request.GET.get("roll_call")
+    if vote_id is not None and not vote_id.isdigit():
+        raise BadRequest("roll_call must be a vote id")
+    breakdown = legislative_service.get_bill_votes(
+        int(bill_id), None if vote_id is None else int(vote_id)
+    )
+    if breakdown is None:
+        return json_error("Bill or roll call not found", 404)
+    return frame_page(request, breakdown, LegislatorVote._fields)
+
+
+@conditional_per_dataset()
+@api_view
+def bill_roll_calls(request, bill_id):
+    """Tally of each roll call on the bill, in vote id order"""
+    roll_calls = legislative_service.get_bill_roll_calls(int(bill_id))
+    if roll_calls is None:
+        return json_error("Bill not found", 404)
+    return frame_page(request, roll_calls, RollCall._fields)
+
+
+@conditional_per_dataset()
+@api_view
+def legislator_votes(request, legislator_id):
+    """How the legislator voted on each bill"""
+    breakdown = legislative_service.get_legislator_votes(int(legislator_id))
+    if breakdown is None:
+        return json_error("Legislator not found", 404)
+    return frame_page(request, breakdown, BillVote._fields)
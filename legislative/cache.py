@@ -0,0 +1,95 @@
+"""
+Rendered page and fragment cache for the legislative views, and the
+conditional GET validators clients and CDNs cache those pages with.
+
+Entries are keyed on (view, object, dataset version) in the cache named by
+LEGISLATIVE_PAGE_CACHE, so loading a new dataset changes every key and the
+pages of the previous version are simply never read again; the cache's own
+size bound evicts them.
+"""
+
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.views.decorators.http import condition
+
+from .services import legislative_service
+from .services.metrics import record_cache
+
+
+def page_cache():
+    """The configured page cache, or None when caching is disabled"""
+    alias = getattr(settings, "LEGISLATIVE_PAGE_CACHE", None)
+    return caches[alias] if alias else None
+
+
+def page_cache_key(view_name, object_id):
+    # object ids can be arbitrary strings (e.g. query strings), hash them to
+    # keep keys short and free of characters cache backends reject
+    digest = hashlib.sha1(str(object_id).encode()).hexdigest()[:16]
+    return f"legislative:{view_name}:{digest}:{legislative_service.data_version()}"
+
+
+def cached_fragment(view_name, object_id, render):
+    """render() memoized per (view, object, dataset version)"""
+    cache = page_cache()
+    if cache is None:
+        return render()
+
+    key = page_cache_key(view_name, object_id)
+    fragment = cache.get(key)
+    record_cache("page", fragment is not None)
+    if fragment is None:
+        fragment = render()
+        cache.set(key, fragment)
+    return fragment
+
+
+def cache_per_dataset(view):
+    """
+    Cache a view's successful, non-streaming GET responses per URL arguments,
+    query string and dataset version
+    """
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        cache = page_cache()
+        if cache is None or request.method != "GET":
+            return view(request, *args, **kwargs)
+
+        key = page_cache_key(
+            view.__name__, (args, sorted(kwargs.items()), request.GET.urlencode())
+        )
+        cached = cache.get(key)
+        record_cache("page", cached is not None)
+        if cached is not None:
+            content, content_type = cached
+            return HttpResponse(content, content_type=content_type)
+
+        response = view(request, *args, **kwargs)
+        if response.status_code == 200 and not response.streaming:
+            cache.set(key, (response.content, response["Content-Type"]))
+        return response
+
+    return wrapper
+
+
+def conditional_per_dataset(vary=()):
+    """
+    ETag / Last-Modified validators with 304 handling (django's condition).
+    The ETag covers the full path, the dataset version and the request
+    headers named in vary, for views whose representation is negotiated.
+    """
+
+    def etag(request, *args, **kwargs):
+        parts = [request.get_full_path(), legislative_service.data_version()]
+        parts += [request.headers.get(header, "") for header in vary]
+        return hashlib.sha1(repr(parts).encode()).hexdigest()[:20]
+
+    def last_modified(request, *args, **kwargs):
+        return legislative_service.data_last_modified()
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
@@ -0,0 +1,146 @@
+"""
+Per-request instrumentation: Server-Timing headers, request metrics and
+sampled cProfile runs.
+
+InstrumentationMiddleware collects the timers, row counts and cache results
+of each request (see services/metrics.py) and, with LEGISLATIVE_SERVER_TIMING,
+returns them as a Server-Timing header that browser devtools display. Request
+latencies per route go to the metrics served at /metrics/ with
+LEGISLATIVE_METRICS.
+
+With LEGISLATIVE_PROFILE_DIR set, a LEGISLATIVE_PROFILE_SAMPLE_RATE share of
+requests, and those sent with an X-Profile header when
+LEGISLATIVE_PROFILE_ON_REQUEST is on, run under cProfile and are dumped as
+pstats files there (`python -m pstats <file>` to read one), of which the newest
+LEGISLATIVE_PROFILE_MAX_FILES are kept. Only one request is profiled at a
+time, and the body of a streamed response is not covered.
+"""
+
+import cProfile
+import logging
+import os
+import random
+import threading
+import time
+
+from django.conf import settings
+
+from .services.metrics import REGISTRY, collecting
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "X-Profile"
+
+# cProfile hooks the whole interpreter, so profiles cannot overlap
+_profiling = threading.Lock()
+
+
+def route_name(request):
+    match = getattr(request, "resolver_match", None)
+    return (match.url_name if match else None) or "unmatched"
+
+
+def wants_profile(request) -> bool:
+    if not getattr(settings, "LEGISLATIVE_PROFILE_DIR", None):
+        return False
+    if getattr(settings, "LEGISLATIVE_PROFILE_ON_REQUEST", False) and (
+        PROFILE_HEADER in request.headers
+    ):
+        return True
+    rate = getattr(settings, "LEGISLATIVE_PROFILE_SAMPLE_RATE", 0.0)
+    return rate > 0 and random.random() < rate
+
+
+def profile_path(request):
+    folder = str(settings.LEGISLATIVE_PROFILE_DIR)
+    os.makedirs(folder, exist_ok=True)
+    stamp = time.strftime("%Y%m%dT%H%M%S")
+    name = f"{route_name(request)}-{stamp}-{os.getpid()}-{time.monotonic_ns()}.prof"
+    return os.path.join(folder, name)
+
+
+def prune_profiles(folder, keep):
+    """Remove all but the newest keep profiles of folder"""
+    with os.scandir(folder) as entries:
+        profiles = sorted(
+            (entry.stat().st_mtime_ns, entry.path)
+            for entry in entries
+            if entry.name.endswith(".prof")
+        )
+    for _, path in profiles[: max(len(profiles) - keep, 0)]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            # Pruned by another worker process
+            pass
+
+
+class InstrumentationMiddleware:
+    """Times every request; list it first in MIDDLEWARE so all of it is covered"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        with collecting() as timings:
+            profile = self.profiled(request)
+            response = self.get_response(request) if profile is None else profile
+
+        route = route_name(request)
+        entries = timings.server_timing()
+        profile_file = getattr(request, "profile_file", None)
+        if profile_file:
+            entries.append(f'profile;desc="{os.path.basename(profile_file)}"')
+        entries.append(f"total;dur={(time.perf_counter() - start) * 1000:.2f}")
+        if getattr(settings, "LEGISLATIVE_SERVER_TIMING", False):
+            response["Server-Timing"] = ", ".join(entries)
+
+        def finished():
+            REGISTRY.observe(
+                "legislative_request_seconds",
+                time.perf_counter() - start,
+                route=route,
+                status=response.status_code,
+            )
+
+        if response.streaming:
+            response.streaming_content = self.finishing(
+                response.streaming_content, finished
+            )
+        else:
+            finished()
+        return response
+
+    @staticmethod
+    def finishing(chunks, finished):
+        try:
+            yield from chunks
+        finally:
+            finished()
+
+    def profiled(self, request):
+        """The response of the request run under cProfile, None when not profiled"""
+        if not wants_profile(request) or not _profiling.acquire(blocking=False):
+            return None
+        try:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Another profiler is active in this interpreter
+                return None
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+            request.profile_file = profile_path(request)
+            profiler.dump_stats(request.profile_file)
+            keep = getattr(settings, "LEGISLATIVE_PROFILE_MAX_FILES", None)
+            if keep is not None:
+                prune_profiles(os.path.dirname(request.profile_file), keep)
+            REGISTRY.inc("legislative_profiles_total", route=route_name(request))
+            logger.info("Profile of %s written to %s", request.path, request.profile_file)
+            return response
+        finally:
+            _profiling.release()
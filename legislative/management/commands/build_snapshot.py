@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from legislative.services.columnar import snapshot_folder, write_snapshot
+from legislative.services.csv_service import data_folder_setting
+from legislative.services.snapshot import read_csv_tables
+
+
+class Command(BaseCommand):
+    help = "Compile data/*.csv into the columnar binary snapshot loaded at startup"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--data-folder",
+            default=data_folder_setting(),
+            help="Folder holding the CSVs; the snapshot is written to <folder>/snapshot",
+        )
+
+    def handle(self, *args, **options):
+        data_folder = options["data_folder"]
+
+        start = time.perf_counter()
+        tables = read_csv_tables(data_folder)
+        manifest = write_snapshot(tables, data_folder)
+        elapsed = time.perf_counter() - start
+
+        for table, spec in manifest["tables"].items():
+            columns = ", ".join(
+                f"{column}:{dtype}" for column, dtype in spec["columns"].items()
+            )
+            self.stdout.write(f"{table}: {spec['rows']} rows ({columns})")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Snapshot written to {snapshot_folder(data_folder)} in {elapsed:.2f}s"
+            )
+        )
@@ -0,0 +1,102 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from legislative.cache import page_cache
+from legislative.services.csv_service import data_folder_setting
+from legislative.services.ingest import (INVALID_POLICIES, DatabaseSink,
+                                         IngestError, SnapshotSink, ingest)
+
+
+class Command(BaseCommand):
+    help = (
+        "Load data/*.csv into the database or the binary snapshot, streaming "
+        "vote_results in chunks and checking its legislator and vote references"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--backend",
+            choices=("database", "snapshot"),
+            default="database",
+            help="database: replace the legislative tables; snapshot: build data/snapshot",
+        )
+        parser.add_argument(
+            "--data-folder",
+            default=data_folder_setting(),
+            help="Folder holding legislators.csv, bills.csv, votes.csv and vote_results.csv",
+        )
+        parser.add_argument(
+            "--append",
+            metavar="FOLDER",
+            help=(
+                "Add the rows of the CSVs in FOLDER (any of them may be missing) "
+                "to the data already ingested instead of replacing it; the "
+                "snapshot backend also appends them to the data folder's CSVs"
+            ),
+        )
+        parser.add_argument(
+            "--vote-results",
+            help="vote_results CSV to stream instead of <data-folder>/vote_results.csv",
+        )
+        parser.add_argument("--chunksize", type=int, default=100_000)
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Rows per INSERT for the database backend",
+        )
+        parser.add_argument(
+            "--invalid",
+            choices=INVALID_POLICIES,
+            default="fail",
+            help="What to do with vote results referencing unknown legislators or votes",
+        )
+
+    def handle(self, *args, **options):
+        data_folder = options["data_folder"]
+        incremental = bool(options["append"])
+        sink = (
+            DatabaseSink(batch_size=options["batch_size"], incremental=incremental)
+            if options["backend"] == "database"
+            else SnapshotSink(data_folder, incremental=incremental)
+        )
+
+        def progress(report):
+            if options["verbosity"] > 1:
+                self.stdout.write(
+                    f"vote_results: {report.rows} rows "
+                    f"({report.rows_per_second:,.0f} rows/s)"
+                )
+
+        try:
+            report = ingest(
+                options["append"] or data_folder,
+                sink,
+                chunksize=options["chunksize"],
+                invalid=options["invalid"],
+                vote_results_path=options["vote_results"],
+                on_chunk=progress,
+            )
+        except (IngestError, ValueError) as error:
+            raise CommandError(str(error)) from error
+
+        # Pages are keyed on the dataset version already; clearing also drops
+        # them from a cache shared with the server (e.g. file-based)
+        cache = page_cache()
+        if cache is not None:
+            cache.clear()
+
+        for table, table_report in report.tables.items():
+            invalid = (
+                f", {table_report.invalid} invalid" if table_report.invalid else ""
+            )
+            self.stdout.write(
+                f"{table}: {table_report.rows} rows in {table_report.seconds:.2f}s "
+                f"({table_report.rows_per_second:,.0f} rows/s{invalid})"
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{'Appended to' if incremental else 'Ingested into'} "
+                f"the {options['backend']} backend"
+            )
+        )
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.5 on 2026-10-16 23:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Legislator',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=255)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Bill',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=512)),
+                ('sponsor', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='sponsored_bills', to='legislative.legislator')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Vote',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('bill', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='votes', to='legislative.bill')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='VoteResult',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('vote_type', models.PositiveSmallIntegerField()),
+                ('legislator', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='vote_results', to='legislative.legislator')),
+                ('vote', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='results', to='legislative.vote')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['vote', 'vote_type'], name='vote_result_vote_type_idx'), models.Index(fields=['legislator', 'vote_type'], name='vote_result_leg_type_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-17 00:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('legislative', '0002_dataset_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bill',
+            name='extra',
+            field=models.JSONField(default=dict),
+        ),
+        migrations.AddField(
+            model_name='legislator',
+            name='extra',
+            field=models.JSONField(default=dict),
+        ),
+    ]
@@ -1,3 +1,82 @@
 from django.db import models
 
-# Create your models here.
+# Ids come from the source data files. Relations are declared without database
+# constraints because the source data references legislators and votes that are
+# not part of the dataset (e.g. bill sponsors who are not in legislators.csv);
+# they are nullable so the ORM joins them with LEFT OUTER JOINs.
+
+
+class Legislator(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    name = models.CharField(max_length=255)
+    # Columns of legislators.csv beyond id and name
+    extra = models.JSONField(default=dict)
+
+    def __str__(self):
+        return self.name
+
+
+class Bill(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=512)
+    sponsor = models.ForeignKey(
+        Legislator,
+        null=True,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="sponsored_bills",
+    )
+    # Columns of bills.csv beyond id, title and sponsor_id
+    extra = models.JSONField(default=dict)
+
+    def __str__(self):
+        return self.title
+
+
+class Vote(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    bill = models.ForeignKey(
+        Bill,
+        null=True,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="votes",
+    )
+
+
+class VoteResult(models.Model):
+    YEA = 1
+    NAY = 2
+
+    id = models.BigIntegerField(primary_key=True)
+    legislator = models.ForeignKey(
+        Legislator,
+        null=True,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="vote_results",
+    )
+    vote = models.ForeignKey(
+        Vote,
+        null=True,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="results",
+    )
+    vote_type = models.PositiveSmallIntegerField()
+
+    class Meta:
+        indexes = [
+            # Covering indexes for the per-roll-call and per-legislator tallies
+            models.Index(fields=["vote", "vote_type"], name="vote_result_vote_type_idx"),
+            models.Index(
+                fields=["legislator", "vote_type"], name="vote_result_leg_type_idx"
+            ),
+        ]
+
+
+# A single row counting the loads of the tables. The ingest command bumps it in
+# the transaction writing the rows, so the dataset version is read from it
+# instead of from the tables themselves.
+class DatasetVersion(models.Model):
+    number = models.PositiveBigIntegerField(default=0)
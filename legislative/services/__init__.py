@@ -12,7 +12,9 @@ def get_legislative_service():
         return CSVLegislativeDataService()
 
     if service_type == "database":
-        raise NotImplementedError("Database service not yet implemented")
+        from .database_service import DatabaseLegislativeDataService
+
+        return DatabaseLegislativeDataService()
 
     raise ValueError(f"Unknown service type: {service_type}")
 
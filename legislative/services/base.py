@@ -1,8 +1,39 @@
+import math
 from abc import abstractmethod
-from typing import Callable, List, Optional, TypedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import (Callable, Iterator, List, Optional, Sequence, Tuple,
+                    TypedDict)
 
+import numpy as np
 import pandas as pd
 
+from .records import (BillDetail, BillVote, LegislatorDetail, LegislatorVote,
+                      RollCall, records_frame)
+
+EXPORT_CHUNK_ROWS = 10_000
+# Vote matrix chunks are counted in legislators, each a row with a column per roll call
+MATRIX_CHUNK_ROWS = 100
+
+# Listing columns, in the order of the listing rows
+BILL_COLUMNS = [
+    "id",
+    "title",
+    "sponsor_id",
+    "sponsor",
+    "total_votes",
+    "yea_votes",
+    "nay_votes",
+]
+LEGISLATOR_COLUMNS = [
+    "id",
+    "legislator",
+    "total_votes",
+    "yes_votes",
+    "no_votes",
+    "bills_sponsored",
+]
+
 
 class BillsDataDict(TypedDict, total=True):
     id: int
@@ -23,6 +54,84 @@ class LinkableColumnsList(TypedDict, total=False):
     css_class: str
     """ Function to determine if row should be linked"""
     should_link: Optional[Callable[[dict], bool]]
+    """ Vectorized alternative to should_link: DataFrame -> boolean mask of rows to link"""
+    link_when: Optional[Callable[[pd.DataFrame], pd.Series]]
+
+
+@dataclass
+class TableQuery:
+    """
+    Page, sort and text filter applied to a listing before it is rendered.
+    A page_size of None selects the whole (filtered, sorted) listing.
+
+    after is a keyset cursor, the (sort value, id) of the last row already
+    seen: when set, the page starts right after that row instead of at the
+    page number's offset.
+    """
+
+    page: int = 1
+    page_size: Optional[int] = 50
+    sort: Optional[str] = None
+    descending: bool = False
+    search: str = ""
+    after: Optional[Tuple] = None
+
+    @property
+    def offset(self):
+        if self.page_size is None or self.after is not None:
+            return 0
+        return (self.page - 1) * self.page_size
+
+    @property
+    def stop(self):
+        if self.page_size is None:
+            return None
+        return self.offset + self.page_size
+
+
+class FrameRecords(Sequence):
+    """
+    Rows of a DataFrame selected by position, read as dicts on demand.
+    Lets a large listing page be rendered chunk by chunk without first
+    materializing every row as a dict.
+    """
+
+    def __init__(self, frame: pd.DataFrame, positions: np.ndarray):
+        self.frame = frame
+        self.positions = positions
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return self.frame.iloc[self.positions[item]].to_dict("records")
+        return self.frame.iloc[self.positions[item]].to_dict()
+
+    def __iter__(self):
+        for chunk in self.frames(10_000):
+            yield from chunk.to_dict("records")
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def frames(self, chunk_rows) -> Iterator[pd.DataFrame]:
+        """The rows as consecutive DataFrame chunks (one empty chunk when there are no rows)"""
+        for start in range(0, max(len(self), 1), chunk_rows):
+            yield self.frame.iloc[self.positions[start: start + chunk_rows]]
+
+
+@dataclass
+class TablePage:
+    rows: Sequence[dict]
+    total: int
+    query: TableQuery
+
+    @property
+    def num_pages(self):
+        if self.query.page_size is None:
+            return 1
+        return max(1, math.ceil(self.total / self.query.page_size))
 
 
 class LegislativeDataServiceInterface:
@@ -48,6 +157,16 @@ class LegislativeDataServiceInterface:
     def vote_results(self):
         pass
 
+    @abstractmethod
+    def data_version(self) -> str:
+        """Identifier of the dataset being served; changes whenever the data does"""
+        pass
+
+    @abstractmethod
+    def data_last_modified(self) -> Optional[datetime]:
+        """When the served dataset last changed, None when unknown"""
+        pass
+
     @abstractmethod
     def get_stats(self):
         pass
@@ -60,6 +179,16 @@ class LegislativeDataServiceInterface:
     def get_complete_bills_data(self) -> List[BillsDataDict]:
         pass
 
+    @abstractmethod
+    def query_bills(self, query: TableQuery) -> TablePage:
+        """One page of get_complete_bills_data, filtered on title/sponsor and sorted"""
+        pass
+
+    @abstractmethod
+    def query_legislators(self, query: TableQuery) -> TablePage:
+        """One page of get_complete_legislators_data, filtered on name and sorted"""
+        pass
+
     @abstractmethod
     def render_table(
         self, data: pd.DataFrame, linkable_list: Optional[List[LinkableColumnsList]]
@@ -71,13 +200,58 @@ class LegislativeDataServiceInterface:
         pass
 
     @abstractmethod
-    def get_bill_by_id(self):
+    def get_bill_by_id(self, bill_id, vote_id=None) -> Optional[BillDetail]:
+        """
+        Bill with its roll calls and the voting breakdown of the roll call
+        vote_id (the first one by default). None for an unknown bill, or a
+        vote_id that is not one of the bill's roll calls.
+        """
+        pass
+
+    @abstractmethod
+    def get_legislator_by_id(self, legislator_id) -> Optional[LegislatorDetail]:
+        pass
+
+    @abstractmethod
+    def get_bill_record(self, bill_id) -> Optional[dict]:
+        """The get_complete_bills_data row of one bill, None when unknown"""
         pass
 
     @abstractmethod
-    def get_legislator_by_id(self):
+    def get_legislator_record(self, legislator_id) -> Optional[dict]:
+        """The get_complete_legislators_data row of one legislator, None when unknown"""
         pass
 
+    def get_bill_votes(self, bill_id, vote_id=None) -> Optional[pd.DataFrame]:
+        """
+        Voting breakdown of get_bill_by_id as a DataFrame, one column per
+        LegislatorVote field. None for an unknown bill or roll call.
+        """
+        bill = self.get_bill_by_id(bill_id, vote_id)
+        if bill is None:
+            return None
+        return records_frame(bill.vote_details, LegislatorVote)
+
+    def get_bill_roll_calls(self, bill_id) -> Optional[pd.DataFrame]:
+        """
+        Roll calls of get_bill_by_id as a DataFrame, one column per RollCall
+        field. None for an unknown bill.
+        """
+        bill = self.get_bill_by_id(bill_id)
+        if bill is None:
+            return None
+        return records_frame(bill.roll_calls, RollCall)
+
+    def get_legislator_votes(self, legislator_id) -> Optional[pd.DataFrame]:
+        """
+        Bills voted on of get_legislator_by_id as a DataFrame, one column per
+        BillVote field. None for an unknown legislator.
+        """
+        legislator = self.get_legislator_by_id(legislator_id)
+        if legislator is None:
+            return None
+        return records_frame(legislator.bills_voted_on, BillVote)
+
     @abstractmethod
     def get_legislators_data_for_export(self):
         """Get legislators data without HTML formatting for CSV export"""
@@ -87,3 +261,37 @@ class LegislativeDataServiceInterface:
     def get_bills_data_for_export(self):
         """Get bills data without HTML formatting for CSV export"""
         pass
+
+    @abstractmethod
+    def iter_legislators_export(
+        self, chunk_rows=EXPORT_CHUNK_ROWS
+    ) -> Iterator[pd.DataFrame]:
+        """get_legislators_data_for_export as DataFrame chunks of at most chunk_rows rows"""
+        pass
+
+    @abstractmethod
+    def iter_bills_export(self, chunk_rows=EXPORT_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+        """get_bills_data_for_export as DataFrame chunks of at most chunk_rows rows"""
+        pass
+
+    @abstractmethod
+    def iter_vote_positions_export(
+        self, chunk_rows=EXPORT_CHUNK_ROWS
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Sparse vote matrix: one row per vote result with legislator_id,
+        bill_id, vote_id and vote_type, in DataFrame chunks
+        """
+        pass
+
+    @abstractmethod
+    def iter_vote_matrix_export(
+        self, chunk_rows=MATRIX_CHUNK_ROWS
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Dense vote matrix: one row per legislator and one column per roll call
+        on a bill of the dataset, labelled "<bill_id>:<vote_id>" and ordered
+        by bill then vote id, holding the vote_type (0 for no vote), in chunks
+        of chunk_rows legislators
+        """
+        pass
@@ -0,0 +1,466 @@
+"""
+Columnar binary snapshot of the legislative tables.
+
+Each column is stored as its own .npy file under `<data>/snapshot/<table>/`,
+with a manifest.json recording the row counts and dtypes. Columns keep the
+dtypes given by the schema registry; categorical text is stored as a codes
+array plus a fixed-width unicode categories array. The foreign key
+groupings of the lookup index are stored alongside under `index/`, and the
+vote tallies under `tallies/`. Loading is a raw array read per column instead
+of CSV parsing, and with mmap_mode="r" every process maps the same page-cache
+pages instead of holding a copy. SnapshotAppender adds rows to a snapshot,
+updating its groupings and tallies from the new rows alone.
+"""
+
+import io
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+from .indexes import GROUPINGS, DatasetIndex, GroupedRows
+from .schema import SCHEMAS, TEXT, apply_schema
+from .tally import VoteTallies
+
+SNAPSHOT_DIRNAME = "snapshot"
+MANIFEST = "manifest.json"
+TALLIES_DIRNAME = "tallies"
+# Snapshots written in another format are ignored until rebuilt
+FORMAT_VERSION = 4
+
+
+def snapshot_folder(data_folder):
+    return os.path.join(data_folder, SNAPSHOT_DIRNAME)
+
+
+def compact_integers(values: np.ndarray) -> np.ndarray:
+    """Narrow an integer array to int32 when every value fits"""
+    info = np.iinfo(np.int32)
+    if len(values) and values.min() >= info.min and values.max() <= info.max:
+        return values.astype(np.int32)
+    return values
+
+
+def save_column(folder, column, series: pd.Series):
+    """Write one column; returns the dtype recorded in the manifest"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Fixed-width unicode keeps the file free of pickled objects
+        np.save(os.path.join(folder, f"{column}.codes.npy"), series.cat.codes.to_numpy())
+        np.save(
+            os.path.join(folder, f"{column}.categories.npy"),
+            series.cat.categories.to_numpy(dtype=str),
+        )
+        return TEXT
+
+    np.save(os.path.join(folder, f"{column}.npy"), series.to_numpy())
+    return str(series.dtype)
+
+
+def load_column(folder, column, dtype, mmap_mode=None):
+    if dtype == TEXT:
+        codes = np.load(os.path.join(folder, f"{column}.codes.npy"), mmap_mode=mmap_mode)
+        categories = np.load(os.path.join(folder, f"{column}.categories.npy"))
+        return pd.Categorical.from_codes(codes, categories.astype(object))
+
+    return np.load(os.path.join(folder, f"{column}.npy"), mmap_mode=mmap_mode)
+
+
+def write_frames(folder, frames):
+    """
+    Write DataFrames column by column under folder/<name>/, each index as
+    its first column; returns their manifest entries
+    """
+    specs = {}
+    for name, frame in frames.items():
+        frame = frame.reset_index()
+        os.makedirs(os.path.join(folder, name), exist_ok=True)
+        specs[name] = {
+            "rows": len(frame),
+            "columns": {
+                column: save_column(os.path.join(folder, name), column, frame[column])
+                for column in frame.columns
+            },
+        }
+    return specs
+
+
+def write_groupings(folder, groupings):
+    for name, grouped in groupings.items():
+        os.makedirs(os.path.join(folder, "index", name), exist_ok=True)
+        for array_name, array in grouped.arrays().items():
+            np.save(
+                os.path.join(folder, "index", name, f"{array_name}.npy"),
+                compact_integers(array),
+            )
+
+
+def write_manifest(folder, manifest):
+    """Write the manifest in one rename, so it is never read half written"""
+    staged = os.path.join(folder, f"{MANIFEST}.tmp-{os.getpid()}")
+    with open(staged, "w", encoding="utf-8") as file:
+        json.dump(manifest, file, indent=2)
+    os.replace(staged, os.path.join(folder, MANIFEST))
+
+
+def read_manifest(folder):
+    with open(os.path.join(folder, MANIFEST), encoding="utf-8") as file:
+        return json.load(file)
+
+
+class SnapshotWriter:
+    """
+    Builds a snapshot in a staging folder and publishes it with one rename.
+
+    Tables are either written whole (write_table) or streamed chunk by chunk
+    (append), in which case each column is appended to a raw file and given
+    its .npy header once the row count is known. Streamed columns must use
+    fixed-width dtypes, so a streamed table may not have text columns.
+    """
+
+    def __init__(self, data_folder):
+        self.target = snapshot_folder(data_folder)
+        self.staging = f"{self.target}.tmp-{os.getpid()}"
+        shutil.rmtree(self.staging, ignore_errors=True)
+        os.makedirs(self.staging)
+        self.manifest = {
+            "format": FORMAT_VERSION,
+            "built_at": time.time(),
+            "tables": {},
+        }
+        self._streams = {}
+
+    def write_table(self, table, frame: pd.DataFrame):
+        frame = apply_schema(table, frame)
+        folder = os.path.join(self.staging, table)
+        os.makedirs(folder)
+        written = {
+            column: save_column(folder, column, frame[column])
+            for column in frame.columns
+        }
+        self.manifest["tables"][table] = {"rows": len(frame), "columns": written}
+
+    def append(self, table, chunk: pd.DataFrame):
+        """Append a chunk already cast to the schema dtypes"""
+        stream = self._streams.get(table)
+        if stream is None:
+            os.makedirs(os.path.join(self.staging, table))
+            stream = self._streams[table] = {"rows": 0, "columns": {}}
+
+        for column in chunk.columns:
+            values = chunk[column].to_numpy()
+            dtype = stream["columns"].setdefault(column, values.dtype)
+            if values.dtype != dtype:
+                raise ValueError(
+                    f"{table}.{column} changed dtype from {dtype} to {values.dtype}"
+                )
+            path = os.path.join(self.staging, table, f"{column}.raw")
+            with open(path, "ab") as file:
+                file.write(values.tobytes())
+        stream["rows"] += len(chunk)
+
+    def _finish_streams(self):
+        for table, stream in self._streams.items():
+            for column, dtype in stream["columns"].items():
+                raw = os.path.join(self.staging, table, f"{column}.raw")
+                with open(
+                    os.path.join(self.staging, table, f"{column}.npy"), "wb"
+                ) as out, open(raw, "rb") as source:
+                    np.lib.format.write_array_header_1_0(
+                        out,
+                        {
+                            "descr": np.lib.format.dtype_to_descr(dtype),
+                            "fortran_order": False,
+                            "shape": (stream["rows"],),
+                        },
+                    )
+                    shutil.copyfileobj(source, out, 1 << 20)
+                os.remove(raw)
+            self.manifest["tables"][table] = {
+                "rows": stream["rows"],
+                "columns": {
+                    column: str(dtype) for column, dtype in stream["columns"].items()
+                },
+            }
+
+    def finish(self):
+        """Write the index groupings and manifest, then publish the snapshot"""
+        self._finish_streams()
+
+        # Groupings and tallies are built from the staged files,
+        # memory-mapped, so a streamed table is never fully loaded into memory
+        tables = read_tables(self.staging, self.manifest["tables"], mmap_mode="r")
+        index = DatasetIndex(**tables)
+        write_groupings(
+            self.staging, {name: getattr(index, name) for name in GROUPINGS}
+        )
+        tallies = VoteTallies(
+            tables["legislators"], tables["votes"], tables["vote_results"], index
+        )
+        self.manifest["tallies"] = write_frames(
+            os.path.join(self.staging, TALLIES_DIRNAME), tallies.frames()
+        )
+
+        write_manifest(self.staging, self.manifest)
+
+        previous = f"{self.target}.old-{os.getpid()}"
+        if os.path.exists(self.target):
+            os.rename(self.target, previous)
+        os.rename(self.staging, self.target)
+        shutil.rmtree(previous, ignore_errors=True)
+        return self.manifest
+
+    def abort(self):
+        shutil.rmtree(self.staging, ignore_errors=True)
+
+
+def write_snapshot(tables, data_folder):
+    """Write tables to the snapshot folder, replacing any previous snapshot in one rename"""
+    writer = SnapshotWriter(data_folder)
+    for table in SCHEMAS:
+        writer.write_table(table, tables[table])
+    return writer.finish()
+
+
+def read_tables(folder, specs, mmap_mode=None):
+    """DataFrames of the manifest entries specs, keyed like them"""
+    tables = {}
+    for table, spec in specs.items():
+        # copy=False keeps memory-mapped columns backed by the file
+        tables[table] = pd.DataFrame(
+            {
+                column: load_column(
+                    os.path.join(folder, table), column, dtype, mmap_mode
+                )
+                for column, dtype in spec["columns"].items()
+            },
+            copy=False,
+        )
+    return tables
+
+
+def read_snapshot(data_folder, mmap_mode=None):
+    """Load every table from the snapshot folder as DataFrames"""
+    folder = snapshot_folder(data_folder)
+    return read_tables(folder, read_manifest(folder)["tables"], mmap_mode)
+
+
+def read_groupings(data_folder, mmap_mode=None):
+    """Prebuilt GroupedRows for the lookup index, keyed by DatasetIndex attribute"""
+    folder = os.path.join(snapshot_folder(data_folder), "index")
+    return {
+        name: GroupedRows.from_arrays(
+            **{
+                array_name: np.load(
+                    os.path.join(folder, name, f"{array_name}.npy"),
+                    mmap_mode=mmap_mode,
+                )
+                for array_name in ("order", "keys", "starts", "stops")
+            }
+        )
+        for name in GROUPINGS
+    }
+
+
+def read_tallies(data_folder) -> VoteTallies:
+    """The vote tallies stored with the snapshot"""
+    folder = snapshot_folder(data_folder)
+    frames = read_tables(
+        os.path.join(folder, TALLIES_DIRNAME), read_manifest(folder)["tallies"]
+    )
+    return VoteTallies.from_frames(
+        **{name: frame.set_index(frame.columns[0]) for name, frame in frames.items()}
+    )
+
+
+def manifest_path(data_folder):
+    return os.path.join(snapshot_folder(data_folder), MANIFEST)
+
+
+def snapshot_is_fresh(data_folder, csv_paths):
+    """
+    True when a snapshot in the current format exists and was built after
+    every CSV was last modified
+    """
+    try:
+        built = os.stat(manifest_path(data_folder)).st_mtime_ns
+        manifest = read_manifest(snapshot_folder(data_folder))
+    except FileNotFoundError:
+        return False
+    return manifest.get("format") == FORMAT_VERSION and all(
+        built > os.stat(path).st_mtime_ns for path in csv_paths
+    )
+
+
+class SnapshotAppender:
+    """
+    Adds rows to the tables of an existing snapshot, bringing its index
+    groupings and vote tallies up to date from the new rows alone.
+
+    legislators, bills and votes are small and rewritten whole. vote_results
+    chunks are written past the end of the column files and only become part
+    of them when finish() rewrites the .npy headers, so no reader sees a
+    partial append. Other files are replaced by rename, which leaves the
+    arrays of processes memory-mapping the snapshot intact. The manifest goes
+    last; callers append to the CSVs first, so a snapshot whose update did
+    not finish is older than the CSVs and ignored until rebuilt.
+    """
+
+    def __init__(self, data_folder):
+        self.data_folder = data_folder
+        self.folder = snapshot_folder(data_folder)
+        self.staging = f"{self.folder}.tmp-{os.getpid()}"
+        self.manifest = read_manifest(self.folder)
+        self.tables = read_tables(self.folder, self.manifest["tables"], mmap_mode="r")
+        self.added = {}
+        self.appended_rows = 0
+
+        # vote_results column -> (file, header length, dtype), cut back to
+        # the manifest's rows in case an earlier append did not finish
+        self._columns = {}
+        spec = self.manifest["tables"]["vote_results"]
+        for column, dtype in spec["columns"].items():
+            if dtype == TEXT:
+                raise ValueError(f"vote_results.{column} is text and cannot be appended to")
+            path = os.path.join(self.folder, "vote_results", f"{column}.npy")
+            with open(path, "r+b") as file:
+                read_header = (
+                    np.lib.format.read_array_header_1_0
+                    if np.lib.format.read_magic(file) == (1, 0)
+                    else np.lib.format.read_array_header_2_0
+                )
+                _, _, dtype = read_header(file)
+                header_length = file.tell()
+                file.truncate(header_length + spec["rows"] * dtype.itemsize)
+            self._columns[column] = (path, header_length, dtype)
+
+    def write_table(self, table, frame: pd.DataFrame):
+        """Rows to add to one of the small tables"""
+        if list(frame.columns) != list(self.tables[table].columns):
+            raise ValueError(
+                f"{table} columns {list(frame.columns)} differ from the "
+                f"snapshot's {list(self.tables[table].columns)}"
+            )
+        self.added[table] = frame
+
+    def append(self, table, chunk: pd.DataFrame):
+        """Append a vote_results chunk already cast to the schema dtypes"""
+        if table != "vote_results":
+            raise ValueError(f"Only vote_results is appended to in chunks, not {table}")
+        if set(chunk.columns) != set(self._columns):
+            raise ValueError(
+                f"vote_results columns {list(chunk.columns)} differ from the "
+                f"snapshot's {list(self._columns)}"
+            )
+        for column, (path, _, dtype) in self._columns.items():
+            values = chunk[column].to_numpy()
+            if values.dtype != dtype:
+                raise ValueError(
+                    f"vote_results.{column} is {values.dtype}, the snapshot holds {dtype}"
+                )
+            with open(path, "ab") as file:
+                file.write(values.tobytes())
+        self.appended_rows += len(chunk)
+
+    def _finish_vote_results(self):
+        spec = self.manifest["tables"]["vote_results"]
+        spec["rows"] += self.appended_rows
+        for column, (path, header_length, dtype) in self._columns.items():
+            header = io.BytesIO()
+            np.lib.format.write_array_header_1_0(
+                header,
+                {
+                    "descr": np.lib.format.dtype_to_descr(dtype),
+                    "fortran_order": False,
+                    "shape": (spec["rows"],),
+                },
+            )
+            if len(header.getvalue()) == header_length:
+                with open(path, "r+b") as file:
+                    file.write(header.getvalue())
+                continue
+
+            # Written by a numpy that left no room for the shape to grow
+            staged = f"{path}.tmp-{os.getpid()}"
+            with open(staged, "wb") as out, open(path, "rb") as source:
+                out.write(header.getvalue())
+                source.seek(header_length)
+                shutil.copyfileobj(source, out, 1 << 20)
+            os.replace(staged, path)
+
+    def finish(self):
+        """Write the appended rows, groupings and tallies, then the manifest"""
+        shutil.rmtree(self.staging, ignore_errors=True)
+        os.makedirs(self.staging)
+
+        appended_from = self.manifest["tables"]["vote_results"]["rows"]
+        tables = dict(self.tables)
+        for table, frame in self.added.items():
+            tables[table] = apply_schema(
+                table, pd.concat([self.tables[table], frame], ignore_index=True)
+            )
+            os.makedirs(os.path.join(self.staging, table))
+            self.manifest["tables"][table] = {
+                "rows": len(tables[table]),
+                "columns": {
+                    column: save_column(
+                        os.path.join(self.staging, table), column, tables[table][column]
+                    )
+                    for column in tables[table].columns
+                },
+            }
+
+        self._finish_vote_results()
+        tables["vote_results"] = read_tables(
+            self.folder,
+            {"vote_results": self.manifest["tables"]["vote_results"]},
+            mmap_mode="r",
+        )["vote_results"]
+
+        # Groupings over vote_results take the appended rows at the end of
+        # their groups; those over the small tables are rebuilt
+        previous = read_groupings(self.data_folder, mmap_mode="r")
+        groupings = {}
+        for name, (table, column, within) in GROUPINGS.items():
+            if table == "vote_results" and within is None:
+                groupings[name] = previous[name].extended(
+                    tables[table][column].iloc[appended_from:], appended_from
+                )
+            else:
+                groupings[name] = GroupedRows(
+                    tables[table][column],
+                    None if within is None else tables[table][within],
+                )
+        write_groupings(self.staging, groupings)
+
+        tallies = read_tallies(self.data_folder).extended(
+            tables["legislators"],
+            tables["votes"],
+            tables["vote_results"],
+            DatasetIndex(**tables, groupings=groupings),
+            appended_from,
+        )
+        self.manifest["tallies"] = write_frames(
+            os.path.join(self.staging, TALLIES_DIRNAME), tallies.frames()
+        )
+
+        for folder, _, files in os.walk(self.staging):
+            target = os.path.join(self.folder, os.path.relpath(folder, self.staging))
+            os.makedirs(target, exist_ok=True)
+            for name in files:
+                os.replace(os.path.join(folder, name), os.path.join(target, name))
+        shutil.rmtree(self.staging, ignore_errors=True)
+
+        self.manifest["appended_at"] = time.time()
+        write_manifest(self.folder, self.manifest)
+        return self.manifest
+
+    def abort(self):
+        """Drop the vote_results rows written so far"""
+        rows = self.manifest["tables"]["vote_results"]["rows"]
+        for path, header_length, dtype in self._columns.values():
+            with open(path, "r+b") as file:
+                file.truncate(header_length + rows * dtype.itemsize)
+        shutil.rmtree(self.staging, ignore_errors=True)
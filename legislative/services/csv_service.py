@@ -1,76 +1,145 @@
 import os
-from functools import lru_cache, partial
-from typing import List
+from datetime import datetime, timezone
+from functools import partial
+from typing import Iterator, List
 
+import numpy as np
 import pandas as pd
 from django.conf import settings
-
-from .base import (BillsDataDict, LegislativeDataServiceInterface,
-                   LinkableColumnsList)
-
-
-class CSVLegislativeDataService(LegislativeDataServiceInterface):
+from pandas.api.extensions import take
+
+from .base import (EXPORT_CHUNK_ROWS, MATRIX_CHUNK_ROWS, BillsDataDict,
+                   FrameRecords, LegislativeDataServiceInterface, TablePage,
+                   TableQuery)
+from .details import DetailCache
+from .metrics import record_cache, record_rows
+from .records import (BillDetail, BillVote, LegislatorDetail, LegislatorVote,
+                      RollCall, SponsoredBill, frame_records,
+                      select_roll_call, vote_breakdown)
+from .rendering import HTMLRenderingMixin, data_chunks
+from .schema import fill_text
+from .snapshot import (SnapshotManager, SnapshotPinning, snapshot_cached,
+                       uses_snapshot)
+
+
+def data_folder_setting():
+    return str(
+        getattr(settings, "LEGISLATIVE_DATA_FOLDER", None)
+        or os.path.join(settings.BASE_DIR, "data")
+    )
+
+
+class CSVLegislativeDataService(
+    SnapshotPinning, HTMLRenderingMixin, LegislativeDataServiceInterface
+):
     """CSV-based implementation with simple dynamic column support"""
 
-    def __init__(self):
-        self.data_folder = os.path.join(settings.BASE_DIR, "data")
+    def __init__(self, data_folder=None, reload_interval=None):
+        self.data_folder = data_folder or data_folder_setting()
+        if reload_interval is None:
+            reload_interval = getattr(
+                settings, "LEGISLATIVE_DATA_RELOAD_INTERVAL", None)
+        self.precompute_details = getattr(
+            settings, "LEGISLATIVE_DETAIL_PRECOMPUTE", False)
+        self.datasets = SnapshotManager(
+            self.data_folder,
+            reload_interval=reload_interval,
+            warm=self.warm,
+            mmap=getattr(settings, "LEGISLATIVE_DATA_MMAP", False),
+            published=self.published,
+        )
 
-    # Data loading properties
+    # Data loading properties, all served from the current dataset snapshot
     @property
-    @lru_cache(maxsize=1)
     def legislators(self):
-        return pd.read_csv(os.path.join(self.data_folder, "legislators.csv"))
+        return self.snapshot.legislators
 
     @property
-    @lru_cache(maxsize=1)
     def bills(self):
-        return pd.read_csv(os.path.join(self.data_folder, "bills.csv"))
+        return self.snapshot.bills
 
     @property
-    @lru_cache(maxsize=1)
     def votes(self):
-        return pd.read_csv(os.path.join(self.data_folder, "votes.csv"))
+        return self.snapshot.votes
 
     @property
-    @lru_cache(maxsize=1)
     def vote_results(self):
-        return pd.read_csv(os.path.join(self.data_folder, "vote_results.csv"))
-
-    # Helper methods
-    def make_link(self, url_pattern, item_id, text, css_class=""):
-        """Create HTML link"""
-        class_attr = f' class="{css_class}"' if css_class else ""
-        return f'<a href="{url_pattern.format(id=item_id)}"{class_attr}>{text}</a>'
-
-    def format_date(self, date_str):
-        """Format date string"""
-        if pd.isna(date_str) or date_str == "":
-            return "N/A"
-        try:
-            return pd.to_datetime(date_str).strftime("%Y-%m-%d")
-        except (ValueError, TypeError):
-            return str(date_str)
-
-    @lru_cache(maxsize=1)
-    def get_complete_bills_data(self) -> List[BillsDataDict]:
+        return self.snapshot.vote_results
 
-        vote_counts = (
-            self.vote_results.merge(
-                self.votes, left_on="vote_id", right_on="id")
-            .groupby("bill_id")
-            .agg(
-                {
-                    "vote_type": [
-                        "count",
-                        lambda x: (x == 1).sum(),
-                        lambda x: (x == 2).sum(),
-                    ]
-                }
-            )
-            .reset_index()
+    @property
+    def index(self):
+        """Lookup index used by the detail methods, built once per dataset"""
+        return self.snapshot.index
+
+    @property
+    def tallies(self):
+        """Vote counts per roll call, bill and legislator, computed once per dataset"""
+        return self.snapshot.tallies
+
+    def warm(self, snapshot):
+        """Precompute the listing aggregates of a freshly loaded snapshot before it is published"""
+        with self.pinned(snapshot):
+            self.get_stats()
+            self.get_complete_bills_data()
+            self.get_complete_legislators_data()
+
+    def published(self, snapshot):
+        """Start precomputing the detail payloads of a snapshot that just became current"""
+        if not self.precompute_details:
+            return
+
+        previous = getattr(self, "_detail_cache", None)
+        if previous is not None:
+            previous.stop()
+
+        details = DetailCache(
+            getattr(settings, "LEGISLATIVE_DETAIL_PRECOMPUTE_MAX_BYTES", 256 << 20)
         )
-        vote_counts.columns = ["bill_id",
-                               "total_votes", "yea_votes", "nay_votes"]
+        snapshot.memoize("detail_cache", lambda: details)
+        self._detail_cache = details
+        details.start(self._detail_jobs(), partial(self.pinned, snapshot))
+
+    def _detail_jobs(self):
+        """
+        (key, factory) for every legislator then every bill, most-voted first.
+        Legislator pages come first as they cost the most to compute.
+        """
+        legislators = self.get_complete_legislators_frame()
+        for legislator_id in legislators.sort_values(
+            "total_votes", ascending=False, kind="stable"
+        )["id"]:
+            yield ("legislator", int(legislator_id)), partial(
+                self._legislator_details, legislator_id
+            )
+
+        bills = self.get_complete_bills_frame()
+        for bill_id in bills.sort_values(
+            "total_votes", ascending=False, kind="stable"
+        )["id"]:
+            yield ("bill", int(bill_id)), partial(self._bill_details, bill_id)
+
+    def _precomputed(self, kind, item_id):
+        details = self.snapshot.memoized("detail_cache")
+        if details is None:
+            return None
+        payload = details.get((kind, item_id))
+        record_cache("details", payload is not None)
+        return payload
+
+    @snapshot_cached
+    def get_bill_vote_counts(self) -> pd.DataFrame:
+        """
+        Per-bill yea/nay/total tallies across all roll calls, indexed by bill_id.
+        Shared by the listing and detail views.
+        """
+        return self.tallies.by_bill.rename(
+            columns={"total": "total_votes", "yea": "yea_votes", "nay": "nay_votes"}
+        )[["total_votes", "yea_votes", "nay_votes"]]
+
+    @snapshot_cached
+    def get_complete_bills_frame(self) -> pd.DataFrame:
+        """Bills listing as a DataFrame, the form paging, sorting and filtering run on"""
+        vote_counts = self.get_bill_vote_counts().reset_index()
 
         result = (
             self.bills.merge(
@@ -86,10 +155,10 @@ class CSVLegislativeDataService(LegislativeDataServiceInterface):
                     "total_votes": 0,
                     "yea_votes": 0,
                     "nay_votes": 0,
-                    "name": "Unknown Sponsor",
                 }
             )
         )
+        result["name"] = fill_text(result["name"], "Unknown Sponsor")
 
         # Convert vote counts to int otherwise they will show up as float
         result[["total_votes", "yea_votes", "nay_votes"]] = result[
@@ -99,53 +168,29 @@ class CSVLegislativeDataService(LegislativeDataServiceInterface):
         base_output = {
             "id": result["id"],
             "title": result["title"],
-            "sponsor_id": result["sponsor_id"],
+            # Nullable, so bills without a sponsor keep integer ids for the rest
+            "sponsor_id": result["sponsor_id"].astype("Int64"),
             "sponsor": result["name"],
             "total_votes": result["total_votes"],
             "yea_votes": result["yea_votes"],
             "nay_votes": result["nay_votes"],
         }
 
-        return pd.DataFrame(base_output).to_dict("records")
+        return pd.DataFrame(base_output)
 
-    @lru_cache(maxsize=1)
-    def get_complete_legislators_data(self):
-
-        complete_data = self.legislators.merge(
-            self.vote_results.merge(
-                self.votes.merge(
-                    self.bills,
-                    left_on="bill_id",
-                    right_on="id",
-                    how="left",
-                    suffixes=("", "_bill"),
-                ),
-                left_on="vote_id",
-                right_on="id",
-                how="left",
-                suffixes=("", "_vr"),
-            ),
-            left_on="id",
-            right_on="legislator_id",
-            how="left",
-            suffixes=("", "_votes"),
-        )
+    @snapshot_cached
+    def get_complete_bills_data(self) -> List[BillsDataDict]:
+        return self.get_complete_bills_frame().to_dict("records")
 
+    @snapshot_cached
+    def get_complete_legislators_frame(self) -> pd.DataFrame:
+        """Legislators listing as a DataFrame, the form paging, sorting and filtering run on"""
         vote_counts = (
-            complete_data.groupby("legislator_id")
-            .agg(
-                {
-                    "vote_type": [
-                        "count",
-                        lambda x: (x == 1).sum(),
-                        lambda x: (x == 2).sum(),
-                    ],
-                }
-            )
+            self.tallies.by_legislator.rename(
+                columns={"total": "total_votes", "yea": "yes_votes", "nay": "no_votes"}
+            )[["total_votes", "yes_votes", "no_votes"]]
             .reset_index()
         )
-        vote_counts.columns = ["legislator_id",
-                               "total_votes", "yes_votes", "no_votes"]
 
         bills_sponsored = (
             self.bills.groupby("sponsor_id").size(
@@ -176,54 +221,98 @@ class CSVLegislativeDataService(LegislativeDataServiceInterface):
             "bills_sponsored": result["bills_sponsored"],
         }
 
-        return pd.DataFrame(base_output).to_dict("records")
-
-    def render_table(
-        self, data, linkable_list: List[LinkableColumnsList] = []
-    ) -> pd.DataFrame:
-        """Render DataFrame as HTML table"""
-        df_to_render = pd.DataFrame(data)
-
-        def format_cell(row, column_item, should_link_fn):
-            """Helper function to format individual cells"""
-            return (
-                self.make_link(
-                    f"/{column_item['url_pattern']}/{row[column_item['item_id']]}/",
-                    row[column_item["item_id"]],
-                    row[column_item["name"]],
-                    column_item["css_class"],
-                )
-                if not should_link_fn or should_link_fn(row)
-                else row[column_item["name"]]
-            )
-
-        if linkable_list:
-            for column_item in linkable_list:
-                should_link_fn = column_item.get("should_link")
-                # Use partial to avoid cell-var-from-loop issue
-                formatter = partial(
-                    format_cell, column_item=column_item, should_link_fn=should_link_fn
-                )
+        return pd.DataFrame(base_output)
 
-                df_to_render[column_item["column_name"]] = df_to_render.apply(
-                    formatter, axis=1
+    @snapshot_cached
+    def get_complete_legislators_data(self):
+        return self.get_complete_legislators_frame().to_dict("records")
+
+    def _sorted_positions(self, listing, frame, column, descending):
+        """Row order of a listing sorted on column, computed once per snapshot"""
+
+        def sort():
+            # Ordering by id first makes ties come out in id order, as in SQL
+            by_id = np.argsort(frame["id"].to_numpy(), kind="stable")
+            if column is None:
+                return by_id[::-1] if descending else by_id
+            values = frame[column].iloc[by_id].reset_index(drop=True)
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                # Categories are not in lexical order once fill values are added
+                values = values.astype(str)
+            order = values.sort_values(ascending=not descending, kind="stable").index
+            return by_id[order.to_numpy()]
+
+        return self.snapshot.memoize((listing, column, descending), sort)
+
+    def _sort_keys(self, listing, frame, column, descending):
+        """(sort values, ids) of a listing's rows in sorted order, for keyset cursors"""
+
+        def keys():
+            order = self._sorted_positions(listing, frame, column, descending)
+            values = np.asarray(frame[column or "id"])[order]
+            return values, frame["id"].to_numpy()[order]
+
+        return self.snapshot.memoize((listing, column, descending, "keys"), keys)
+
+    def _seek(self, listing, frame, query: TableQuery):
+        """Position in the sorted listing of the first row after query.after"""
+        values, ids = self._sort_keys(listing, frame, query.sort, query.descending)
+        value, after_id = query.after
+        if query.descending:
+            reversed_values = values[::-1]
+            low = len(values) - np.searchsorted(reversed_values, value, "right")
+            high = len(values) - np.searchsorted(reversed_values, value, "left")
+        else:
+            low = np.searchsorted(values, value, "left")
+            high = np.searchsorted(values, value, "right")
+        # Rows sharing the sort value are in id order
+        return int(low + np.searchsorted(ids[low:high], after_id, "right"))
+
+    def _query_frame(self, listing, frame, query: TableQuery, search_columns):
+        positions = self._sorted_positions(
+            listing, frame, query.sort, query.descending)
+        start = query.offset
+        if query.after is not None:
+            start = self._seek(listing, frame, query)
+
+        if query.search:
+            matches = np.zeros(len(frame), dtype=bool)
+            for column in search_columns:
+                matches |= (
+                    frame[column]
+                    .str.contains(query.search, case=False, regex=False)
+                    .fillna(False)
+                    .to_numpy(dtype=bool)
                 )
+            matches = matches[positions]
+            if query.after is not None:
+                start = int(np.count_nonzero(matches[:start]))
+            positions = positions[matches]
+
+        stop = None if query.page_size is None else start + query.page_size
+        rows = FrameRecords(frame, positions[start:stop])
+        record_rows(f"query_{listing}", len(rows))
+        return TablePage(rows=rows, total=len(positions), query=query)
+
+    @uses_snapshot
+    def query_bills(self, query: TableQuery) -> TablePage:
+        return self._query_frame(
+            "bills", self.get_complete_bills_frame(), query, ["title", "sponsor"]
+        )
 
-        # Filter out ID columns before displaying: remove columns that end with '_id' or are just 'id'
-        id_columns = [
-            col for col in df_to_render.columns if col.endswith("_id") or col == "id"
-        ]
-        df_to_render = df_to_render.drop(columns=id_columns)
-
-        return df_to_render.to_html(
-            classes="table table-striped table-hover",
-            justify="left",
-            escape=False,
-            index=False,
-            border=0,
+    @uses_snapshot
+    def query_legislators(self, query: TableQuery) -> TablePage:
+        return self._query_frame(
+            "legislators", self.get_complete_legislators_frame(), query, ["legislator"]
         )
 
-    @lru_cache(maxsize=1)
+    def data_version(self) -> str:
+        return self.snapshot.version
+
+    def data_last_modified(self) -> datetime:
+        return datetime.fromtimestamp(self.snapshot.last_modified, tz=timezone.utc)
+
+    @snapshot_cached
     def get_stats(self):
         return {
             "legislators_count": len(self.legislators),
@@ -231,227 +320,270 @@ class CSVLegislativeDataService(LegislativeDataServiceInterface):
             "votes_count": len(self.vote_results),
         }
 
-    def get_bill_by_id(self, bill_id):
+    def _legislator_names(self, legislator_ids):
+        """Names for the given legislator ids via the id index (NaN where unknown)"""
+        positions = self.index.legislator_positions(legislator_ids)
+        return take(self.legislators["name"].array, positions, allow_fill=True)
+
+    @uses_snapshot
+    def get_bill_by_id(self, bill_id, vote_id=None):
         """
-        Returns detailed bill information with sponsor name, vote counts, and voting breakdown.
+        Returns detailed bill information with sponsor name, vote counts, its
+        roll calls and the voting breakdown of one of them.
         """
-        bill_with_sponsor = self.bills[self.bills["id"] == bill_id].merge(
-            self.legislators[["id", "name"]],
-            left_on="sponsor_id",
-            right_on="id",
-            how="left",
-            suffixes=("", "_legislator"),
-        )
+        if vote_id is None:
+            precomputed = self._precomputed("bill", bill_id)
+            if precomputed is not None:
+                return precomputed
+        return self._bill_details(bill_id, vote_id)
 
-        if bill_with_sponsor.empty:
+    def _bill_details(self, bill_id, vote_id=None):
+        bill_position = self.index.bill_position(bill_id)
+
+        if bill_position is None:
             return None
 
-        bill_info = bill_with_sponsor.iloc[0]
+        bill_info = self.bills.iloc[bill_position]
 
-        sponsor_name = (
-            bill_info["name"] if pd.notna(
-                bill_info["name"]) else "Unknown Sponsor"
-        )
         sponsor_id = bill_info["sponsor_id"]
-
-        bill_votes_query = self.votes[self.votes["bill_id"] == bill_id]
-
-        if bill_votes_query.empty:
-            return {
-                "id": bill_info["id"],
-                "title": bill_info["title"],
-                "sponsor_name": sponsor_name,
-                "sponsor_id": sponsor_id,
-                "total_votes": 0,
-                "supporters": 0,
-                "opposers": 0,
-                "vote_details": [],
-                **{
-                    col: bill_info.get(col, None)
-                    for col in self.bills.columns
-                    if col not in ["id", "title", "sponsor_id"]
-                },
-            }
-
-        vote_id = bill_votes_query.iloc[0]["id"]
-
-        vote_results = self.vote_results[self.vote_results["vote_id"] == vote_id]
-
-        supporters = len(vote_results[vote_results["vote_type"] == 1])
-        opposers = len(vote_results[vote_results["vote_type"] == 2])
-        total_votes = len(vote_results)
-
-        vote_details = vote_results.merge(
-            self.legislators, left_on="legislator_id", right_on="id", how="left"
+        sponsor_name = self._legislator_names([sponsor_id])[0]
+
+        bill = BillDetail(
+            id=int(bill_info["id"]),
+            title=bill_info["title"],
+            sponsor_id=None if pd.isna(sponsor_id) else int(sponsor_id),
+            sponsor_name=None if pd.isna(sponsor_name) else sponsor_name,
+            extra={
+                col: bill_info.get(col, None)
+                for col in self.bills.columns
+                if col not in ["id", "title", "sponsor_id"]
+            },
         )
 
-        styled_vote_details = []
-        for _, row in vote_details.iterrows():
-            legislator_name = (
-                row["name"]
-                if pd.notna(row["name"])
-                else f"Unknown Legislator ({row['legislator_id']})"
-            )
-            vote_badge = (
-                '<span class="badge bg-success">Yes</span>'
-                if row["vote_type"] == 1
-                else '<span class="badge bg-danger">No</span>'
+        # The roll call tallies are rows of the per-vote tallies, found
+        # through the bill's timeline in the index
+        roll_call_tallies = self.tallies.by_vote.iloc[self.index.roll_calls(bill_id)]
+        bill.roll_calls = list(
+            map(
+                RollCall,
+                roll_call_tallies.index.tolist(),
+                roll_call_tallies["total"].tolist(),
+                roll_call_tallies["yea"].tolist(),
+                roll_call_tallies["nay"].tolist(),
             )
+        )
+        bill.total_votes = sum(call.total_votes for call in bill.roll_calls)
+        bill.supporters = sum(call.supporters for call in bill.roll_calls)
+        bill.opposers = sum(call.opposers for call in bill.roll_calls)
 
-            if pd.notna(row["name"]):
-                legislator_link = self.make_link(
-                    "/legislators/{id}/",
-                    row["legislator_id"],
-                    legislator_name,
-                    "legislator-link",
-                )
-            else:
-                legislator_link = legislator_name
+        bill.roll_call = select_roll_call(bill.roll_calls, vote_id)
+        if bill.roll_call is None:
+            # An unknown roll call is not found, a bill without any is
+            return None if vote_id is not None else bill
 
-            styled_vote_details.append(
-                {
-                    "legislator_id": row["legislator_id"],
-                    "legislator_name": legislator_link,
-                    "legislator_name_plain": legislator_name,
-                    "vote": vote_badge,
-                    "vote_raw": "Yes" if row["vote_type"] == 1 else "No",
-                }
-            )
+        vote_results = self.vote_results.iloc[
+            self.index.results_by_vote.positions(bill.roll_call.vote_id)
+        ]
 
-        styled_vote_details.sort(
-            key=lambda x: (x["vote_raw"] == "No", x["legislator_name_plain"])
+        legislator_ids = vote_results["legislator_id"].to_numpy()
+        names = pd.Series(
+            np.asarray(self._legislator_names(legislator_ids), dtype=object)
         )
+        breakdown = vote_breakdown(
+            pd.DataFrame({"legislator_id": legislator_ids, "legislator": names}),
+            vote_results["vote_type"].to_numpy(),
+            # Sorted as displayed, unknown legislators by their placeholder name
+            names.fillna(
+                pd.Series([f"Unknown Legislator ({i})" for i in legislator_ids])
+            ),
+        )
+        bill.vote_details = frame_records(LegislatorVote, breakdown)
+        return bill
 
-        return {
-            "id": bill_info["id"],
-            "title": bill_info["title"],
-            "sponsor_name": sponsor_name,
-            "sponsor_id": sponsor_id,
-            "total_votes": total_votes,
-            "supporters": supporters,
-            "opposers": opposers,
-            "vote_details": styled_vote_details,
-            **{
-                col: bill_info.get(col, None)
-                for col in self.bills.columns
-                if col not in ["id", "title", "sponsor_id"]
-            },
-        }
-
+    @uses_snapshot
     def get_legislator_by_id(self, legislator_id):
         """
         Returns detailed legislator information with vote counts, bills voted on, and bills sponsored.
         """
-        legislator = self.legislators[self.legislators["id"] == legislator_id]
-        if legislator.empty:
+        precomputed = self._precomputed("legislator", legislator_id)
+        if precomputed is not None:
+            return precomputed
+        return self._legislator_details(legislator_id)
+
+    def _legislator_details(self, legislator_id):
+        legislator_position = self.index.legislator_position(legislator_id)
+        if legislator_position is None:
             return None
 
-        legislator_info = legislator.iloc[0]
+        legislator_info = self.legislators.iloc[legislator_position]
 
-        legislator_votes = self.vote_results[
-            self.vote_results["legislator_id"] == legislator_id
+        legislator_votes = self.vote_results.iloc[
+            self.index.results_by_legislator.positions(legislator_id)
         ]
-        supporters = len(legislator_votes[legislator_votes["vote_type"] == 1])
-        opposers = len(legislator_votes[legislator_votes["vote_type"] == 2])
-        total_votes = len(legislator_votes)
-
-        bills_voted_on = legislator_votes.merge(
-            self.votes, left_on="vote_id", right_on="id", suffixes=("", "_vote")
-        ).merge(self.bills, left_on="bill_id", right_on="id", suffixes=("", "_bill"))
-
-        bills_voted_details = []
-        for _, row in bills_voted_on.iterrows():
-            vote_badge = (
-                '<span class="badge bg-success">Yes</span>'
-                if row["vote_type"] == 1
-                else '<span class="badge bg-danger">No</span>'
-            )
-            bill_link = self.make_link(
-                "/bills/{id}/", row["bill_id"], row["title"], "bill-link"
+        legislator_tally = self.tallies.by_legislator.iloc[legislator_position]
+
+        # Resolve vote -> bill through the id indexes; results pointing at
+        # unknown votes or bills are dropped, as the inner merges used to do
+        vote_positions = self.index.vote_positions(legislator_votes["vote_id"])
+        known_votes = vote_positions != -1
+        bill_ids = self.votes["bill_id"].to_numpy()[vote_positions[known_votes]]
+        bill_positions = self.index.bill_positions(bill_ids)
+        known_bills = bill_positions != -1
+        titles = pd.Series(
+            np.asarray(
+                take(self.bills["title"].array, bill_positions[known_bills]),
+                dtype=object,
             )
-
-            bills_voted_details.append(
-                {
-                    "bill_id": row["bill_id"],
-                    "bill_title": bill_link,
-                    "bill_title_plain": row["title"],
-                    "vote": vote_badge,
-                    "vote_raw": "Yes" if row["vote_type"] == 1 else "No",
-                }
-            )
-
-        bills_voted_details.sort(
-            key=lambda x: (x["vote_raw"] == "No", x["bill_title_plain"])
+        )
+        bills_voted_on = vote_breakdown(
+            pd.DataFrame({"bill_id": bill_ids[known_bills], "title": titles}),
+            legislator_votes["vote_type"].to_numpy()[known_votes][known_bills],
+            titles,
         )
 
-        sponsored_bills = self.bills[self.bills["sponsor_id"] == legislator_id]
-        sponsored_bills_details = []
-
-        for _, bill in sponsored_bills.iterrows():
-            bill_vote_query = self.votes[self.votes["bill_id"] == bill["id"]]
-            if not bill_vote_query.empty:
-                vote_id = bill_vote_query.iloc[0]["id"]
-                bill_votes = self.vote_results[self.vote_results["vote_id"] == vote_id]
-                bill_supporters = len(bill_votes[bill_votes["vote_type"] == 1])
-                bill_opposers = len(bill_votes[bill_votes["vote_type"] == 2])
-                bill_total = len(bill_votes)
-            else:
-                bill_supporters = bill_opposers = bill_total = 0
-
-            bill_link = self.make_link(
-                "/bills/{id}/", bill["id"], bill["title"], "bill-link"
-            )
-
-            sponsored_bills_details.append(
-                {
-                    "bill_id": bill["id"],
-                    "bill_title": bill_link,
-                    "bill_title_plain": bill["title"],
-                    "supporters": bill_supporters,
-                    "opposers": bill_opposers,
-                    "total_votes": bill_total,
-                }
-            )
-
-        sponsored_bills_details.sort(key=lambda x: x["bill_title_plain"])
-
-        return {
-            "id": legislator_info["id"],
-            "name": legislator_info["name"],
-            "total_votes": total_votes,
-            "supporters": supporters,
-            "opposers": opposers,
-            "bills_voted_on_count": len(bills_voted_details),
-            "bills_sponsored_count": len(sponsored_bills_details),
-            "bills_voted_on_details": bills_voted_details,
-            "sponsored_bills_details": sponsored_bills_details,
-            **{
+        sponsored_bills = self.bills.iloc[
+            self.index.bills_by_sponsor.positions(legislator_id)
+        ]
+        sponsored_counts = self.get_bill_vote_counts().reindex(
+            sponsored_bills["id"], fill_value=0
+        )
+        sponsored = pd.DataFrame(
+            {
+                "bill_id": sponsored_bills["id"].to_numpy(),
+                "title": np.asarray(sponsored_bills["title"], dtype=object),
+                "total_votes": sponsored_counts["total_votes"].to_numpy(),
+                "supporters": sponsored_counts["yea_votes"].to_numpy(),
+                "opposers": sponsored_counts["nay_votes"].to_numpy(),
+            }
+        ).sort_values("title", kind="stable")
+
+        return LegislatorDetail(
+            id=int(legislator_info["id"]),
+            name=legislator_info["name"],
+            total_votes=int(legislator_tally["total"]),
+            supporters=int(legislator_tally["yea"]),
+            opposers=int(legislator_tally["nay"]),
+            bills_voted_on=frame_records(BillVote, bills_voted_on),
+            sponsored_bills=frame_records(SponsoredBill, sponsored),
+            extra={
                 col: legislator_info.get(col, None)
                 for col in self.legislators.columns
                 if col not in ["id", "name"]
             },
-        }
+        )
 
-    def get_legislators_data_for_export(self):
-        """Get legislators data without HTML formatting for CSV export"""
-        legislators_data = self.get_complete_legislators_data()
-        df = pd.DataFrame(legislators_data)
+    # The listing frames have one row per bill / legislator, in table order
+    @uses_snapshot
+    def get_bill_record(self, bill_id):
+        position = self.index.bill_position(bill_id)
+        if position is None:
+            return None
+        return self.get_complete_bills_frame().iloc[position].to_dict()
 
-        for col in df.columns:
-            if df[col].dtype == 'object':
-                df[col] = df[col].astype(str).str.replace(
-                    r'<[^>]*>', '', regex=True)
+    @uses_snapshot
+    def get_legislator_record(self, legislator_id):
+        position = self.index.legislator_position(legislator_id)
+        if position is None:
+            return None
+        return self.get_complete_legislators_frame().iloc[position].to_dict()
 
-        return df
+    @uses_snapshot
+    def get_legislators_data_for_export(self):
+        """Get legislators data without HTML formatting for CSV export"""
+        # The listing frames hold plain text already, links are only added when rendering
+        return self.get_complete_legislators_frame()
 
+    @uses_snapshot
     def get_bills_data_for_export(self):
         """Get bills data without HTML formatting for CSV export"""
-        bills_data = self.get_complete_bills_data()
-        df = pd.DataFrame(bills_data)
+        return self.get_complete_bills_frame()
+
+    def iter_legislators_export(
+        self, chunk_rows=EXPORT_CHUNK_ROWS
+    ) -> Iterator[pd.DataFrame]:
+        return data_chunks(self.get_legislators_data_for_export(), chunk_rows)
+
+    def iter_bills_export(self, chunk_rows=EXPORT_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+        return data_chunks(self.get_bills_data_for_export(), chunk_rows)
+
+    def iter_vote_positions_export(
+        self, chunk_rows=EXPORT_CHUNK_ROWS
+    ) -> Iterator[pd.DataFrame]:
+        # The chunk generators outlive this call, so they are handed the
+        # snapshot itself rather than reading it through the per-thread pin
+        return vote_position_chunks(self.snapshot, chunk_rows)
+
+    @uses_snapshot
+    def iter_vote_matrix_export(
+        self, chunk_rows=MATRIX_CHUNK_ROWS
+    ) -> Iterator[pd.DataFrame]:
+        return vote_matrix_chunks(self.snapshot, self._matrix_roll_calls(), chunk_rows)
+
+    @snapshot_cached
+    def _matrix_roll_calls(self) -> np.ndarray:
+        """
+        Row positions of the roll calls on the bills of the dataset, ordered
+        as the matrix columns: by bill, in bills order, then by vote id
+        """
+        bill_positions = self.index.bill_positions(self.votes["bill_id"])
+        known = np.flatnonzero(bill_positions != -1)
+        # lexsort sorts on its last key first
+        return known[
+            np.lexsort((self.votes["id"].to_numpy()[known], bill_positions[known]))
+        ]
+
+
+def vote_position_chunks(snapshot, chunk_rows) -> Iterator[pd.DataFrame]:
+    """Every vote result with the bill its roll call belongs to, in file order"""
+    bill_ids = snapshot.votes["bill_id"].array.astype("Int32")
+    for results in data_chunks(snapshot.vote_results, chunk_rows):
+        vote_positions = snapshot.index.vote_positions(results["vote_id"])
+        yield pd.DataFrame(
+            {
+                "legislator_id": results["legislator_id"].to_numpy(),
+                "bill_id": take(bill_ids, vote_positions, allow_fill=True),
+                "vote_id": results["vote_id"].to_numpy(),
+                "vote_type": results["vote_type"].to_numpy(),
+            }
+        )
 
-        for col in df.columns:
-            if df[col].dtype == 'object':
-                df[col] = df[col].astype(str).str.replace(
-                    r'<[^>]*>', '', regex=True)
 
-        return df
+def vote_matrix_chunks(snapshot, roll_calls, chunk_rows) -> Iterator[pd.DataFrame]:
+    """
+    Legislator x roll call matrix of vote_type, 0 where the legislator has no
+    recorded vote. roll_calls are the vote row positions of the columns, each
+    labelled "<bill_id>:<vote_id>". One chunk per chunk_rows legislators,
+    built from their grouped results.
+    """
+    index = snapshot.index
+    vote_results = snapshot.vote_results
+    legislator_ids = snapshot.legislators["id"].to_numpy()
+    legislator_names = snapshot.legislators["name"]
+    votes = snapshot.votes.iloc[roll_calls]
+    roll_call_columns = [
+        f"{int(bill_id)}:{int(vote_id)}"
+        for bill_id, vote_id in zip(votes["bill_id"], votes["id"])
+    ]
+
+    # vote row position -> matrix column, -1 for roll calls left out
+    column_of_vote = np.full(len(snapshot.votes) + 1, -1)
+    column_of_vote[roll_calls] = np.arange(len(roll_calls))
+
+    for start in range(0, max(len(legislator_ids), 1), chunk_rows):
+        chunk_ids = legislator_ids[start: start + chunk_rows]
+        matrix = np.zeros((len(chunk_ids), len(roll_call_columns)), dtype=np.int8)
+
+        positions = index.results_by_legislator.positions_many(chunk_ids)
+        results = vote_results.iloc[positions]
+        rows = pd.Index(chunk_ids).get_indexer(results["legislator_id"])
+        # -1 (unknown vote) indexes the trailing -1 of column_of_vote
+        columns = column_of_vote[index.vote_positions(results["vote_id"])]
+        known = columns != -1
+        matrix[rows[known], columns[known]] = results["vote_type"].to_numpy()[known]
+
+        frame = pd.DataFrame(matrix, columns=roll_call_columns)
+        frame.insert(0, "legislator_id", chunk_ids)
+        frame.insert(
+            1, "legislator", np.asarray(legislator_names.iloc[start: start + chunk_rows])
+        )
+        yield frame
@@ -0,0 +1,455 @@
+import hashlib
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+from django.db.models import (Count, IntegerField, Max, OuterRef, Q, Subquery,
+                              Value)
+from django.db.models.functions import Coalesce
+
+from legislative.models import (Bill, DatasetVersion, Legislator, Vote,
+                                VoteResult)
+
+from .base import (BILL_COLUMNS, EXPORT_CHUNK_ROWS, LEGISLATOR_COLUMNS,
+                   MATRIX_CHUNK_ROWS, LegislativeDataServiceInterface,
+                   TablePage, TableQuery)
+from .records import (BillDetail, BillVote, LegislatorDetail, LegislatorVote,
+                      RollCall, SponsoredBill, frame_records,
+                      select_roll_call, vote_breakdown)
+from .rendering import HTMLRenderingMixin
+
+BILL_FIELDS = (
+    "id",
+    "title",
+    "sponsor_id",
+    "sponsor_name",
+    "total_votes",
+    "yea_votes",
+    "nay_votes",
+)
+LEGISLATOR_FIELDS = (
+    "id",
+    "name",
+    "total_votes",
+    "yea_votes",
+    "nay_votes",
+    "bills_sponsored",
+)
+
+# listing column -> queryset field it sorts on
+BILL_SORT_FIELDS = {
+    "id": "id",
+    "title": "title",
+    "sponsor": "sponsor_name",
+    "total_votes": "total_votes",
+    "yea_votes": "yea_votes",
+    "nay_votes": "nay_votes",
+}
+LEGISLATOR_SORT_FIELDS = {
+    "id": "id",
+    "legislator": "name",
+    "total_votes": "total_votes",
+    "yes_votes": "yea_votes",
+    "no_votes": "nay_votes",
+    "bills_sponsored": "bills_sponsored",
+}
+
+
+def vote_counts(relation=""):
+    """total/yea/nay Count annotations over the vote results reached through relation"""
+    prefix = f"{relation}__" if relation else ""
+    results = relation or "pk"
+    return {
+        "total_votes": Count(results),
+        "yea_votes": Count(
+            results, filter=Q(**{f"{prefix}vote_type": VoteResult.YEA})
+        ),
+        "nay_votes": Count(
+            results, filter=Q(**{f"{prefix}vote_type": VoteResult.NAY})
+        ),
+    }
+
+
+class DatabaseLegislativeDataService(HTMLRenderingMixin, LegislativeDataServiceInterface):
+    """
+    Django ORM implementation. Tallies, sponsor joins and per-legislator details
+    are computed in SQL, so only the rows of the requested page leave the database.
+    """
+
+    # Table properties return lazy querysets rather than materialized frames
+    @property
+    def legislators(self):
+        return Legislator.objects.all()
+
+    @property
+    def bills(self):
+        return Bill.objects.all()
+
+    @property
+    def votes(self):
+        return Vote.objects.all()
+
+    @property
+    def vote_results(self):
+        return VoteResult.objects.all()
+
+    def data_version(self):
+        # One row read per call: page cache keys and conditional requests ask
+        # for it on every request. ingest bumps the counter with every load and
+        # also clears the page cache itself
+        number = DatasetVersion.objects.values_list("number", flat=True).first()
+        if number is not None:
+            return f"load-{number}"
+
+        # Rows loaded some other way: the highest ids, read off the primary
+        # key indexes
+        state = [
+            model.objects.aggregate(last=Max("pk"))["last"]
+            for model in (Legislator, Bill, Vote, VoteResult)
+        ]
+        return hashlib.sha1(repr(state).encode()).hexdigest()[:12]
+
+    def data_last_modified(self):
+        # Rows carry no timestamps; conditional requests rely on the ETag
+        return None
+
+    def get_stats(self):
+        return {
+            "legislators_count": Legislator.objects.count(),
+            "bills_count": Bill.objects.count(),
+            "votes_count": VoteResult.objects.count(),
+        }
+
+    def _bills_listing(self):
+        return Bill.objects.annotate(
+            sponsor_name=Coalesce("sponsor__name", Value("Unknown Sponsor")),
+            **vote_counts("votes__results"),
+        )
+
+    def _legislators_listing(self):
+        # Counted in a subquery so the sponsored bills join does not multiply
+        # the vote results rows
+        bills_sponsored = (
+            Bill.objects.filter(sponsor=OuterRef("pk"))
+            .order_by()
+            .values("sponsor")
+            .annotate(count=Count("pk"))
+            .values("count")
+        )
+
+        return Legislator.objects.annotate(
+            **vote_counts("vote_results"),
+            bills_sponsored=Coalesce(
+                Subquery(bills_sponsored, output_field=IntegerField()), 0
+            ),
+        )
+
+    @staticmethod
+    def _bill_row(bill):
+        return {
+            "id": bill["id"],
+            "title": bill["title"],
+            "sponsor_id": bill["sponsor_id"],
+            "sponsor": bill["sponsor_name"],
+            "total_votes": bill["total_votes"],
+            "yea_votes": bill["yea_votes"],
+            "nay_votes": bill["nay_votes"],
+        }
+
+    @staticmethod
+    def _legislator_row(legislator):
+        return {
+            "id": legislator["id"],
+            "legislator": legislator["name"],
+            "total_votes": legislator["total_votes"],
+            "yes_votes": legislator["yea_votes"],
+            "no_votes": legislator["nay_votes"],
+            "bills_sponsored": legislator["bills_sponsored"],
+        }
+
+    def get_complete_bills_data(self):
+        bills = self._bills_listing().order_by("id").values(*BILL_FIELDS)
+        return [self._bill_row(bill) for bill in bills]
+
+    def get_complete_legislators_data(self):
+        legislators = (
+            self._legislators_listing().order_by("id").values(*LEGISLATOR_FIELDS)
+        )
+        return [self._legislator_row(legislator) for legislator in legislators]
+
+    @staticmethod
+    def _query_listing(queryset, query: TableQuery, search_fields, sort_fields):
+        if query.search:
+            search = Q()
+            for field in search_fields:
+                search |= Q(**{f"{field}__icontains": query.search})
+            queryset = queryset.filter(search)
+
+        total = queryset.count()
+
+        # id breaks ties so pages are stable, matching the stable sort of the CSV backend
+        field = sort_fields.get(query.sort, "id")
+        prefix = "-" if query.descending else ""
+        ordering = [f"{prefix}{field}"]
+        if field != "id":
+            ordering.append("id")
+
+        if query.after is not None:
+            value, after_id = query.after
+            beyond = "lt" if query.descending else "gt"
+            if field == "id":
+                queryset = queryset.filter(**{f"id__{beyond}": after_id})
+            else:
+                queryset = queryset.filter(
+                    Q(**{f"{field}__{beyond}": value})
+                    | Q(**{field: value, "id__gt": after_id})
+                )
+
+        return queryset.order_by(*ordering), total
+
+    def query_bills(self, query: TableQuery) -> TablePage:
+        bills, total = self._query_listing(
+            self._bills_listing(), query, ["title", "sponsor_name"], BILL_SORT_FIELDS
+        )
+        page = bills.values(*BILL_FIELDS)[query.offset: query.stop]
+        return TablePage(
+            rows=[self._bill_row(bill) for bill in page], total=total, query=query
+        )
+
+    def query_legislators(self, query: TableQuery) -> TablePage:
+        legislators, total = self._query_listing(
+            self._legislators_listing(), query, ["name"], LEGISLATOR_SORT_FIELDS
+        )
+        page = legislators.values(*LEGISLATOR_FIELDS)[query.offset: query.stop]
+        return TablePage(
+            rows=[self._legislator_row(legislator) for legislator in page],
+            total=total,
+            query=query,
+        )
+
+    def get_bill_by_id(self, bill_id, vote_id=None):
+        """
+        Returns detailed bill information with sponsor name, vote counts, its
+        roll calls and the voting breakdown of one of them.
+        """
+        bill = (
+            Bill.objects.filter(pk=bill_id)
+            .values("id", "title", "sponsor_id", "sponsor__name", "extra")
+            .first()
+        )
+
+        if bill is None:
+            return None
+
+        details = BillDetail(
+            id=bill["id"],
+            title=bill["title"],
+            sponsor_id=bill["sponsor_id"],
+            sponsor_name=bill["sponsor__name"],
+            extra=bill["extra"],
+        )
+
+        details.roll_calls = [
+            RollCall(
+                roll_call["id"],
+                roll_call["total_votes"],
+                roll_call["yea_votes"],
+                roll_call["nay_votes"],
+            )
+            for roll_call in Vote.objects.filter(bill_id=bill_id)
+            .annotate(**vote_counts("results"))
+            .order_by("id")
+            .values("id", "total_votes", "yea_votes", "nay_votes")
+        ]
+        details.total_votes = sum(call.total_votes for call in details.roll_calls)
+        details.supporters = sum(call.supporters for call in details.roll_calls)
+        details.opposers = sum(call.opposers for call in details.roll_calls)
+
+        details.roll_call = select_roll_call(details.roll_calls, vote_id)
+        if details.roll_call is None:
+            # An unknown roll call is not found, a bill without any is
+            return None if vote_id is not None else details
+
+        votes = pd.DataFrame(
+            VoteResult.objects.filter(vote_id=details.roll_call.vote_id).values_list(
+                "legislator_id", "legislator__name", "vote_type"
+            ),
+            columns=["legislator_id", "legislator", "vote_type"],
+        )
+        breakdown = vote_breakdown(
+            votes[["legislator_id", "legislator"]].copy(),
+            votes["vote_type"],
+            # Sorted as displayed, unknown legislators by their placeholder name
+            votes["legislator"].fillna(
+                "Unknown Legislator (" + votes["legislator_id"].astype(str) + ")"
+            ),
+        )
+        details.vote_details = frame_records(LegislatorVote, breakdown)
+        return details
+
+    def get_legislator_by_id(self, legislator_id):
+        """
+        Returns detailed legislator information with vote counts, bills voted on, and bills sponsored.
+        """
+        legislator = Legislator.objects.filter(pk=legislator_id).first()
+        if legislator is None:
+            return None
+
+        results = VoteResult.objects.filter(legislator_id=legislator_id)
+        tally = results.aggregate(**vote_counts())
+
+        votes = pd.DataFrame(
+            results.filter(vote__bill__title__isnull=False).values_list(
+                "vote__bill_id", "vote__bill__title", "vote_type"
+            ),
+            columns=["bill_id", "title", "vote_type"],
+        )
+        bills_voted_on = vote_breakdown(
+            votes[["bill_id", "title"]].copy(), votes["vote_type"], votes["title"]
+        )
+
+        sponsored_bills = [
+            SponsoredBill(
+                bill["id"],
+                bill["title"],
+                bill["total_votes"],
+                bill["yea_votes"],
+                bill["nay_votes"],
+            )
+            for bill in Bill.objects.filter(sponsor_id=legislator_id)
+            .annotate(**vote_counts("votes__results"))
+            .order_by("title")
+            .values("id", "title", "total_votes", "yea_votes", "nay_votes")
+        ]
+
+        return LegislatorDetail(
+            id=legislator.id,
+            name=legislator.name,
+            total_votes=tally["total_votes"],
+            supporters=tally["yea_votes"],
+            opposers=tally["nay_votes"],
+            bills_voted_on=frame_records(BillVote, bills_voted_on),
+            sponsored_bills=sponsored_bills,
+            extra=legislator.extra,
+        )
+
+    def get_bill_record(self, bill_id):
+        bill = self._bills_listing().filter(pk=bill_id).values(*BILL_FIELDS).first()
+        return None if bill is None else self._bill_row(bill)
+
+    def get_legislator_record(self, legislator_id):
+        legislator = (
+            self._legislators_listing()
+            .filter(pk=legislator_id)
+            .values(*LEGISLATOR_FIELDS)
+            .first()
+        )
+        return None if legislator is None else self._legislator_row(legislator)
+
+    @staticmethod
+    def _export_chunks(
+        rows, columns, chunk_rows, dtypes=None
+    ) -> Iterator[pd.DataFrame]:
+        """Batches of a lazily fetched row stream as DataFrames"""
+        batch = []
+        empty = True
+        for row in rows:
+            batch.append(row)
+            if len(batch) == chunk_rows:
+                yield pd.DataFrame(batch, columns=columns).astype(dtypes or {})
+                batch = []
+                empty = False
+        # At least one chunk, so an empty export still gets its header
+        if batch or empty:
+            yield pd.DataFrame(batch, columns=columns).astype(dtypes or {})
+
+    def get_legislators_data_for_export(self):
+        """Get legislators data without HTML formatting for CSV export"""
+        return pd.DataFrame(self.get_complete_legislators_data())
+
+    def get_bills_data_for_export(self):
+        """Get bills data without HTML formatting for CSV export"""
+        return pd.DataFrame(self.get_complete_bills_data())
+
+    def iter_legislators_export(self, chunk_rows=EXPORT_CHUNK_ROWS):
+        legislators = (
+            self._legislators_listing()
+            .order_by("id")
+            .values(*LEGISLATOR_FIELDS)
+            .iterator(chunk_size=chunk_rows)
+        )
+        return self._export_chunks(
+            map(self._legislator_row, legislators), LEGISLATOR_COLUMNS, chunk_rows
+        )
+
+    def iter_bills_export(self, chunk_rows=EXPORT_CHUNK_ROWS):
+        bills = (
+            self._bills_listing()
+            .order_by("id")
+            .values(*BILL_FIELDS)
+            .iterator(chunk_size=chunk_rows)
+        )
+        return self._export_chunks(map(self._bill_row, bills), BILL_COLUMNS, chunk_rows)
+
+    def iter_vote_positions_export(self, chunk_rows=EXPORT_CHUNK_ROWS):
+        results = (
+            VoteResult.objects.order_by("id")
+            .values_list("legislator_id", "vote__bill_id", "vote_id", "vote_type")
+            .iterator(chunk_size=chunk_rows)
+        )
+        return self._export_chunks(
+            results,
+            ["legislator_id", "bill_id", "vote_id", "vote_type"],
+            chunk_rows,
+            # Results of roll calls missing from votes have no bill
+            dtypes={"bill_id": "Int64"},
+        )
+
+    def iter_vote_matrix_export(self, chunk_rows=MATRIX_CHUNK_ROWS):
+        # The roll calls on the bills of the dataset, by bill then vote id
+        roll_calls = pd.DataFrame(
+            Vote.objects.filter(bill_id__in=Bill.objects.values("id"))
+            .order_by("bill_id", "id")
+            .values_list("bill_id", "id"),
+            columns=["bill_id", "vote_id"],
+        )
+        legislators = Legislator.objects.order_by("id").values_list("id", "name")
+
+        batch = []
+        empty = True
+        for legislator in legislators.iterator(chunk_size=chunk_rows):
+            batch.append(legislator)
+            if len(batch) == chunk_rows:
+                yield self._vote_matrix(batch, roll_calls)
+                batch = []
+                empty = False
+        if batch or empty:
+            yield self._vote_matrix(batch, roll_calls)
+
+    @staticmethod
+    def _vote_matrix(legislators, roll_calls):
+        """One chunk of the dense matrix, for the given (id, name) legislators"""
+        legislator_ids = pd.Index([legislator_id for legislator_id, _ in legislators])
+        results = pd.DataFrame(
+            VoteResult.objects.filter(
+                legislator_id__in=list(legislator_ids)
+            ).values_list("legislator_id", "vote_id", "vote_type"),
+            columns=["legislator_id", "vote_id", "vote_type"],
+        )
+
+        matrix = np.zeros((len(legislator_ids), len(roll_calls)), dtype=np.int8)
+        rows = legislator_ids.get_indexer(results["legislator_id"])
+        columns = pd.Index(roll_calls["vote_id"]).get_indexer(results["vote_id"])
+        known = columns != -1
+        matrix[rows[known], columns[known]] = results["vote_type"].to_numpy()[known]
+
+        frame = pd.DataFrame(
+            matrix,
+            columns=[
+                f"{bill_id}:{vote_id}"
+                for bill_id, vote_id in roll_calls.itertuples(index=False)
+            ],
+        )
+        frame.insert(0, "legislator_id", legislator_ids)
+        frame.insert(1, "legislator", [name for _, name in legislators])
+        return frame
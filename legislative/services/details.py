@@ -0,0 +1,87 @@
+"""
+Detail payloads precomputed eagerly for one dataset snapshot.
+
+With LEGISLATIVE_DETAIL_PRECOMPUTE enabled, every newly published snapshot
+gets a DetailCache that a background thread fills with legislator and bill
+detail payloads, most-voted first, until LEGISLATIVE_DETAIL_PRECOMPUTE_MAX_BYTES
+is reached. Lookups that miss (not computed yet, or over the budget) fall
+back to computing the payload on request.
+"""
+
+import logging
+import sys
+import threading
+from dataclasses import fields, is_dataclass
+
+logger = logging.getLogger(__name__)
+
+
+def deep_size(value) -> int:
+    """
+    Approximate bytes held by a payload of records, dicts, lists and scalars.
+    Dict keys are left out: they are string literals shared by every payload.
+    """
+    size = sys.getsizeof(value)
+    if is_dataclass(value):
+        size += sum(deep_size(getattr(value, item.name)) for item in fields(value))
+    elif isinstance(value, dict):
+        size += sum(deep_size(item) for item in value.values())
+    elif isinstance(value, (list, tuple)):
+        size += sum(deep_size(item) for item in value)
+    return size
+
+
+class DetailCache:
+    """Payloads keyed by (kind, id), filled once up to a byte budget"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries = {}
+        self.complete = False
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def fill(self, jobs):
+        """Compute (key, factory) jobs in order until the budget or a stop()"""
+        for key, factory in jobs:
+            if self._stopped.is_set():
+                return
+            payload = factory()
+            size = deep_size(payload)
+            if self.size + size > self.max_bytes:
+                logger.info(
+                    "Detail precompute stopped at the %s byte budget after %s entries",
+                    self.max_bytes,
+                    len(self.entries),
+                )
+                return
+            # A single assignment, so concurrent readers see the entry or nothing
+            self.entries[key] = payload
+            self.size += size
+        self.complete = True
+
+    def start(self, jobs, pinned):
+        """fill() in a daemon thread, inside the pinned() context manager given"""
+
+        def run():
+            try:
+                with pinned():
+                    self.fill(jobs)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Detail precompute failed")
+
+        self._thread = threading.Thread(
+            target=run, name="legislative-detail-precompute", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def wait(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
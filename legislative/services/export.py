@@ -0,0 +1,171 @@
+"""
+Serializers for the download endpoints.
+
+Each format turns the DataFrame chunks of iter_bills_export /
+iter_legislators_export into a stream of bytes, so a download never holds
+more than one chunk in serialized form. Parquet and Arrow IPC need the
+optional pyarrow dependency (`pip install project-quorum[arrow]`).
+"""
+
+import io
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator
+
+import pandas as pd
+
+from .rendering import plain_values
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - exercised when pyarrow is absent
+    pa = pq = None
+
+
+def plain_frame(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Categorical columns as plain strings. A chunk of a categorical column
+    carries the full category list, which serializers would otherwise
+    convert (or write out) again for every chunk.
+    """
+    return frame.assign(
+        **{
+            column: plain_values(frame[column])
+            for column in frame.columns
+            if isinstance(frame[column].dtype, pd.CategoricalDtype)
+        }
+    )
+
+
+def csv_chunks(frames: Iterable[pd.DataFrame]) -> Iterator[bytes]:
+    """CSV of DataFrame chunks, with the header on the first one only"""
+    header = True
+    for frame in frames:
+        yield plain_frame(frame).to_csv(index=False, header=header).encode("utf-8")
+        header = False
+
+
+def ndjson_chunks(frames: Iterable[pd.DataFrame]) -> Iterator[bytes]:
+    """One JSON object per row and line"""
+    for frame in frames:
+        if len(frame):
+            yield plain_frame(frame).to_json(orient="records", lines=True).encode(
+                "utf-8"
+            )
+
+
+class ChunkSink(io.RawIOBase):
+    """Write-only file that hands out whatever was written since the last drain"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def arrow_tables(frames: Iterable[pd.DataFrame]):
+    """(schema, table) per chunk; every chunk is cast to the first chunk's schema"""
+    schema = None
+    for frame in frames:
+        table = pa.Table.from_pandas(
+            plain_frame(frame), schema=schema, preserve_index=False
+        )
+        schema = schema or table.schema
+        yield schema, table
+
+
+def arrow_chunks(frames: Iterable[pd.DataFrame]) -> Iterator[bytes]:
+    """Arrow IPC stream format, one record batch per chunk"""
+    sink = ChunkSink()
+    writer = None
+    for schema, table in arrow_tables(frames):
+        if writer is None:
+            writer = pa.ipc.new_stream(sink, schema)
+        writer.write_table(table)
+        yield sink.drain()
+    if writer is not None:
+        writer.close()
+    yield sink.drain()
+
+
+def parquet_chunks(frames: Iterable[pd.DataFrame]) -> Iterator[bytes]:
+    """Parquet file, one row group per chunk; the footer comes last"""
+    sink = ChunkSink()
+    writer = None
+    for schema, table in arrow_tables(frames):
+        if writer is None:
+            writer = pq.ParquetWriter(sink, schema)
+        writer.write_table(table)
+        yield sink.drain()
+    if writer is not None:
+        writer.close()
+    yield sink.drain()
+
+
+@dataclass(frozen=True)
+class ExportFormat:
+    name: str
+    content_type: str
+    extension: str
+    serialize: Callable[[Iterable[pd.DataFrame]], Iterator[bytes]]
+    # Text formats are worth gzip-encoding; Parquet is compressed already
+    compressible: bool
+    needs_pyarrow: bool = False
+
+    @property
+    def available(self):
+        return pa is not None or not self.needs_pyarrow
+
+
+EXPORT_FORMATS = {
+    export_format.name: export_format
+    for export_format in (
+        ExportFormat("csv", "text/csv", "csv", csv_chunks, True),
+        ExportFormat("ndjson", "application/x-ndjson", "ndjson", ndjson_chunks, True),
+        ExportFormat(
+            "parquet",
+            "application/vnd.apache.parquet",
+            "parquet",
+            parquet_chunks,
+            False,
+            needs_pyarrow=True,
+        ),
+        ExportFormat(
+            "arrow",
+            "application/vnd.apache.arrow.stream",
+            "arrows",
+            arrow_chunks,
+            True,
+            needs_pyarrow=True,
+        ),
+    )
+}
+
+
+def negotiate_format(requested: str, accept: str):
+    """
+    ExportFormat named by requested (the format query parameter), else the
+    first one listed in the Accept header, else CSV. None for an unknown name.
+    """
+    if requested:
+        return EXPORT_FORMATS.get(requested)
+
+    by_content_type = {
+        export_format.content_type: export_format
+        for export_format in EXPORT_FORMATS.values()
+    }
+    for media_range in accept.split(","):
+        content_type = media_range.split(";")[0].strip()
+        if content_type in by_content_type:
+            return by_content_type[content_type]
+    return EXPORT_FORMATS["csv"]
@@ -0,0 +1,198 @@
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+
+def build_lookups(value):
+    """
+    Build the hash tables of value's indexes (an Index, Series or DataFrame,
+    or a tuple of them) before it is shared between threads, and return it.
+    pandas builds them on the first lookup, which is not thread safe:
+    concurrent first lookups, reindexes or .loc from request threads can fail
+    with InvalidIndexError or "cannot reindex on an axis with duplicate labels".
+    """
+    if isinstance(value, pd.Index):
+        if value.is_unique:
+            value.get_indexer(value[:1])
+    elif isinstance(value, pd.Series):
+        build_lookups(value.index)
+    elif isinstance(value, pd.DataFrame):
+        build_lookups(value.index)
+        build_lookups(value.columns)
+    elif isinstance(value, tuple):
+        for item in value:
+            build_lookups(item)
+    return value
+
+
+def lookup_index(values, **kwargs) -> pd.Index:
+    """pd.Index with its hash table built up front, see build_lookups"""
+    return build_lookups(pd.Index(values, **kwargs))
+
+
+class IdPositions:
+    """Maps the ids of a table to their row positions.
+
+    An id appearing on several rows maps to the first of them, the row a
+    lookup of the id in the table finds first.
+    """
+
+    def __init__(self, ids):
+        ids = pd.Index(ids)
+        if ids.is_unique:
+            self.ids = build_lookups(ids)
+            self.rows = None
+        else:
+            first = ~ids.duplicated()
+            self.ids = build_lookups(ids[first])
+            self.rows = np.flatnonzero(first)
+
+    def positions(self, ids) -> np.ndarray:
+        """Row positions for many ids, -1 where unknown"""
+        locs = self.ids.get_indexer(ids)
+        if self.rows is None:
+            return locs
+        return np.where(locs == -1, -1, self.rows[locs])
+
+    def position(self, item_id) -> Optional[int]:
+        loc = self.positions([item_id])[0]
+        return None if loc == -1 else loc
+
+
+class GroupedRows:
+    """Maps each key of a column to the row positions holding it.
+
+    Rows are sorted once by key, so every lookup is a slice of the sort order
+    and costs O(k) in the number of matching rows. Within a key, rows are in
+    table order, or sorted on `within` when given.
+    """
+
+    def __init__(self, keys: pd.Series, within: Optional[pd.Series] = None):
+        values = keys.to_numpy()
+        if within is None:
+            self.order = np.argsort(values, kind="stable")
+        else:
+            self.order = np.lexsort((within.to_numpy(), values))
+        unique_keys, starts, counts = np.unique(
+            values[self.order], return_index=True, return_counts=True
+        )
+        self.keys = lookup_index(unique_keys)
+        self.starts = starts
+        self.stops = starts + counts
+
+    @classmethod
+    def from_arrays(cls, order, keys, starts, stops):
+        """Rebuild from previously computed arrays (e.g. memory-mapped from a snapshot)"""
+        grouped = cls.__new__(cls)
+        grouped.order = order
+        grouped.keys = lookup_index(keys, copy=False)
+        grouped.starts = starts
+        grouped.stops = stops
+        return grouped
+
+    def extended(self, keys: pd.Series, offset: int) -> "GroupedRows":
+        """
+        Grouping after rows holding keys were appended at row position
+        offset. Appended rows come after every existing row of their key, so
+        they are merged into the sort order in one copy rather than resorted;
+        only valid for groupings in table order.
+        """
+        values = keys.to_numpy()
+        appended = np.argsort(values, kind="stable")
+        sorted_values = values[appended]
+
+        # Each appended row goes after the existing rows of keys up to its own
+        bounds = np.concatenate(([0], self.stops))
+        before = np.searchsorted(self.keys.to_numpy(), sorted_values, "right")
+        order = np.insert(self.order, bounds[before], appended + offset)
+
+        new_keys, new_counts = np.unique(sorted_values, return_counts=True)
+        keys = self.keys.union(pd.Index(new_keys))
+        counts = np.zeros(len(keys), dtype=np.int64)
+        counts[keys.get_indexer(self.keys)] = self.stops - self.starts
+        counts[keys.get_indexer(new_keys)] += new_counts
+        stops = np.cumsum(counts)
+        return GroupedRows.from_arrays(order, keys, stops - counts, stops)
+
+    def arrays(self):
+        return {
+            "order": self.order,
+            "keys": self.keys.to_numpy(),
+            "starts": self.starts,
+            "stops": self.stops,
+        }
+
+    def positions(self, key) -> np.ndarray:
+        """Row positions for a single key (empty when the key is unknown)"""
+        loc = self.keys.get_indexer([key])[0]
+        if loc == -1:
+            return self.order[:0]
+        return self.order[self.starts[loc]: self.stops[loc]]
+
+    def positions_many(self, keys) -> np.ndarray:
+        """Concatenated row positions for several keys, in key order"""
+        locs = self.keys.get_indexer(keys)
+        locs = locs[locs != -1]
+        if len(locs) == 0:
+            return self.order[:0]
+        return np.concatenate(
+            [self.order[self.starts[loc]: self.stops[loc]] for loc in locs]
+        )
+
+
+# foreign key groupings: attribute -> (table, key column, column ordering each group)
+GROUPINGS = {
+    "results_by_vote": ("vote_results", "vote_id", None),
+    "results_by_legislator": ("vote_results", "legislator_id", None),
+    "bills_by_sponsor": ("bills", "sponsor_id", None),
+    # A bill's roll calls in vote id order, its timeline
+    "votes_by_bill": ("votes", "bill_id", "id"),
+}
+
+
+class DatasetIndex:
+    """Load-time lookup structures over the legislators, bills, votes and vote results tables"""
+
+    def __init__(self, legislators, bills, votes, vote_results, groupings=None):
+        # id -> row position maps
+        self.legislator_ids = IdPositions(legislators["id"])
+        self.bill_ids = IdPositions(bills["id"])
+        self.vote_ids = IdPositions(votes["id"])
+
+        # foreign key -> row positions, reusing prebuilt groupings when given
+        tables = {
+            "legislators": legislators,
+            "bills": bills,
+            "votes": votes,
+            "vote_results": vote_results,
+        }
+        groupings = groupings or {}
+        for name, (table, column, within) in GROUPINGS.items():
+            grouped = groupings.get(name) or GroupedRows(
+                tables[table][column],
+                None if within is None else tables[table][within],
+            )
+            setattr(self, name, grouped)
+
+    def legislator_position(self, legislator_id):
+        return self.legislator_ids.position(legislator_id)
+
+    def bill_position(self, bill_id):
+        return self.bill_ids.position(bill_id)
+
+    def roll_calls(self, bill_id) -> np.ndarray:
+        """Vote row positions of a bill's roll calls, in vote id order"""
+        return self.votes_by_bill.positions(bill_id)
+
+    def legislator_positions(self, legislator_ids) -> np.ndarray:
+        """Row positions for many legislator ids, -1 where unknown"""
+        return self.legislator_ids.positions(legislator_ids)
+
+    def bill_positions(self, bill_ids) -> np.ndarray:
+        """Row positions for many bill ids, -1 where unknown"""
+        return self.bill_ids.positions(bill_ids)
+
+    def vote_positions(self, vote_ids) -> np.ndarray:
+        """Row positions for many vote ids, -1 where unknown"""
+        return self.vote_ids.positions(vote_ids)
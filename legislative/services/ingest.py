@@ -0,0 +1,374 @@
+"""
+Chunked ingestion of the legislative CSVs into a storage backend.
+
+legislators, bills and votes are small and read whole; vote_results is
+streamed in fixed-size chunks, each one validated against the known
+legislator and vote ids and written before the next is read.
+
+Incremental sinks add the rows to the data they hold instead of replacing
+it, so a day of new roll calls is ingested in time proportional to its size.
+"""
+
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+import pandas as pd
+from django.db import transaction
+
+from legislative.models import (Bill, DatasetVersion, Legislator, Vote,
+                                VoteResult)
+
+from . import schema
+from .columnar import SnapshotAppender, SnapshotWriter, snapshot_is_fresh
+from .snapshot import csv_paths
+
+SMALL_TABLES = ("legislators", "bills", "votes")
+
+# vote_results column -> referenced table
+REFERENCES = {"legislator_id": "legislators", "vote_id": "votes"}
+
+INVALID_POLICIES = ("fail", "skip", "keep")
+
+
+class IngestError(Exception):
+    pass
+
+
+@dataclass
+class TableReport:
+    rows: int = 0
+    invalid: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+@dataclass
+class IngestReport:
+    tables: dict = field(default_factory=dict)
+
+
+class ReferenceValidator:
+    """
+    Checks vote_results chunks against the ids of the referenced tables,
+    those being ingested and those the sink holds already
+    """
+
+    def __init__(self, tables, policy="fail", stored=None):
+        if policy not in INVALID_POLICIES:
+            raise ValueError(f"Unknown invalid-row policy: {policy}")
+        self.policy = policy
+        stored = stored or {}
+        self.known_ids = {
+            column: pd.Index(tables[table]["id"]).union(
+                stored.get(table, pd.Index([], dtype=int))
+            )
+            for column, table in REFERENCES.items()
+        }
+
+    def check(self, chunk: pd.DataFrame):
+        """Returns (rows to write, number of invalid rows)"""
+        valid = pd.Series(True, index=chunk.index)
+        for column, ids in self.known_ids.items():
+            valid &= chunk[column].isin(ids)
+
+        invalid = int((~valid).sum())
+        if invalid and self.policy == "fail":
+            first = chunk[~valid].iloc[0]
+            raise IngestError(
+                f"vote_results row {first['id']} references an unknown "
+                f"legislator or vote (legislator_id={first['legislator_id']}, "
+                f"vote_id={first['vote_id']})"
+            )
+        if invalid and self.policy == "skip":
+            chunk = chunk[valid]
+        return chunk, invalid
+
+
+def field_values(series: pd.Series, dtype=None) -> list:
+    """
+    The values of a column for model fields: missing values as None and, in
+    the integer columns of the schema (dtype), ids read as float because of
+    blanks in their column back as ints
+    """
+    if not series.hasnans:
+        return series.tolist()
+    if dtype is not None and dtype != schema.TEXT:
+        series = series.astype("Int64")
+    return series.astype(object).where(series.notna(), None).tolist()
+
+
+class DatabaseSink:
+    """
+    Replaces the legislative model tables, bulk-inserting each chunk. An
+    incremental sink inserts the rows alongside those already stored; the
+    tallies are computed in SQL, so there is nothing else to bring up to date.
+    """
+
+    MODELS = {
+        "legislators": Legislator,
+        "bills": Bill,
+        "votes": Vote,
+        "vote_results": VoteResult,
+    }
+    # Tables whose models keep the columns beyond the schema in an extra field
+    EXTRA_TABLES = ("legislators", "bills")
+    # vote_results chunks are checked against the model fields rather than the
+    # snapshot schema: ids are BigIntegerFields
+    VOTE_RESULTS_DTYPES = {"id": "int64", "legislator_id": "int64", "vote_id": "int64"}
+
+    def __init__(self, batch_size=5000, incremental=False):
+        self.batch_size = batch_size
+        self.incremental = incremental
+
+    @contextmanager
+    def session(self, sources):
+        """Everything is written in one transaction, rolled back on error"""
+        with transaction.atomic():
+            if not self.incremental:
+                for model in reversed(self.MODELS.values()):
+                    model.objects.all().delete()
+            yield
+            # The data_version of the database service
+            version, _ = DatasetVersion.objects.select_for_update().get_or_create(pk=1)
+            version.number += 1
+            version.save(update_fields=["number"])
+
+    def stored_ids(self, table) -> pd.Index:
+        return pd.Index(self.MODELS[table].objects.values_list("id", flat=True))
+
+    def stored_among(self, table, ids) -> pd.Index:
+        """The ids already stored in table, looked up batch_size at a time"""
+        model = self.MODELS[table]
+        ids = ids.tolist()
+        found = []
+        for start in range(0, len(ids), self.batch_size):
+            found.extend(
+                model.objects.filter(
+                    id__in=ids[start: start + self.batch_size]
+                ).values_list("id", flat=True)
+            )
+        return pd.Index(found)
+
+    def write(self, table, frame: pd.DataFrame):
+        model = self.MODELS[table]
+        columns = schema.SCHEMAS[table]
+        fields = [model._meta.get_field(column).attname for column in columns]
+        values = [
+            field_values(frame[column], dtype) for column, dtype in columns.items()
+        ]
+
+        # Other columns of the CSV go to the extra field of the models having one
+        extra_columns = [column for column in frame.columns if column not in columns]
+        if extra_columns and table in self.EXTRA_TABLES:
+            fields.append("extra")
+            extra_values = (field_values(frame[column]) for column in extra_columns)
+            values.append(
+                [dict(zip(extra_columns, row)) for row in zip(*extra_values)]
+            )
+
+        model.objects.bulk_create(
+            (model(**dict(zip(fields, row))) for row in zip(*values)),
+            batch_size=self.batch_size,
+        )
+
+    append = write
+
+
+class SnapshotSink:
+    """
+    Builds the columnar binary snapshot, streaming vote_results column files.
+
+    An incremental sink appends the rows to the snapshot of data_folder, and
+    to its CSVs so the snapshot can still be rebuilt from them. The snapshot
+    must be up to date with the CSVs beforehand. vote_results rows go to the
+    CSV as appended to the snapshot, without those skipped as invalid.
+    """
+
+    # The schema dtypes, which every vote_results chunk streamed to the column
+    # files must share
+    VOTE_RESULTS_DTYPES = {}
+
+    def __init__(self, data_folder, incremental=False):
+        self.data_folder = data_folder
+        self.incremental = incremental
+        self.writer = None
+        # vote_results rows appended, kept until the CSV is appended to
+        self.appended_rows = None
+        # table -> unique stored ids, built on the first stored_among
+        self.stored_lookups = {}
+
+    @contextmanager
+    def session(self, sources):
+        """The snapshot is only published if every table was written"""
+        if not self.incremental:
+            self.writer = SnapshotWriter(self.data_folder)
+        elif snapshot_is_fresh(self.data_folder, csv_paths(self.data_folder)):
+            check_headers(sources, self.data_folder)
+            self.writer = SnapshotAppender(self.data_folder)
+        else:
+            raise IngestError(
+                f"The snapshot of {self.data_folder} is missing or older than its "
+                "CSVs; rebuild it before appending"
+            )
+
+        try:
+            if self.incremental and "vote_results" in sources:
+                self.appended_rows = tempfile.NamedTemporaryFile(
+                    "w+", encoding="utf-8", suffix=".csv", newline=""
+                )
+                self.appended_rows.write(read_header(sources["vote_results"]) + "\n")
+                sources = {**sources, "vote_results": self.appended_rows.name}
+            yield
+            if self.incremental:
+                if self.appended_rows is not None:
+                    self.appended_rows.flush()
+                # Appended before the snapshot is finished, which leaves it
+                # stale (and ignored) should finishing fail
+                for table, path in sources.items():
+                    append_csv(path, os.path.join(self.data_folder, f"{table}.csv"))
+        except BaseException:
+            self.writer.abort()
+            raise
+        finally:
+            if self.appended_rows is not None:
+                self.appended_rows.close()
+                self.appended_rows = None
+        self.writer.finish()
+
+    def stored_ids(self, table) -> pd.Index:
+        return pd.Index(self.writer.tables[table]["id"])
+
+    def stored_among(self, table, ids) -> pd.Index:
+        """The ids already stored in table"""
+        if table not in self.stored_lookups:
+            self.stored_lookups[table] = self.stored_ids(table).unique()
+        return pd.Index(ids[self.stored_lookups[table].get_indexer(ids) != -1])
+
+    def write(self, table, frame):
+        self.writer.write_table(table, frame)
+
+    def append(self, table, chunk):
+        self.writer.append(table, chunk)
+        if self.appended_rows is not None:
+            chunk.to_csv(self.appended_rows, header=False, index=False)
+
+
+def read_header(path):
+    with open(path, encoding="utf-8") as file:
+        return file.readline().strip()
+
+
+def check_headers(sources, data_folder):
+    for table, path in sources.items():
+        target = os.path.join(data_folder, f"{table}.csv")
+        if read_header(path) != read_header(target):
+            raise IngestError(
+                f"{path} has columns {read_header(path)}, "
+                f"{target} has {read_header(target)}"
+            )
+
+
+def check_new_rows(table, reused):
+    """Fails on reused, the ids of new table rows that are stored already"""
+    if len(reused):
+        raise IngestError(
+            f"{table} row {reused[0]} is already stored; appending only adds new rows"
+        )
+
+
+def append_csv(source, target):
+    """Append the rows of the CSV source to target, which has the same header"""
+    with open(target, "rb") as file:
+        file.seek(0, os.SEEK_END)
+        missing_newline = False
+        if file.tell():
+            file.seek(-1, os.SEEK_END)
+            missing_newline = file.read(1) != b"\n"
+
+    with open(source, "rb") as rows, open(target, "ab") as out:
+        rows.readline()
+        if missing_newline:
+            out.write(b"\n")
+        shutil.copyfileobj(rows, out, 1 << 20)
+
+
+def ingest(
+    data_folder,
+    sink,
+    chunksize=100_000,
+    invalid="fail",
+    vote_results_path=None,
+    on_chunk=None,
+) -> IngestReport:
+    """
+    Load the CSVs of data_folder into sink. on_chunk(report) is called after
+    every vote_results chunk for progress reporting.
+
+    An incremental sink gets the rows added to those it holds. Any of the
+    CSVs may then be missing, and rows reusing a stored id of their table are
+    rejected.
+    """
+    sources = {
+        table: os.path.join(data_folder, f"{table}.csv") for table in SMALL_TABLES
+    }
+    sources["vote_results"] = vote_results_path or os.path.join(
+        data_folder, "vote_results.csv"
+    )
+    if sink.incremental:
+        sources = {
+            table: path for table, path in sources.items() if os.path.exists(path)
+        }
+
+    report = IngestReport()
+    with sink.session(sources):
+        tables = {}
+        stored = {}
+        for table in SMALL_TABLES:
+            start = time.perf_counter()
+            tables[table] = (
+                schema.read_csv(table, sources[table])
+                if table in sources
+                else schema.empty_table(table)
+            )
+            if sink.incremental:
+                stored[table] = sink.stored_ids(table)
+                ids = pd.Index(tables[table]["id"])
+                check_new_rows(table, ids[ids.isin(stored[table])])
+            if len(tables[table]) or not sink.incremental:
+                sink.write(table, tables[table])
+            report.tables[table] = TableReport(
+                rows=len(tables[table]), seconds=time.perf_counter() - start
+            )
+
+        validator = ReferenceValidator(tables, invalid, stored)
+        results_report = report.tables["vote_results"] = TableReport()
+        start = time.perf_counter()
+        chunks = (
+            pd.read_csv(sources["vote_results"], chunksize=chunksize)
+            if "vote_results" in sources
+            else []
+        )
+        for chunk in chunks:
+            chunk, invalid_rows = validator.check(
+                schema.apply_schema(
+                    "vote_results", chunk, strict=True, dtypes=sink.VOTE_RESULTS_DTYPES
+                )
+            )
+            if sink.incremental:
+                reused = sink.stored_among("vote_results", chunk["id"])
+                check_new_rows("vote_results", reused)
+            sink.append("vote_results", chunk)
+            results_report.rows += len(chunk)
+            results_report.invalid += invalid_rows
+            results_report.seconds = time.perf_counter() - start
+            if on_chunk:
+                on_chunk(results_report)
+
+    return report
@@ -0,0 +1,275 @@
+"""
+Timers, row counts and cache hit/miss counters for the request hot path.
+
+Every measurement goes to the process-wide REGISTRY, served in the Prometheus
+text format by the metrics view, and to the RequestTimings of the request
+being handled in the current context, if any, which the instrumentation
+middleware sends back as a Server-Timing header. Work done while a streamed
+response is sent (table rows, export serialization) happens after the headers
+are out, so it only reaches the registry.
+"""
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Iterator, Optional
+
+# Upper bounds in seconds of the latency histogram buckets
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRICS = {
+    "legislative_request_seconds": (
+        "histogram",
+        "Time to serve a request, streamed body included, per route and status",
+    ),
+    "legislative_operation_seconds": (
+        "histogram",
+        "Time spent in a service call, table rendering, template or export step",
+    ),
+    "legislative_rows_total": (
+        "counter",
+        "Rows returned, rendered or exported per operation",
+    ),
+    "legislative_cache_requests_total": (
+        "counter",
+        "Lookups in the page, snapshot and detail caches, by result",
+    ),
+    "legislative_profiles_total": ("counter", "Requests profiled with cProfile"),
+}
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        self.count += 1
+        self.sum += seconds
+        for position, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.counts[position] += 1
+                break
+
+
+def format_labels(labels, **extra) -> str:
+    items = [*labels, *extra.items()]
+    if not items:
+        return ""
+    escaped = (
+        str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        for _, value in items
+    )
+    return "{" + ",".join(
+        f'{name}="{value}"' for (name, _), value in zip(items, escaped)
+    ) + "}"
+
+
+def format_value(value) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsRegistry:
+    """Counters and histograms of one process, keyed by name and labels"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    def value(self, name, **labels):
+        """Current value of a counter, or count of a histogram"""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            if key in self._histograms:
+                return self._histograms[key].count
+            return self._counters.get(key, 0)
+
+    def clear(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def render(self) -> str:
+        """Every metric in the Prometheus text exposition format"""
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(
+                (key, (list(histogram.counts), histogram.count, histogram.sum))
+                for key, histogram in self._histograms.items()
+            )
+
+        lines = []
+        described = set()
+
+        def describe(name):
+            if name not in described:
+                kind, help_text = METRICS.get(name, ("untyped", name))
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                described.add(name)
+
+        for (name, labels), value in counters:
+            describe(name)
+            lines.append(f"{name}{format_labels(labels)} {format_value(value)}")
+
+        for (name, labels), (counts, count, total) in histograms:
+            describe(name)
+            cumulative = 0
+            for bound, bucket in zip(BUCKETS, counts):
+                cumulative += bucket
+                lines.append(
+                    f"{name}_bucket{format_labels(labels, le=bound)} {cumulative}"
+                )
+            lines.append(f"{name}_bucket{format_labels(labels, le='+Inf')} {count}")
+            lines.append(f"{name}_sum{format_labels(labels)} {format_value(total)}")
+            lines.append(f"{name}_count{format_labels(labels)} {count}")
+
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+class RequestTimings:
+    """Time, calls and rows per operation, and cache results, of one request"""
+
+    def __init__(self):
+        self.operations = {}
+        self.caches = {}
+
+    def add(self, operation, seconds=0.0, rows=None, calls=1):
+        entry = self.operations.setdefault(operation, [0.0, 0, None])
+        entry[0] += seconds
+        entry[1] += calls
+        if rows is not None:
+            entry[2] = (entry[2] or 0) + rows
+
+    def cache(self, name, hit):
+        entry = self.caches.setdefault(name, [0, 0])
+        entry[0 if hit else 1] += 1
+
+    def server_timing(self) -> list:
+        """Server-Timing header entries, one per operation and cache"""
+        entries = []
+        for operation, (seconds, calls, rows) in self.operations.items():
+            # No commas in descriptions, which naive header parsers split on
+            notes = [] if rows is None else [f"{rows} rows"]
+            if calls > 1:
+                notes.append(f"{'in ' if notes else ''}{calls} calls")
+            description = f';desc="{" ".join(notes)}"' if notes else ""
+            entries.append(f"{operation};dur={seconds * 1000:.2f}{description}")
+        for name, (hits, misses) in self.caches.items():
+            entries.append(f'cache-{name};desc="{hits} hit {misses} miss"')
+        return entries
+
+
+_current = contextvars.ContextVar("legislative_request_timings", default=None)
+
+
+@contextmanager
+def collecting() -> Iterator[RequestTimings]:
+    """Collect the measurements made in this context into a RequestTimings"""
+    timings = RequestTimings()
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
+
+
+def record(operation, seconds, rows=None):
+    REGISTRY.observe("legislative_operation_seconds", seconds, operation=operation)
+    if rows is not None:
+        REGISTRY.inc("legislative_rows_total", rows, operation=operation)
+    timings = _current.get()
+    if timings is not None:
+        timings.add(operation, seconds, rows)
+
+
+def record_rows(operation, rows):
+    """Rows returned by an operation whose time is measured on its own"""
+    REGISTRY.inc("legislative_rows_total", rows, operation=operation)
+    timings = _current.get()
+    if timings is not None:
+        timings.add(operation, rows=rows, calls=0)
+
+
+def record_cache(name, hit):
+    REGISTRY.inc(
+        "legislative_cache_requests_total", cache=name, result="hit" if hit else "miss"
+    )
+    timings = _current.get()
+    if timings is not None:
+        timings.cache(name, hit)
+
+
+class Timer:
+    """Measures the time of a with block; rows can be set before it exits"""
+
+    def __init__(self, operation, rows: Optional[int] = None):
+        self.operation = operation
+        self.rows = rows
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        record(self.operation, time.perf_counter() - self.start, self.rows)
+
+
+def timed(operation=None):
+    """Decorator timing every call of a function, under its name by default"""
+
+    def decorate(function):
+        name = operation or function.__name__
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with Timer(name):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def timed_iter(operation, items, count_rows=False):
+    """
+    items passed through, timing the work done producing them; with
+    count_rows, the DataFrames yielded are counted as rows
+    """
+    seconds = 0.0
+    rows = 0 if count_rows else None
+    iterator = iter(items)
+    try:
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                seconds += time.perf_counter() - start
+                return
+            seconds += time.perf_counter() - start
+            if count_rows:
+                rows += len(item)
+            yield item
+    finally:
+        record(operation, seconds, rows)
@@ -0,0 +1,134 @@
+"""
+Typed payloads of the detail pages.
+
+The services return plain values only; links and vote badges are left to
+the templates. Breakdown rows are NamedTuples, which are compact, cheap to
+build and turn straight into DataFrames (their fields become the columns)
+for the JSON API and exports.
+"""
+
+from dataclasses import dataclass, field
+from typing import List, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+YES = "Yes"
+NO = "No"
+
+
+class LegislatorVote(NamedTuple):
+    """One row of a bill's voting breakdown"""
+
+    legislator_id: int
+    # None when the legislator is not part of the dataset
+    legislator: Optional[str]
+    vote: str
+
+    @property
+    def display_name(self):
+        return self.legislator or f"Unknown Legislator ({self.legislator_id})"
+
+
+class RollCall(NamedTuple):
+    """Tally of one roll call on a bill"""
+
+    vote_id: int
+    total_votes: int
+    supporters: int
+    opposers: int
+
+
+class BillVote(NamedTuple):
+    """One row of a legislator's bills voted on"""
+
+    bill_id: int
+    title: str
+    vote: str
+
+
+class SponsoredBill(NamedTuple):
+    """One row of a legislator's bills sponsored, with the bill's vote counts"""
+
+    bill_id: int
+    title: str
+    total_votes: int
+    supporters: int
+    opposers: int
+
+
+@dataclass(slots=True)
+class BillDetail:
+    id: int
+    title: str
+    sponsor_id: Optional[int]
+    # None when the sponsor is not part of the dataset
+    sponsor_name: Optional[str]
+    # Counted across every roll call, as in the bills listing
+    total_votes: int = 0
+    supporters: int = 0
+    opposers: int = 0
+    # Every roll call on the bill, in vote id order
+    roll_calls: List[RollCall] = field(default_factory=list)
+    # The roll call vote_details breaks down, the first one unless asked otherwise
+    roll_call: Optional[RollCall] = None
+    vote_details: List[LegislatorVote] = field(default_factory=list)
+    # Bill columns beyond id, title and sponsor_id
+    extra: dict = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class LegislatorDetail:
+    id: int
+    name: str
+    total_votes: int
+    supporters: int
+    opposers: int
+    bills_voted_on: List[BillVote] = field(default_factory=list)
+    sponsored_bills: List[SponsoredBill] = field(default_factory=list)
+    # Legislator columns beyond id and name
+    extra: dict = field(default_factory=dict)
+
+    @property
+    def bills_voted_on_count(self):
+        return len(self.bills_voted_on)
+
+    @property
+    def bills_sponsored_count(self):
+        return len(self.sponsored_bills)
+
+
+def select_roll_call(roll_calls: List[RollCall], vote_id=None) -> Optional[RollCall]:
+    """The roll call with vote_id, or the first one when vote_id is None"""
+    if vote_id is None:
+        return roll_calls[0] if roll_calls else None
+    return next((call for call in roll_calls if call.vote_id == vote_id), None)
+
+
+def vote_breakdown(frame: pd.DataFrame, vote_types, names) -> pd.DataFrame:
+    """
+    frame with a Yes/No vote column (vote_type 1 is yea, anything else counts
+    as nay), in the order of the detail pages: yes votes first, then by names
+    (a Series aligned with frame)
+    """
+    votes = np.where(np.asarray(vote_types) == 1, YES, NO)
+    frame["vote"] = votes
+    # lexsort is stable and sorts on its last key first
+    order = np.lexsort((np.asarray(names, dtype=object), votes == NO))
+    return frame.take(order).reset_index(drop=True)
+
+
+def frame_records(record_type, frame: pd.DataFrame) -> list:
+    """The rows of frame as record_type tuples, with None for missing values"""
+    columns = []
+    for name in record_type._fields:
+        column = frame[name]
+        if column.hasnans:
+            column = column.astype(object).where(column.notna(), None)
+        columns.append(column.tolist())
+    return list(map(record_type, *columns))
+
+
+def records_frame(records: list, record_type) -> pd.DataFrame:
+    """record_type tuples as a DataFrame with one column per field"""
+    return pd.DataFrame.from_records(records, columns=record_type._fields)
@@ -0,0 +1,198 @@
+from typing import Iterator, List
+
+import numpy as np
+import pandas as pd
+
+from .base import FrameRecords, LinkableColumnsList
+from .metrics import Timer
+
+TABLE_CLASSES = "table table-striped table-hover"
+TABLE_CHUNK_ROWS = 5_000
+
+
+class HTMLRenderingMixin:
+    """HTML helpers shared by every LegislativeDataServiceInterface implementation"""
+
+    def make_link(self, url_pattern, item_id, text, css_class=""):
+        """Create HTML link"""
+        class_attr = f' class="{css_class}"' if css_class else ""
+        return f'<a href="{url_pattern.format(id=item_id)}"{class_attr}>{text}</a>'
+
+    def format_date(self, date_str):
+        """Format date string"""
+        if pd.isna(date_str) or date_str == "":
+            return "N/A"
+        try:
+            return pd.to_datetime(date_str).strftime("%Y-%m-%d")
+        except (ValueError, TypeError):
+            return str(date_str)
+
+    def render_table(
+        self, data, linkable_list: List[LinkableColumnsList] = []
+    ) -> pd.DataFrame:
+        """Render DataFrame as HTML table"""
+        return "".join(self.stream_table(data, linkable_list))
+
+    def stream_table(
+        self,
+        data,
+        linkable_list: List[LinkableColumnsList] = [],
+        chunk_rows=TABLE_CHUNK_ROWS,
+    ) -> Iterator[str]:
+        """
+        render_table as a generator: the table head, then the rows chunk_rows
+        at a time, then the closing tags. Only one chunk of rows is formatted
+        at a time, for StreamingHttpResponse.
+        """
+        head_sent = False
+        for chunk in data_chunks(data, chunk_rows):
+            with Timer("render_table", rows=len(chunk)):
+                chunk = display_frame(chunk, linkable_list)
+                head = None if head_sent else table_head(chunk.columns, TABLE_CLASSES)
+                rows = table_rows(chunk, TABLE_CLASSES)
+            if head is not None:
+                yield head
+                head_sent = True
+            yield rows
+        yield TABLE_FOOT
+
+
+def data_chunks(data, chunk_rows) -> Iterator[pd.DataFrame]:
+    """Split rows (FrameRecords, DataFrame or list of dicts) into DataFrame chunks"""
+    if isinstance(data, FrameRecords):
+        yield from data.frames(chunk_rows)
+        return
+
+    # At least one chunk, so an empty table still gets its head
+    for start in range(0, max(len(data), 1), chunk_rows):
+        if isinstance(data, pd.DataFrame):
+            yield data.iloc[start: start + chunk_rows]
+        else:
+            yield pd.DataFrame(data[start: start + chunk_rows])
+
+
+def display_frame(frame: pd.DataFrame, linkable_list) -> pd.DataFrame:
+    """Rows as shown: link columns formatted, id columns dropped"""
+    # Link cells are built column-wise rather than row by row
+    if linkable_list and not frame.empty:
+        links = {
+            column_item["column_name"]: link_column(frame, column_item)
+            for column_item in linkable_list
+        }
+        frame = frame.assign(**links)
+
+    # Filter out ID columns before displaying: remove columns that end with '_id' or are just 'id'
+    id_columns = [col for col in frame.columns if col.endswith("_id") or col == "id"]
+    return frame.drop(columns=id_columns)
+
+
+def link_mask(frame: pd.DataFrame, column_item: LinkableColumnsList):
+    """Boolean mask of the rows to link, or None to link every row"""
+    link_when = column_item.get("link_when")
+    if link_when is not None:
+        return np.asarray(link_when(frame), dtype=bool)
+
+    should_link = column_item.get("should_link")
+    if should_link is not None:
+        # Row predicates still run once per row; prefer link_when for large tables
+        return np.fromiter(
+            (should_link(row) for row in frame.to_dict("records")),
+            dtype=bool,
+            count=len(frame),
+        )
+
+    return None
+
+
+def plain_values(series: pd.Series) -> pd.Series:
+    """
+    Categorical columns as plain object values. Casting a categorical chunk
+    casts its whole category list, which for a slice of a large table costs
+    far more than the chunk itself.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return pd.Series(np.asarray(series), index=series.index, name=series.name)
+    return series
+
+
+def link_column(frame: pd.DataFrame, column_item: LinkableColumnsList) -> pd.Series:
+    """The cells of one link column, same markup as make_link"""
+    text = plain_values(frame[column_item["name"]])
+    ids = plain_values(frame[column_item["item_id"]]).astype(str)
+    css_class = column_item.get("css_class", "")
+    class_attr = f' class="{css_class}"' if css_class else ""
+
+    links = (
+        f'<a href="/{column_item["url_pattern"]}/'
+        + ids
+        + f'/"{class_attr}>'
+        + text.astype(str)
+        + "</a>"
+    )
+
+    mask = link_mask(frame, column_item)
+    if mask is None:
+        return links
+    return links.where(mask, text)
+
+
+def html_cells(series: pd.Series):
+    """Cell text of a column as DataFrame.to_html prints it, or None when it cannot be vectorized"""
+    if pd.api.types.is_integer_dtype(series) or pd.api.types.is_bool_dtype(series):
+        return series.astype(str)
+    if (
+        pd.api.types.is_object_dtype(series)
+        or pd.api.types.is_string_dtype(series)
+        or isinstance(series.dtype, pd.CategoricalDtype)
+    ) and not series.hasnans:
+        return plain_values(series).astype(str)
+    return None
+
+
+def table_head(columns, classes: str) -> str:
+    header = "".join(f"      <th>{column}</th>\n" for column in columns)
+    return (
+        f'<table class="dataframe {classes}">\n'
+        "  <thead>\n"
+        '    <tr style="text-align: left;">\n'
+        f"{header}"
+        "    </tr>\n"
+        "  </thead>\n"
+        "  <tbody>\n"
+    )
+
+
+TABLE_FOOT = "  </tbody>\n</table>"
+
+
+def table_rows(frame: pd.DataFrame, classes: str) -> str:
+    """The <tr> elements for the rows of frame, assembled column-wise"""
+    if len(frame) == 0:
+        return ""
+
+    cells = [html_cells(frame[column]) for column in frame.columns]
+    if any(column is None for column in cells):
+        # Floats and missing values go through pandas' own formatting
+        html = frame.to_html(
+            classes=classes, justify="left", escape=False, index=False, border=0
+        )
+        body_start = html.index("  <tbody>\n") + len("  <tbody>\n")
+        return html[body_start: html.rindex(TABLE_FOOT)]
+
+    if not cells:
+        return "    <tr>\n    </tr>\n" * len(frame)
+
+    rows = "    <tr>\n"
+    for column in cells:
+        rows = rows + "      <td>" + column + "</td>\n"
+    # Joined from the array: the cached .str accessor would tie each chunk's
+    # strings into a reference cycle that lingers until the next gc pass
+    return "".join((rows + "    </tr>\n").to_numpy())
+
+
+def table_html(frame: pd.DataFrame, classes: str) -> str:
+    """
+    Unescaped HTML table with the markup of DataFrame.to_html(index=False,
+    justify="left", border=0), assembled with column-wise string concatenation.
+    """
+    return table_head(frame.columns, classes) + table_rows(frame, classes) + TABLE_FOOT
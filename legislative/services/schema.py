@@ -0,0 +1,88 @@
+"""
+Column dtypes for the four legislative tables.
+
+Every loader (CSV or binary snapshot) runs its frames through apply_schema,
+so ids are 32-bit, vote_type is 8-bit and text is dictionary-coded no matter
+where the data came from.
+"""
+
+import numpy as np
+import pandas as pd
+
+ID = "int32"
+VOTE_TYPE = "int8"
+TEXT = "category"
+
+SCHEMAS = {
+    "legislators": {"id": ID, "name": TEXT},
+    "bills": {"id": ID, "title": TEXT, "sponsor_id": ID},
+    "votes": {"id": ID, "bill_id": ID},
+    "vote_results": {
+        "id": ID,
+        "legislator_id": ID,
+        "vote_id": ID,
+        "vote_type": VOTE_TYPE,
+    },
+}
+
+
+def fits(values: np.ndarray, dtype) -> bool:
+    info = np.iinfo(dtype)
+    return len(values) == 0 or (values.min() >= info.min and values.max() <= info.max)
+
+
+def cast_column(series: pd.Series, dtype: str, strict=False) -> pd.Series:
+    """
+    Cast one column to its schema dtype. Integer columns holding missing values
+    or values out of range for the narrow type are left untouched, or raise
+    ValueError when strict (chunks streamed to disk must all share one dtype).
+    """
+    if dtype == TEXT:
+        return series.astype("category")
+
+    if (
+        series.hasnans
+        or not pd.api.types.is_integer_dtype(series)
+        or not fits(series.to_numpy(), dtype)
+    ):
+        if strict:
+            raise ValueError(
+                f"column {series.name!r} does not fit its schema dtype {dtype}"
+            )
+        return series
+
+    return series.astype(dtype)
+
+
+def apply_schema(
+    table: str, frame: pd.DataFrame, strict=False, dtypes=None
+) -> pd.DataFrame:
+    """
+    Cast the known columns of a table to their schema dtypes, or to those of
+    dtypes where given; other columns pass through
+    """
+    for column, dtype in {**SCHEMAS[table], **(dtypes or {})}.items():
+        if column in frame.columns:
+            frame[column] = cast_column(frame[column], dtype, strict=strict)
+    return frame
+
+
+def empty_table(table: str) -> pd.DataFrame:
+    """A table without rows, with its schema dtypes"""
+    return pd.DataFrame(
+        {column: pd.Series(dtype=dtype) for column, dtype in SCHEMAS[table].items()}
+    )
+
+
+def fill_text(series: pd.Series, value: str) -> pd.Series:
+    """fillna for text columns, registering the fill value as a category when needed"""
+    if isinstance(series.dtype, pd.CategoricalDtype) and value not in series.cat.categories:
+        series = series.cat.add_categories([value])
+    return series.fillna(value)
+
+
+def read_csv(table: str, path) -> pd.DataFrame:
+    text_columns = {
+        column: TEXT for column, dtype in SCHEMAS[table].items() if dtype == TEXT
+    }
+    return apply_schema(table, pd.read_csv(path, dtype=text_columns))
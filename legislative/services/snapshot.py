@@ -0,0 +1,275 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import cached_property, partial, wraps
+
+from . import schema
+from .columnar import (manifest_path, read_groupings, read_snapshot,
+                       read_tallies, snapshot_is_fresh)
+from .indexes import DatasetIndex, build_lookups
+from .metrics import Timer, record_cache, timed
+from .tally import VoteTallies
+
+logger = logging.getLogger(__name__)
+
+TABLES = ("legislators", "bills", "votes", "vote_results")
+
+
+def csv_paths(data_folder):
+    return [os.path.join(data_folder, f"{table}.csv") for table in TABLES]
+
+
+def file_signature(data_folder):
+    """
+    (name, mtime_ns, size) for every table file and the binary snapshot
+    manifest when present; changes whenever a file is replaced.
+    """
+    signature = []
+    for table, path in zip(TABLES, csv_paths(data_folder)):
+        stat = os.stat(path)
+        signature.append((table, stat.st_mtime_ns, stat.st_size))
+    try:
+        stat = os.stat(manifest_path(data_folder))
+        signature.append(("snapshot", stat.st_mtime_ns, stat.st_size))
+    except FileNotFoundError:
+        pass
+    return tuple(signature)
+
+
+def read_csv_tables(data_folder):
+    return {
+        table: schema.read_csv(table, path)
+        for table, path in zip(TABLES, csv_paths(data_folder))
+    }
+
+
+class DatasetSnapshot:
+    """
+    One loaded dataset together with every structure derived from it.
+
+    Snapshots are never mutated once published, so dropping a snapshot
+    invalidates its index, tallies and memoized service results together.
+    """
+
+    def __init__(self, tables, signature, groupings=None, tallies=None):
+        # Every index shared with request threads is built before publication,
+        # see build_lookups: the tables here, the tallies and memoized values
+        # below, and DatasetIndex's own
+        self.legislators = build_lookups(tables["legislators"])
+        self.bills = build_lookups(tables["bills"])
+        self.votes = build_lookups(tables["votes"])
+        self.vote_results = build_lookups(tables["vote_results"])
+        self.signature = signature
+        self.version = hashlib.sha1(repr(signature).encode()).hexdigest()[:12]
+        self.last_modified = max(mtime_ns for _, mtime_ns, _ in signature) / 1e9
+        self._groupings = groupings
+        self._tallies = tallies
+        self._derived = {}
+        self._lock = threading.Lock()
+
+    @cached_property
+    def index(self):
+        return DatasetIndex(
+            self.legislators,
+            self.bills,
+            self.votes,
+            self.vote_results,
+            groupings=self._groupings,
+        )
+
+    @cached_property
+    def tallies(self):
+        tallies = self._tallies or VoteTallies(
+            self.legislators, self.votes, self.vote_results, self.index
+        )
+        build_lookups(tuple(tallies.frames().values()))
+        return tallies
+
+    def memoize(self, key, factory):
+        """Return the cached value for key, computing it with factory() on first use"""
+        with self._lock:
+            if key in self._derived:
+                return self._derived[key]
+        value = build_lookups(factory())
+        with self._lock:
+            return self._derived.setdefault(key, value)
+
+    def memoized(self, key, default=None):
+        """The value memoized under key, without computing it when missing"""
+        return self._derived.get(key, default)
+
+
+class SnapshotManager:
+    """
+    Holds the current DatasetSnapshot for a data folder and swaps in a new one
+    when the files change.
+
+    At most every `reload_interval` seconds a read checks file mtimes/sizes;
+    on a change the new snapshot is loaded and warmed in a background thread
+    while readers keep using the old one, then published with a single
+    attribute assignment. A `reload_interval` of None disables the checks.
+
+    A fresh binary snapshot provides the index groupings and vote tallies
+    along with the tables, so loading one recomputes neither. With `mmap`
+    set, its tables and groupings are memory-mapped so worker processes share
+    their pages.
+
+    `warm` runs before a reloaded snapshot is published; `published` runs
+    after every snapshot (the first one included) becomes current.
+    """
+
+    def __init__(
+        self, data_folder, reload_interval=None, warm=None, mmap=False, published=None
+    ):
+        self.data_folder = data_folder
+        self.reload_interval = reload_interval
+        self.warm = warm
+        self.published = published
+        self.mmap = mmap
+        self._snapshot = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        self._reload_thread = None
+
+    @timed("load")
+    def load(self):
+        signature = file_signature(self.data_folder)
+        if not snapshot_is_fresh(self.data_folder, csv_paths(self.data_folder)):
+            return DatasetSnapshot(read_csv_tables(self.data_folder), signature)
+
+        mmap_mode = "r" if self.mmap else None
+        return DatasetSnapshot(
+            read_snapshot(self.data_folder, mmap_mode=mmap_mode),
+            signature,
+            groupings=read_groupings(self.data_folder, mmap_mode=mmap_mode),
+            tallies=read_tallies(self.data_folder),
+        )
+
+    def current(self) -> DatasetSnapshot:
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                first_load = self._snapshot is None
+                if first_load:
+                    self._snapshot = self.load()
+                    self._last_check = time.monotonic()
+                snapshot = self._snapshot
+            if first_load and self.published:
+                self.published(snapshot)
+            return snapshot
+
+        if self.reload_interval is not None:
+            now = time.monotonic()
+            if now - self._last_check >= self.reload_interval:
+                self._last_check = now
+                self._reload_if_changed(snapshot)
+
+        return snapshot
+
+    def _reload_if_changed(self, snapshot):
+        try:
+            changed = file_signature(self.data_folder) != snapshot.signature
+        except OSError:
+            # A file is being replaced; look again on the next check
+            return
+
+        if not changed:
+            return
+
+        with self._lock:
+            if self._reload_thread is not None and self._reload_thread.is_alive():
+                return
+            self._reload_thread = threading.Thread(
+                target=self.reload, name="legislative-dataset-reload", daemon=True
+            )
+            self._reload_thread.start()
+
+    def reload(self):
+        """Load, warm and publish a fresh snapshot; keeps the old one on failure"""
+        try:
+            snapshot = self.load()
+            if self.warm:
+                self.warm(snapshot)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Failed to reload dataset from %s", self.data_folder)
+            return None
+
+        self._snapshot = snapshot
+        logger.info("Loaded dataset version %s", snapshot.version)
+        if self.published:
+            self.published(snapshot)
+        return snapshot
+
+    def wait_for_reload(self, timeout=None):
+        thread = self._reload_thread
+        if thread is not None:
+            thread.join(timeout)
+
+
+class SnapshotPinning:
+    """
+    Mixin giving a service a per-thread pinned snapshot, so every table and
+    cache read during one service call comes from the same dataset even if a
+    reload is published meanwhile.
+    """
+
+    datasets: SnapshotManager
+
+    @property
+    def _pins(self):
+        pins = self.__dict__.get("_snapshot_pins")
+        if pins is None:
+            pins = self.__dict__.setdefault("_snapshot_pins", threading.local())
+        return pins
+
+    @property
+    def snapshot(self) -> DatasetSnapshot:
+        return getattr(self._pins, "snapshot", None) or self.datasets.current()
+
+    @contextmanager
+    def pinned(self, snapshot=None):
+        pins = self._pins
+        previous = getattr(pins, "snapshot", None)
+        if previous is not None and snapshot is None:
+            yield previous
+            return
+
+        pins.snapshot = snapshot or self.datasets.current()
+        try:
+            yield pins.snapshot
+        finally:
+            pins.snapshot = previous
+
+
+def uses_snapshot(method):
+    """Run a service method against a single pinned snapshot, timing it"""
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.pinned(), Timer(method.__name__):
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+def snapshot_cached(method):
+    """
+    Memoize a no-argument service method on the current snapshot; only the
+    calls computing the value are timed
+    """
+    missing = object()
+
+    @wraps(method)
+    def wrapper(self):
+        with self.pinned() as snapshot:
+            value = snapshot.memoized(method.__name__, missing)
+            record_cache("snapshot", value is not missing)
+            if value is not missing:
+                return value
+            with Timer(method.__name__):
+                return snapshot.memoize(method.__name__, partial(method, self))
+
+    return wrapper
@@ -0,0 +1,140 @@
+import numpy as np
+import pandas as pd
+
+YEA = 1
+NAY = 2
+
+TALLY_COLUMNS = ["yea", "nay", "other", "total"]
+
+
+def tally(codes: np.ndarray, vote_types: np.ndarray, size: int) -> pd.DataFrame:
+    """
+    Count yea/nay/other/total votes per integer-coded key in [0, size).
+    Rows with a -1 code (unknown key) are skipped.
+    """
+    known = codes != -1
+    categories = np.where(
+        vote_types[known] == YEA, 0, np.where(vote_types[known] == NAY, 1, 2)
+    )
+    counts = np.bincount(
+        codes[known] * 3 + categories, minlength=size * 3
+    ).reshape(size, 3)
+
+    return pd.DataFrame(
+        {
+            "yea": counts[:, 0],
+            "nay": counts[:, 1],
+            "other": counts[:, 2],
+            "total": counts.sum(axis=1),
+        }
+    )
+
+
+class VoteTallies:
+    """
+    Per-roll-call, per-bill and per-legislator vote counts.
+
+    Keys are integer-coded through the dataset index so the counting is a
+    bincount over vote_results, with no merges or per-group Python calls.
+    `by_vote` and `by_legislator` are row-aligned with the votes and
+    legislators tables; `by_bill` is indexed by bill_id.
+    """
+
+    def __init__(self, legislators, votes, vote_results, index):
+        vote_types = vote_results["vote_type"].to_numpy()
+
+        self.by_vote = tally(
+            index.vote_positions(vote_results["vote_id"]), vote_types, len(votes)
+        )
+        self.by_vote.index = pd.Index(votes["id"], name="vote_id")
+
+        self.by_legislator = tally(
+            index.legislator_positions(vote_results["legislator_id"]),
+            vote_types,
+            len(legislators),
+        )
+        self.by_legislator.index = pd.Index(
+            legislators["id"], name="legislator_id")
+
+        self.by_bill = self.by_vote.groupby(
+            pd.Index(votes["bill_id"], name="bill_id")
+        ).sum()
+
+    @classmethod
+    def from_frames(cls, by_vote, by_legislator, by_bill):
+        """Rebuild from previously computed tallies (e.g. read from a snapshot)"""
+        tallies = cls.__new__(cls)
+        tallies.by_vote = by_vote
+        tallies.by_legislator = by_legislator
+        tallies.by_bill = by_bill
+        return tallies
+
+    def frames(self):
+        return {
+            "by_vote": self.by_vote,
+            "by_legislator": self.by_legislator,
+            "by_bill": self.by_bill,
+        }
+
+    def extended(self, legislators, votes, vote_results, index, appended_from):
+        """
+        Tallies of the dataset after rows were appended to its tables, without
+        recounting the earlier vote results.
+
+        The arguments describe the extended dataset, whose vote results from
+        row appended_from on are new. Those are counted, along with earlier
+        results of appended legislators or roll calls, which were skipped as
+        unknown until now. by_vote and by_legislator are copied to make room
+        for the appended rows; everything else costs O(counted results).
+        """
+        appended = np.arange(appended_from, len(vote_results))
+        vote_types = vote_results["vote_type"].to_numpy()
+
+        def counted(grouped, new_ids):
+            earlier = grouped.positions_many(new_ids)
+            return np.concatenate([appended, earlier[earlier < appended_from]])
+
+        rows = counted(index.results_by_vote, votes["id"].iloc[len(self.by_vote):])
+        vote_delta = tally(
+            index.vote_positions(vote_results["vote_id"].to_numpy()[rows]),
+            vote_types[rows],
+            len(votes),
+        )
+        by_vote = grown(self.by_vote, pd.Index(votes["id"], name="vote_id"))
+        by_vote += vote_delta.to_numpy()
+
+        rows = counted(
+            index.results_by_legislator,
+            legislators["id"].iloc[len(self.by_legislator):],
+        )
+        by_legislator = grown(
+            self.by_legislator, pd.Index(legislators["id"], name="legislator_id")
+        )
+        by_legislator += tally(
+            index.legislator_positions(vote_results["legislator_id"].to_numpy()[rows]),
+            vote_types[rows],
+            len(legislators),
+        ).to_numpy()
+
+        # Bills gain the counts of the roll calls counted into, and a key for
+        # every appended roll call even without results, as in the full groupby
+        touched = vote_delta["total"].to_numpy() > 0
+        touched[len(self.by_vote):] = True
+        bill_delta = vote_delta[touched].groupby(
+            pd.Index(votes["bill_id"].to_numpy()[touched], name="bill_id")
+        ).sum()
+        by_bill = self.by_bill.add(bill_delta, fill_value=0).astype(
+            self.by_bill.dtypes.to_dict()
+        )
+
+        return VoteTallies.from_frames(by_vote, by_legislator, by_bill)
+
+
+def grown(counts: pd.DataFrame, keys: pd.Index) -> pd.DataFrame:
+    """
+    counts reindexed on keys, whose first len(counts) entries are its own
+    index, with zero counts for the others
+    """
+    values = np.zeros((len(keys), len(counts.columns)), dtype=np.int64)
+    values[: len(counts)] = counts.to_numpy()
+    return pd.DataFrame(values, index=keys, columns=counts.columns)
@@ -0,0 +1,39 @@
+import os
+import shutil
+
+import pytest
+from django.conf import settings
+
+
+@pytest.fixture
+def dataset_folder(tmp_path):
+    """A writable copy of the bundled data/*.csv files"""
+    for name in ("legislators", "bills", "votes", "vote_results"):
+        shutil.copy(
+            os.path.join(settings.BASE_DIR, "data", f"{name}.csv"),
+            tmp_path / f"{name}.csv",
+        )
+    return tmp_path
+
+
+@pytest.fixture
+def roll_calls_folder(dataset_folder):
+    """
+    The bundled data with two more roll calls on bill 2952375: 3300001, listed
+    last but the earliest by id, and 3400000
+    """
+    with open(dataset_folder / "votes.csv", "a", encoding="utf-8") as file:
+        file.write("\n3400000,2952375\n3300001,2952375\n")
+    with open(dataset_folder / "vote_results.csv", "a", encoding="utf-8") as file:
+        file.write(
+            "\n".join(
+                [
+                    "95000001,400440,3300001,1",
+                    "95000002,17941,3300001,1",
+                    "95000003,1,3300001,2",
+                    "95000004,400440,3400000,2",
+                ]
+            )
+            + "\n"
+        )
+    return dataset_folder
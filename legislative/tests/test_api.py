@@ -0,0 +1,141 @@
+import json
+
+import pytest
+
+from legislative.services import legislative_service
+from legislative.services.base import TableQuery
+from legislative.services.csv_service import CSVLegislativeDataService
+
+
+def walk(client, url, params):
+    """Every result of a paginated endpoint, following the next links"""
+    response = client.get(url, params).json()
+    results = response["results"]
+    while response["next"]:
+        response = client.get(response["next"]).json()
+        results += response["results"]
+    return results
+
+
+class TestJsonApi:
+    """
+    Test class for the JSON API, checked against the listing queries and
+    detail pages of the HTML views.
+    """
+
+    @pytest.mark.parametrize(
+        "sort", ["", "id", "-id", "title", "-sponsor", "-total_votes", "nay_votes"]
+    )
+    def test_bills_cursor_walk_matches_listing(self, client, sort):
+        results = walk(client, "/api/bills/", {"sort": sort, "limit": 1})
+        query = TableQuery(
+            page_size=None, sort=sort.lstrip("-") or None, descending="-" in sort
+        )
+        assert results == list(legislative_service.query_bills(query).rows)
+
+    @pytest.mark.parametrize(
+        "params",
+        [
+            {"sort": "-total_votes", "limit": 3},
+            {"sort": "legislator", "limit": 4, "q": "rep. a"},
+            {"sort": "-bills_sponsored", "limit": 2, "q": "(D-"},
+            {"limit": 7},
+        ],
+    )
+    def test_legislators_cursor_walk_matches_listing(self, client, params):
+        results = walk(client, "/api/legislators/", params)
+        sort = params.get("sort", "")
+        query = TableQuery(
+            page_size=None,
+            sort=sort.lstrip("-") or None,
+            descending="-" in sort,
+            search=params.get("q", ""),
+        )
+        expected = legislative_service.query_legislators(query)
+        assert results == list(expected.rows)
+        assert client.get("/api/legislators/", params).json()["count"] == expected.total
+
+    def test_fields_projection(self, client):
+        response = client.get("/api/legislators/", {"fields": "legislator,id"}).json()
+        assert all(list(row) == ["legislator", "id"] for row in response["results"])
+
+        record = client.get("/api/bills/2952375/", {"fields": "title"}).json()
+        assert record == {"title": "H.R. 5376: Build Back Better Act"}
+
+        response = client.get("/api/bills/", {"fields": "title,sponsor_link"})
+        assert response.status_code == 400
+        assert "sponsor_link" in response.json()["error"]
+
+    def test_records_match_listing(self, client):
+        bills = legislative_service.get_complete_bills_data()
+        for bill in bills:
+            assert client.get(f"/api/bills/{bill['id']}/").json() == bill
+
+        legislator = legislative_service.get_complete_legislators_data()[0]
+        assert client.get(f"/api/legislators/{legislator['id']}/").json() == legislator
+
+        assert client.get("/api/bills/1/").status_code == 404
+        assert client.get("/api/legislators/1/votes/").status_code == 404
+
+    def test_vote_breakdowns_match_detail_pages(self, client):
+        for bill in legislative_service.get_complete_bills_data():
+            detail = legislative_service.get_bill_by_id(bill["id"])
+            votes = walk(client, f"/api/bills/{bill['id']}/votes/", {"limit": 4})
+            assert votes == [row._asdict() for row in detail.vote_details]
+
+        for legislator_id in legislative_service.legislators["id"]:
+            detail = legislative_service.get_legislator_by_id(legislator_id)
+            votes = walk(client, f"/api/legislators/{legislator_id}/votes/", {})
+            assert votes == [row._asdict() for row in detail.bills_voted_on]
+
+    def test_roll_calls(self, client):
+        response = client.get("/api/bills/2952375/roll-calls/").json()
+        assert response["results"] == [
+            {"vote_id": 3321166, "total_votes": 19, "supporters": 6, "opposers": 13}
+        ]
+
+        picked = client.get("/api/bills/2952375/votes/", {"roll_call": 3321166})
+        assert picked.json() == client.get("/api/bills/2952375/votes/").json()
+        assert (
+            client.get("/api/bills/2952375/votes/", {"roll_call": 3314452}).status_code
+            == 404
+        )
+        assert (
+            client.get("/api/bills/2952375/votes/", {"roll_call": "x"}).status_code
+            == 400
+        )
+
+    @pytest.mark.parametrize(
+        "cursor",
+        [
+            "not a cursor",
+            # {"sort":"-total_votes","after":[2,17941]} used on another sort order
+            "eyJzb3J0IjoiLXRvdGFsX3ZvdGVzIiwiYWZ0ZXIiOlsyLDE3OTQxXX0",
+            # {"sort":"","after":["x",1]}: text value for the id column
+            "eyJzb3J0IjoiIiwiYWZ0ZXIiOlsieCIsMV19",
+        ],
+    )
+    def test_invalid_cursor(self, client, cursor):
+        response = client.get("/api/legislators/", {"cursor": cursor})
+        assert response.status_code == 400
+
+    def test_bill_without_sponsor(self, client, monkeypatch, dataset_folder):
+        with open(dataset_folder / "bills.csv", "a", encoding="utf-8") as file:
+            file.write("\n3000000,H.R. 1: Unsponsored Act,\n")
+        service = CSVLegislativeDataService(data_folder=dataset_folder)
+        monkeypatch.setattr(legislative_service, "datasets", service.datasets)
+
+        response = client.get("/api/bills/3000000/")
+        # Parsed strictly: NaN is not JSON
+        record = json.loads(response.content, parse_constant=pytest.fail)
+        assert record["sponsor_id"] is None
+        assert record["sponsor"] == "Unknown Sponsor"
+
+        listing = json.loads(
+            client.get("/api/bills/", {"sort": "id"}).content,
+            parse_constant=pytest.fail,
+        )["results"]
+        assert [bill["sponsor_id"] for bill in listing] == [400100, 412211, None]
+
+        page = client.get("/bills/").content.decode()
+        assert "Unsponsored Act" in page and "<NA>" not in page
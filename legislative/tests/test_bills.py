@@ -1,4 +1,7 @@
 from legislative.services import legislative_service
+from legislative.services.base import TableQuery
+from legislative.services.csv_service import CSVLegislativeDataService
+from legislative.services.records import RollCall
 
 
 class TestCSVService:
@@ -30,3 +33,82 @@ class TestCSVService:
         assert len(legislators) == 20
         assert len_without_votes["legislator"] == "Rep. John Yarmuth (D-KY-3)"
         assert len_without_votes["total_votes"] == 0
+
+    def test_sponsored_bill_tallies_match_bills_listing(self):
+        bills = {
+            bill["id"]: bill for bill in legislative_service.get_complete_bills_data()
+        }
+        legislator = legislative_service.get_legislator_by_id(412211)
+
+        assert legislator.bills_sponsored_count == 1
+        for sponsored in legislator.sponsored_bills:
+            bill = bills[sponsored.bill_id]
+            assert sponsored.supporters == bill["yea_votes"]
+            assert sponsored.opposers == bill["nay_votes"]
+            assert sponsored.total_votes == bill["total_votes"]
+
+    def test_query_bills_pages_sorts_and_filters(self):
+        bills = legislative_service.get_complete_bills_data()
+
+        page = legislative_service.query_bills(
+            TableQuery(page=1, page_size=1, sort="title", descending=True)
+        )
+        assert page.total == len(bills) and page.num_pages == len(bills)
+        assert page.rows[0]["title"] == max(bill["title"] for bill in bills)
+
+        second = legislative_service.query_bills(
+            TableQuery(page=2, page_size=1, sort="title", descending=True)
+        )
+        assert second.rows[0]["title"] == min(bill["title"] for bill in bills)
+
+        unknown = legislative_service.query_bills(TableQuery(search="unknown"))
+        assert [bill["id"] for bill in unknown.rows] == [2900994]
+
+    def test_query_legislators_search_is_case_insensitive(self):
+        page = legislative_service.query_legislators(
+            TableQuery(search="yarmuth", sort="total_votes")
+        )
+
+        assert page.total == 1
+        assert page.rows[0]["id"] == 412211
+
+        empty = legislative_service.query_legislators(TableQuery(search="nobody"))
+        assert empty.total == 0 and empty.rows == []
+
+
+class TestRollCalls:
+    """Test class for bills voted on in several roll calls"""
+
+    def test_bill_details_cover_every_roll_call(self, roll_calls_folder):
+        service = CSVLegislativeDataService(data_folder=roll_calls_folder)
+        bill = service.get_bill_by_id(2952375)
+
+        assert bill.roll_calls == [
+            RollCall(3300001, 3, 2, 1),
+            RollCall(3321166, 19, 6, 13),
+            RollCall(3400000, 1, 0, 1),
+        ]
+        listed = service.get_bill_record(2952375)
+        assert (bill.total_votes, bill.supporters, bill.opposers) == (
+            listed["total_votes"],
+            listed["yea_votes"],
+            listed["nay_votes"],
+        )
+
+        # The first roll call by id is broken down unless another is picked
+        assert bill.roll_call.vote_id == 3300001
+        assert [(row.legislator_id, row.vote) for row in bill.vote_details] == [
+            (400440, "Yes"),
+            (17941, "Yes"),
+            (1, "No"),
+        ]
+        assert bill.vote_details[2].display_name == "Unknown Legislator (1)"
+
+        passage = service.get_bill_by_id(2952375, 3321166)
+        assert passage.roll_call == bill.roll_calls[1]
+        assert passage.vote_details == legislative_service.get_bill_by_id(
+            2952375
+        ).vote_details
+
+        assert service.get_bill_by_id(2952375, 3314452) is None
+        assert len(service.get_bill_roll_calls(2952375)) == 3
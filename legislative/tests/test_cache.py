@@ -0,0 +1,123 @@
+import pytest
+from django.core.cache import caches
+from django.utils.http import http_date
+
+from legislative import cache, views
+from legislative.services import legislative_service
+
+
+@pytest.fixture
+def page_cache(settings):
+    caches[settings.LEGISLATIVE_PAGE_CACHE].clear()
+    yield caches[settings.LEGISLATIVE_PAGE_CACHE]
+    caches[settings.LEGISLATIVE_PAGE_CACHE].clear()
+
+
+class TestPageCache:
+    """
+    Test class for the rendered page cache of the detail and listing views,
+    keyed on the dataset version.
+    """
+
+    def test_detail_page_is_served_from_cache(self, client, page_cache, monkeypatch):
+        first = client.get("/bills/2952375/")
+
+        def fail(*args):
+            raise AssertionError("rendered again")
+
+        monkeypatch.setattr(legislative_service, "get_bill_by_id", fail)
+        second = client.get("/bills/2952375/")
+
+        assert second.status_code == 200
+        assert second.content == first.content
+        assert second["Content-Type"] == first["Content-Type"]
+
+    def test_new_dataset_version_renders_again(self, client, page_cache, monkeypatch):
+        client.get("/legislators/412211/")
+        calls = []
+        get_legislator_by_id = legislative_service.get_legislator_by_id
+
+        def counting(legislator_id):
+            calls.append(legislator_id)
+            return get_legislator_by_id(legislator_id)
+
+        monkeypatch.setattr(legislative_service, "get_legislator_by_id", counting)
+        client.get("/legislators/412211/")
+        assert calls == []
+
+        monkeypatch.setattr(legislative_service, "data_version", lambda: "reloaded")
+        client.get("/legislators/412211/")
+        assert calls == [412211]
+
+    def test_missing_objects_are_not_cached(self, client, page_cache):
+        assert client.get("/bills/1/").status_code == 404
+        assert client.get("/bills/1/").status_code == 404
+
+    def test_listing_pages_are_cached_per_query(self, client, page_cache, monkeypatch):
+        sorted_page = client.get("/legislators/", {"sort": "-total_votes"}).content
+
+        monkeypatch.setattr(
+            legislative_service,
+            "query_legislators",
+            lambda query: pytest.fail("queried again"),
+        )
+        assert client.get("/legislators/", {"sort": "-total_votes"}).content == (
+            sorted_page
+        )
+        with pytest.raises(pytest.fail.Exception):
+            client.get("/legislators/", {"sort": "total_votes"})
+
+    def test_disabled_cache_renders_every_time(self, client, settings):
+        settings.LEGISLATIVE_PAGE_CACHE = None
+
+        assert cache.page_cache() is None
+        assert views.cached_fragment("view", 1, lambda: "fresh") == "fresh"
+        assert client.get("/bills/2952375/").status_code == 200
+
+
+class TestConditionalResponses:
+    """
+    Test class for the ETag / Last-Modified validators, derived from the
+    dataset version and the data files' modification time.
+    """
+
+    @pytest.mark.parametrize(
+        "url",
+        ["/", "/bills/?page=1", "/legislators/412211/", "/bills/download/"],
+    )
+    def test_matching_etag_gets_not_modified(self, client, url):
+        response = client.get(url)
+        etag = response["ETag"]
+
+        revalidated = client.get(url, headers={"If-None-Match": etag})
+
+        assert revalidated.status_code == 304
+        assert revalidated.content == b""
+        assert revalidated["ETag"] == etag
+
+    def test_last_modified_comes_from_the_dataset(self, client):
+        response = client.get("/legislators/")
+
+        assert response["Last-Modified"] == http_date(
+            legislative_service.data_last_modified().timestamp()
+        )
+        revalidated = client.get(
+            "/legislators/", headers={"If-Modified-Since": response["Last-Modified"]}
+        )
+        assert revalidated.status_code == 304
+
+    def test_etag_changes_with_dataset_query_and_format(self, client, monkeypatch):
+        etag = client.get("/bills/")["ETag"]
+
+        assert client.get("/bills/", {"sort": "title"})["ETag"] != etag
+        assert (
+            client.get("/bills/download/")["ETag"]
+            != client.get("/bills/download/", headers={"Accept-Encoding": "gzip"})[
+                "ETag"
+            ]
+        )
+
+        monkeypatch.setattr(legislative_service, "data_version", lambda: "reloaded")
+        response = client.get("/bills/", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response["ETag"] != etag
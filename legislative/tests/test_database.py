@@ -0,0 +1,218 @@
+from io import StringIO
+
+import pandas as pd
+import pytest
+from django.core.management import call_command
+
+from legislative.services import legislative_service as csv_service
+from legislative.services.base import TableQuery
+from legislative.services.csv_service import CSVLegislativeDataService
+from legislative.services.database_service import DatabaseLegislativeDataService
+
+
+@pytest.fixture
+def database_service(db):
+    call_command("ingest", backend="database", stdout=StringIO())
+    return DatabaseLegislativeDataService()
+
+
+def by_id(rows):
+    return sorted(rows, key=lambda row: row["id"])
+
+
+class TestDatabaseService:
+    """
+    Test class for the Django ORM service, checked against the CSV service
+    loaded from the same files.
+    """
+
+    def test_stats(self, database_service):
+        assert database_service.get_stats() == csv_service.get_stats()
+
+    def test_data_version_reads_one_row_and_changes_with_every_ingest(
+        self, database_service, django_assert_num_queries
+    ):
+        with django_assert_num_queries(1):
+            version = database_service.data_version()
+
+        call_command("ingest", backend="database", stdout=StringIO())
+
+        assert database_service.data_version() != version
+
+    def test_get_complete_bills_data(self, database_service):
+        assert by_id(database_service.get_complete_bills_data()) == by_id(
+            csv_service.get_complete_bills_data()
+        )
+
+    def test_get_complete_legislators_data(self, database_service):
+        assert by_id(database_service.get_complete_legislators_data()) == by_id(
+            csv_service.get_complete_legislators_data()
+        )
+
+    def test_detail_pages_match_csv_service(self, database_service):
+        for bill_id in csv_service.bills["id"]:
+            assert database_service.get_bill_by_id(
+                bill_id
+            ) == csv_service.get_bill_by_id(bill_id)
+
+        for legislator_id in csv_service.legislators["id"]:
+            assert database_service.get_legislator_by_id(
+                legislator_id
+            ) == csv_service.get_legislator_by_id(legislator_id)
+
+        assert database_service.get_bill_by_id(-1) is None
+        assert database_service.get_legislator_by_id(-1) is None
+
+    @pytest.mark.parametrize(
+        "query",
+        [
+            TableQuery(page=2, page_size=7, sort="total_votes", descending=True),
+            TableQuery(page=1, page_size=5, sort="legislator"),
+            TableQuery(search="rep.", sort="bills_sponsored", descending=True),
+            TableQuery(page=9, page_size=5),
+        ],
+    )
+    def test_query_legislators_matches_csv_service(self, database_service, query):
+        assert database_service.query_legislators(
+            query
+        ) == csv_service.query_legislators(query)
+
+    @pytest.mark.parametrize(
+        "query",
+        [
+            TableQuery(sort="sponsor"),
+            TableQuery(sort="yea_votes", descending=True),
+            TableQuery(search="unknown"),
+        ],
+    )
+    def test_query_bills_matches_csv_service(self, database_service, query):
+        assert database_service.query_bills(query) == csv_service.query_bills(query)
+
+    @pytest.mark.parametrize(
+        "query",
+        [
+            TableQuery(page_size=3, sort="legislator", after=("Rep. C", 0)),
+            TableQuery(
+                page_size=4, sort="total_votes", descending=True, after=(2, 400000)
+            ),
+            TableQuery(page_size=5, descending=True, after=(412000, 412000)),
+            TableQuery(page_size=5, search="(R-", sort="no_votes", after=(1, 0)),
+        ],
+    )
+    def test_keyset_queries_match_csv_service(self, database_service, query):
+        assert database_service.query_legislators(
+            query
+        ) == csv_service.query_legislators(query)
+
+    def test_records_and_vote_breakdowns_match_csv_service(self, database_service):
+        for bill_id in csv_service.bills["id"]:
+            assert database_service.get_bill_record(
+                bill_id
+            ) == csv_service.get_bill_record(bill_id)
+            pd.testing.assert_frame_equal(
+                database_service.get_bill_votes(bill_id),
+                csv_service.get_bill_votes(bill_id),
+                check_dtype=False,
+            )
+
+        for legislator_id in csv_service.legislators["id"]:
+            assert database_service.get_legislator_record(
+                legislator_id
+            ) == csv_service.get_legislator_record(legislator_id)
+            pd.testing.assert_frame_equal(
+                database_service.get_legislator_votes(legislator_id),
+                csv_service.get_legislator_votes(legislator_id),
+                check_dtype=False,
+            )
+
+        assert database_service.get_bill_record(-1) is None
+        assert database_service.get_legislator_votes(-1) is None
+
+    def test_roll_calls_match_csv_service(self, db, roll_calls_folder):
+        call_command(
+            "ingest",
+            backend="database",
+            data_folder=str(roll_calls_folder),
+            # Keeps the result of an unknown legislator, as the CSV service does
+            invalid="keep",
+            stdout=StringIO(),
+        )
+        database_service = DatabaseLegislativeDataService()
+        service = CSVLegislativeDataService(data_folder=roll_calls_folder)
+
+        for vote_id in (None, 3300001, 3321166, 3400000, 3314452):
+            assert database_service.get_bill_by_id(
+                2952375, vote_id
+            ) == service.get_bill_by_id(2952375, vote_id)
+
+        database_matrix = pd.concat(database_service.iter_vote_matrix_export())
+        csv_matrix = pd.concat(service.iter_vote_matrix_export())
+        assert sorted(database_matrix.columns) == sorted(csv_matrix.columns)
+        pd.testing.assert_frame_equal(
+            database_matrix.set_index("legislator_id").sort_index(),
+            csv_matrix.set_index("legislator_id")
+            .sort_index()[database_matrix.columns[1:]],
+            check_dtype=False,
+            check_index_type=False,
+        )
+
+    def test_extra_columns_match_csv_service(self, db, dataset_folder):
+        for table, column, value in (
+            ("bills", "status", "introduced"),
+            ("legislators", "term", 2),
+        ):
+            frame = pd.read_csv(dataset_folder / f"{table}.csv")
+            frame[column] = value
+            frame.to_csv(dataset_folder / f"{table}.csv", index=False)
+        call_command(
+            "ingest",
+            backend="database",
+            data_folder=str(dataset_folder),
+            stdout=StringIO(),
+        )
+        database_service = DatabaseLegislativeDataService()
+        service = CSVLegislativeDataService(data_folder=dataset_folder)
+
+        bill = database_service.get_bill_by_id(2952375)
+        assert bill.extra == {"status": "introduced"}
+        assert bill == service.get_bill_by_id(2952375)
+        legislator = database_service.get_legislator_by_id(412211)
+        assert legislator.extra == {"term": 2}
+        assert legislator == service.get_legislator_by_id(412211)
+
+    def test_export_chunks_match_csv_service(self, database_service):
+        for database_chunks, csv_chunks in (
+            (
+                database_service.iter_bills_export(chunk_rows=1),
+                csv_service.iter_bills_export(chunk_rows=1),
+            ),
+            (
+                database_service.iter_legislators_export(chunk_rows=6),
+                csv_service.iter_legislators_export(chunk_rows=6),
+            ),
+        ):
+            database_rows = pd.concat(database_chunks).to_dict("records")
+            csv_rows = pd.concat(csv_chunks).astype(object).to_dict("records")
+            assert by_id(database_rows) == by_id(csv_rows)
+
+    def test_vote_exports_match_csv_service(self, database_service):
+        database_positions = pd.concat(
+            database_service.iter_vote_positions_export(chunk_rows=10)
+        )
+        csv_positions = pd.concat(csv_service.iter_vote_positions_export())
+        assert sorted(database_positions.astype(object).itertuples(index=False)) == (
+            sorted(csv_positions.astype(object).itertuples(index=False))
+        )
+
+        database_matrix = pd.concat(
+            database_service.iter_vote_matrix_export(chunk_rows=3)
+        ).set_index("legislator_id")
+        csv_matrix = pd.concat(csv_service.iter_vote_matrix_export()).set_index(
+            "legislator_id"
+        )
+        pd.testing.assert_frame_equal(
+            database_matrix.sort_index(),
+            csv_matrix.loc[database_matrix.index].sort_index()[database_matrix.columns],
+            check_dtype=False,
+            check_index_type=False,
+        )
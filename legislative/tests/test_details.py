@@ -0,0 +1,87 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from legislative.services.csv_service import CSVLegislativeDataService
+from legislative.services.details import deep_size
+
+
+def precomputing_service(settings, dataset_folder, max_bytes=256 << 20):
+    settings.LEGISLATIVE_DETAIL_PRECOMPUTE = True
+    settings.LEGISLATIVE_DETAIL_PRECOMPUTE_MAX_BYTES = max_bytes
+    return CSVLegislativeDataService(data_folder=dataset_folder)
+
+
+class TestDetailPrecompute:
+    """
+    Test class for the detail payloads precomputed in the background when a
+    dataset snapshot is published.
+    """
+
+    def test_every_detail_is_precomputed(self, settings, dataset_folder):
+        service = precomputing_service(settings, dataset_folder)
+        lazy = CSVLegislativeDataService(data_folder=dataset_folder)
+
+        details = service.datasets.current().memoized("detail_cache")
+        details.wait(timeout=10)
+
+        assert details.complete
+        assert len(details.entries) == len(service.bills) + len(service.legislators)
+        for bill_id in service.bills["id"]:
+            assert service.get_bill_by_id(bill_id) is details.get(("bill", bill_id))
+            assert service.get_bill_by_id(bill_id) == lazy.get_bill_by_id(bill_id)
+        for legislator_id in service.legislators["id"]:
+            assert service.get_legislator_by_id(
+                legislator_id
+            ) == lazy.get_legislator_by_id(legislator_id)
+
+    def test_budget_caps_precompute_and_misses_are_computed(
+        self, settings, dataset_folder
+    ):
+        lazy = CSVLegislativeDataService(data_folder=dataset_folder)
+        # Room for the most-voted legislator only
+        budget = deep_size(lazy.get_legislator_by_id(904789)) + 100
+        service = precomputing_service(settings, dataset_folder, max_bytes=budget)
+
+        details = service.datasets.current().memoized("detail_cache")
+        details.wait(timeout=10)
+
+        assert not details.complete
+        assert len(details.entries) == 1
+        assert details.size <= budget
+        assert details.get(("legislator", 904789)) is not None
+        assert service.get_legislator_by_id(412211) == lazy.get_legislator_by_id(
+            412211
+        )
+        assert service.get_bill_by_id(2952375) == lazy.get_bill_by_id(2952375)
+        assert service.get_bill_by_id(-1) is None
+
+    def test_disabled_by_default(self, dataset_folder):
+        service = CSVLegislativeDataService(data_folder=dataset_folder)
+
+        assert service.get_bill_by_id(2952375).id == 2952375
+        assert service.datasets.current().memoized("detail_cache") is None
+
+
+class TestConcurrentFirstCalls:
+    """
+    Test class for detail lookups made by many request threads at once right
+    after a dataset is loaded.
+    """
+
+    def test_concurrent_first_legislator_details(self, dataset_folder):
+        expected = CSVLegislativeDataService(
+            data_folder=dataset_folder
+        ).get_legislator_by_id(412211)
+
+        with ThreadPoolExecutor(16) as pool:
+            for _ in range(30):
+                service = CSVLegislativeDataService(data_folder=dataset_folder)
+                service.get_bill_vote_counts()
+                barrier = threading.Barrier(16)
+
+                def first_call():
+                    barrier.wait()
+                    return service.get_legislator_by_id(412211)
+
+                results = [pool.submit(first_call) for _ in range(16)]
+                assert all(result.result() == expected for result in results)
@@ -0,0 +1,159 @@
+import gzip
+import io
+
+import pandas as pd
+import pytest
+
+from legislative.services import export, legislative_service
+from legislative.services.csv_service import CSVLegislativeDataService
+
+
+def read_download(response):
+    content = b"".join(response.streaming_content)
+    if response.get("Content-Encoding") == "gzip":
+        content = gzip.decompress(content)
+    return pd.read_csv(io.BytesIO(content))
+
+
+class TestExport:
+    """
+    Test class for the streamed downloads, checked against the export
+    DataFrames of the service.
+    """
+
+    def test_export_chunks_concatenate_to_export_frame(self):
+        chunks = list(legislative_service.iter_legislators_export(chunk_rows=7))
+
+        assert [len(chunk) for chunk in chunks] == [7, 7, 6]
+        pd.testing.assert_frame_equal(
+            pd.concat(chunks),
+            legislative_service.get_legislators_data_for_export(),
+        )
+
+    def test_download_streams_plain_csv(self, client):
+        response = client.get("/bills/download/")
+
+        assert response.streaming
+        assert "Content-Encoding" not in response
+        exported = read_download(response)
+        assert exported.to_dict("records") == (
+            legislative_service.get_bills_data_for_export()
+            .astype({"title": str, "sponsor": str})
+            .to_dict("records")
+        )
+
+    def test_download_is_gzipped_when_accepted(self, client):
+        response = client.get(
+            "/legislator/download/", headers={"Accept-Encoding": "gzip, deflate"}
+        )
+
+        assert response["Content-Encoding"] == "gzip"
+        assert response["Vary"] == "Accept, Accept-Encoding"
+        exported = read_download(response)
+        assert len(exported) == 20
+        assert list(exported.columns) == list(
+            legislative_service.get_legislators_data_for_export().columns
+        )
+
+    def test_download_serves_ndjson(self, client):
+        response = client.get("/bills/download/", {"format": "ndjson"})
+
+        assert response["Content-Type"] == "application/x-ndjson"
+        exported = pd.read_json(
+            io.BytesIO(b"".join(response.streaming_content)), lines=True
+        )
+        assert list(exported["id"]) == list(
+            legislative_service.get_bills_data_for_export()["id"]
+        )
+
+    @pytest.mark.parametrize(
+        "params, headers",
+        [
+            ({"format": "parquet"}, {}),
+            ({}, {"Accept": "application/vnd.apache.parquet"}),
+        ],
+    )
+    def test_download_serves_typed_parquet(self, client, params, headers):
+        pq = pytest.importorskip("pyarrow.parquet")
+
+        response = client.get("/legislator/download/", params, headers=headers)
+
+        assert response["Content-Type"] == "application/vnd.apache.parquet"
+        table = pq.read_table(io.BytesIO(b"".join(response.streaming_content)))
+        assert str(table.schema.field("id").type) == "int32"
+        assert str(table.schema.field("legislator").type) == "string"
+        assert table.num_rows == 20
+
+    def test_download_serves_arrow_stream(self, client):
+        pa = pytest.importorskip("pyarrow")
+
+        response = client.get(
+            "/bills/download/",
+            {"format": "arrow"},
+            headers={"Accept-Encoding": "gzip"},
+        )
+
+        content = gzip.decompress(b"".join(response.streaming_content))
+        table = pa.ipc.open_stream(content).read_all()
+        assert table.column("sponsor").to_pylist() == list(
+            legislative_service.get_bills_data_for_export()["sponsor"]
+        )
+
+    def test_unknown_or_unavailable_format_is_refused(self, client, monkeypatch):
+        assert client.get("/bills/download/", {"format": "xml"}).status_code == 400
+
+        monkeypatch.setattr(export, "pa", None)
+        assert client.get("/bills/download/", {"format": "parquet"}).status_code == 406
+        assert client.get("/bills/download/", {"format": "ndjson"}).status_code == 200
+
+    def test_vote_positions_download_has_every_result(self, client):
+        exported = read_download(client.get("/votes/download/"))
+
+        vote_results = legislative_service.vote_results
+        assert list(exported.columns) == [
+            "legislator_id",
+            "bill_id",
+            "vote_id",
+            "vote_type",
+        ]
+        assert list(exported["vote_id"]) == list(vote_results["vote_id"])
+        assert list(exported["vote_type"]) == list(vote_results["vote_type"])
+
+    def test_vote_matrix_has_a_column_per_roll_call(
+        self, client, monkeypatch, roll_calls_folder
+    ):
+        service = CSVLegislativeDataService(data_folder=roll_calls_folder)
+        monkeypatch.setattr(legislative_service, "datasets", service.datasets)
+        matrix = read_download(
+            client.get("/votes/download/", {"layout": "dense"})
+        ).set_index("legislator_id")
+
+        columns = [
+            f"{bill_id}:{roll_call.vote_id}"
+            for bill_id in service.bills["id"]
+            for roll_call in service.get_bill_by_id(bill_id).roll_calls
+        ]
+        assert list(matrix.columns) == ["legislator", *columns]
+        assert [column for column in columns if column.startswith("2952375:")] == [
+            "2952375:3300001",
+            "2952375:3321166",
+            "2952375:3400000",
+        ]
+        for column in columns:
+            bill_id, vote_id = map(int, column.split(":"))
+            details = service.get_bill_by_id(bill_id, vote_id).vote_details
+            voted = {
+                row.legislator_id: 1 if row.vote == "Yes" else 2
+                for row in details
+                if row.legislator_id in matrix.index
+            }
+            assert matrix[column][list(voted)].to_dict() == voted
+            assert (matrix[column].drop(list(voted)) == 0).all()
+
+    def test_vote_matrix_chunks_by_legislator(self):
+        chunks = list(legislative_service.iter_vote_matrix_export(chunk_rows=8))
+
+        assert [len(chunk) for chunk in chunks] == [8, 8, 4]
+        assert list(pd.concat(chunks)["legislator_id"]) == list(
+            legislative_service.legislators["id"]
+        )
@@ -0,0 +1,37 @@
+from benchmarks.generate import DatasetSpec, generate
+from legislative.services.csv_service import CSVLegislativeDataService
+
+SPEC = DatasetSpec(
+    legislators=20,
+    bills=30,
+    roll_calls_per_bill=2,
+    missing_sponsors=0.2,
+    missing_legislators=0.05,
+)
+
+
+class TestSyntheticDataset:
+    """
+    Test class for the synthetic dataset generator behind the benchmarks.
+    """
+
+    def test_same_spec_writes_the_same_files(self, tmp_path):
+        generate(tmp_path / "first", SPEC)
+        generate(tmp_path / "second", SPEC)
+
+        for name in ("legislators", "bills", "votes", "vote_results"):
+            assert (tmp_path / "first" / f"{name}.csv").read_bytes() == (
+                tmp_path / "second" / f"{name}.csv"
+            ).read_bytes()
+
+    def test_dataset_has_missing_sponsors_and_voters(self, tmp_path):
+        results = generate(tmp_path, SPEC, snapshot=True)
+        service = CSVLegislativeDataService(data_folder=tmp_path)
+
+        assert len(service.vote_results) == results
+        assert len(service.votes) > len(service.bills)
+        bills = service.get_complete_bills_frame()
+        assert (bills["sponsor"] == "Unknown Sponsor").any()
+        # Votes of legislators missing from the table are left out of theirs
+        assert service.tallies.by_legislator["total"].sum() < results
+        assert service.tallies.by_bill["total"].sum() == results
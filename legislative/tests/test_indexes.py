@@ -0,0 +1,115 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from legislative.services import legislative_service
+from legislative.services.csv_service import CSVLegislativeDataService
+from legislative.services.indexes import (DatasetIndex, GroupedRows,
+                                          IdPositions, lookup_index)
+from legislative.services.snapshot import DatasetSnapshot
+
+
+class TestDatasetIndex:
+    """
+    Test class for the load-time lookup index used by the detail methods.
+    """
+
+    def test_lookup_index_serves_concurrent_first_lookups(self):
+        wanted = np.arange(0, 3000, 7)
+        with ThreadPoolExecutor(8) as pool:
+            for _ in range(20):
+                index = lookup_index(np.arange(0, 300_000, 3))
+                found = list(
+                    pool.map(lambda _: index.get_indexer(wanted), range(8))
+                )
+                for positions in found:
+                    assert list(positions) == [
+                        value // 3 if value % 3 == 0 else -1 for value in wanted
+                    ]
+
+    def test_memoized_frames_serve_concurrent_first_reindexes(self):
+        snapshot = legislative_service.snapshot
+        tables = {
+            name: getattr(snapshot, name)
+            for name in ("legislators", "bills", "votes", "vote_results")
+        }
+        wanted = np.arange(0, 3000, 7)
+        with ThreadPoolExecutor(8) as pool:
+            for _ in range(20):
+                fresh = DatasetSnapshot(tables, snapshot.signature)
+                counts = fresh.memoize(
+                    "counts",
+                    lambda: pd.DataFrame(
+                        {"total": np.arange(100_000)}, index=np.arange(0, 300_000, 3)
+                    ),
+                )
+                found = list(
+                    pool.map(
+                        lambda _: counts.reindex(wanted, fill_value=0)["total"],
+                        range(8),
+                    )
+                )
+                for totals in found:
+                    assert list(totals) == [
+                        value // 3 if value % 3 == 0 else 0 for value in wanted
+                    ]
+
+    def test_duplicate_ids_map_to_their_first_row(self, dataset_folder):
+        ids = IdPositions(pd.Series([5, 9, 5, 2, 9]))
+        assert list(ids.positions([9, 5, 2, 4])) == [1, 0, 3, -1]
+        assert ids.position(4) is None
+
+        with open(dataset_folder / "legislators.csv", "a", encoding="utf-8") as file:
+            file.write("\n412211,Rep. Duplicate Row (D-XX-9)\n")
+        with open(dataset_folder / "bills.csv", "a", encoding="utf-8") as file:
+            file.write("\n2952375,H.R. 9: Duplicate Row Act,400100\n")
+        service = CSVLegislativeDataService(data_folder=dataset_folder)
+
+        legislator = service.get_legislator_by_id(412211)
+        assert legislator.name == "Rep. John Yarmuth (D-KY-3)"
+        assert service.get_bill_by_id(2952375).title == (
+            "H.R. 5376: Build Back Better Act"
+        )
+        assert service.get_bill_by_id(2952375) == legislative_service.get_bill_by_id(
+            2952375
+        )
+
+    def test_grouped_rows_returns_positions_in_file_order(self):
+        grouped = GroupedRows(pd.Series([7, 3, 7, 5, 7]))
+
+        assert list(grouped.positions(7)) == [0, 2, 4]
+        assert list(grouped.positions(3)) == [1]
+        assert len(grouped.positions(99)) == 0
+        assert list(grouped.positions_many([5, 99, 3])) == [3, 1]
+
+    def test_grouped_rows_orders_groups_on_within(self):
+        grouped = GroupedRows(pd.Series([7, 3, 7, 7]), within=pd.Series([30, 1, 10, 20]))
+
+        assert list(grouped.positions(7)) == [2, 3, 0]
+        assert list(grouped.positions(3)) == [1]
+
+    def test_extended_grouping_matches_a_rebuild(self):
+        keys = pd.Series([7, 3, 7, 5, 7])
+        appended = pd.Series([5, 1, 7, 9, 5])
+
+        extended = GroupedRows(keys).extended(appended, len(keys)).arrays()
+        rebuilt = GroupedRows(pd.concat([keys, appended], ignore_index=True)).arrays()
+
+        for name, array in rebuilt.items():
+            assert list(extended[name]) == list(array), name
+
+    def test_index_matches_full_table_scans(self):
+        service = legislative_service
+        index = DatasetIndex(
+            service.legislators, service.bills, service.votes, service.vote_results
+        )
+
+        for vote_id in service.votes["id"]:
+            expected = service.vote_results.index[
+                service.vote_results["vote_id"] == vote_id
+            ]
+            assert list(index.results_by_vote.positions(vote_id)) == list(expected)
+
+        assert index.legislator_position(-1) is None
+        assert index.bill_position(2900994) == 1
@@ -0,0 +1,242 @@
+import os
+from io import StringIO
+
+import pandas as pd
+import pytest
+from django.core.management import CommandError, call_command
+
+from legislative.models import Bill, VoteResult
+from legislative.services.columnar import snapshot_is_fresh
+from legislative.services.csv_service import CSVLegislativeDataService
+from legislative.services.database_service import \
+    DatabaseLegislativeDataService
+from legislative.services.snapshot import (SnapshotManager, csv_paths,
+                                           read_csv_tables)
+
+
+@pytest.fixture
+def delta_folder(tmp_path):
+    """
+    A day of new rows: legislator 2, a bill they sponsor and two roll calls,
+    one on that bill and one on bill 2952375
+    """
+    folder = tmp_path / "delta"
+    folder.mkdir()
+    (folder / "legislators.csv").write_text(
+        "id,name\n2,Rep. New Member (D-XX-1)\n", encoding="utf-8"
+    )
+    (folder / "bills.csv").write_text(
+        "id,title,sponsor_id\n3000001,H.R. 1: Delta Act,2\n", encoding="utf-8"
+    )
+    (folder / "votes.csv").write_text(
+        "id,bill_id\n3500000,3000001\n3500001,2952375\n", encoding="utf-8"
+    )
+    (folder / "vote_results.csv").write_text(
+        "id,legislator_id,vote_id,vote_type\n"
+        "95200001,2,3500000,1\n"
+        "95200002,412211,3500000,2\n"
+        "95200003,400440,3500001,1\n"
+        "95200004,2,3500001,2\n",
+        encoding="utf-8",
+    )
+    return folder
+
+
+class TestIngest:
+    """
+    Test class for the chunked ingestion command.
+    """
+
+    def test_snapshot_backend_streams_vote_results_in_chunks(self, dataset_folder):
+        call_command(
+            "ingest",
+            backend="snapshot",
+            data_folder=str(dataset_folder),
+            chunksize=7,
+            stdout=StringIO(),
+        )
+
+        streamed = SnapshotManager(dataset_folder).load().vote_results
+        expected = read_csv_tables(dataset_folder)["vote_results"]
+        assert streamed.equals(expected)
+
+    @pytest.mark.django_db
+    def test_unknown_references_fail_or_are_skipped(self, dataset_folder):
+        with open(dataset_folder / "vote_results.csv", "a", encoding="utf-8") as file:
+            file.write("1,999,3314452,1\n2,412211,999,1\n")
+
+        with pytest.raises(CommandError, match="unknown legislator or vote"):
+            call_command("ingest", data_folder=str(dataset_folder), stdout=StringIO())
+        assert VoteResult.objects.count() == 0
+
+        output = StringIO()
+        call_command(
+            "ingest",
+            data_folder=str(dataset_folder),
+            invalid="skip",
+            chunksize=10,
+            stdout=output,
+        )
+        assert VoteResult.objects.count() == 38
+        assert "2 invalid" in output.getvalue()
+
+    def test_snapshot_append_matches_a_rebuild(self, dataset_folder, delta_folder):
+        # Recorded before legislator 2 is known, counted once the delta adds them
+        with open(dataset_folder / "vote_results.csv", "a", encoding="utf-8") as file:
+            file.write("95100001,2,3321166,1\n")
+        call_command("build_snapshot", data_folder=str(dataset_folder), stdout=StringIO())
+
+        call_command(
+            "ingest",
+            backend="snapshot",
+            data_folder=str(dataset_folder),
+            append=str(delta_folder),
+            stdout=StringIO(),
+        )
+
+        # The CSVs are appended to as well, so a dataset loaded from them agrees
+        rebuilt_folder = dataset_folder / "rebuilt"
+        rebuilt_folder.mkdir()
+        for table in ("legislators", "bills", "votes", "vote_results"):
+            (rebuilt_folder / f"{table}.csv").write_bytes(
+                (dataset_folder / f"{table}.csv").read_bytes()
+            )
+        appended = CSVLegislativeDataService(data_folder=dataset_folder)
+        rebuilt = CSVLegislativeDataService(data_folder=rebuilt_folder)
+
+        assert os.path.exists(dataset_folder / "snapshot" / "tallies")
+        assert snapshot_is_fresh(dataset_folder, csv_paths(dataset_folder))
+        assert appended.vote_results.equals(rebuilt.vote_results)
+        for name, counts in rebuilt.tallies.frames().items():
+            pd.testing.assert_frame_equal(
+                appended.tallies.frames()[name], counts, check_index_type=False
+            )
+        assert appended.get_stats() == rebuilt.get_stats()
+        assert appended.get_complete_bills_data() == rebuilt.get_complete_bills_data()
+        assert (
+            appended.get_complete_legislators_data()
+            == rebuilt.get_complete_legislators_data()
+        )
+        assert appended.get_legislator_record(2)["total_votes"] == 3
+        assert appended.get_bill_by_id(2952375) == rebuilt.get_bill_by_id(2952375)
+
+    def test_snapshot_append_leaves_skipped_rows_out_of_the_csv(
+        self, dataset_folder, delta_folder
+    ):
+        call_command("build_snapshot", data_folder=str(dataset_folder), stdout=StringIO())
+        with open(delta_folder / "vote_results.csv", "a", encoding="utf-8") as file:
+            file.write("95200005,999,3500000,1\n")
+
+        call_command(
+            "ingest",
+            backend="snapshot",
+            data_folder=str(dataset_folder),
+            append=str(delta_folder),
+            invalid="skip",
+            chunksize=2,
+            stdout=StringIO(),
+        )
+
+        assert snapshot_is_fresh(dataset_folder, csv_paths(dataset_folder))
+        snapshot = SnapshotManager(dataset_folder).load().vote_results
+        from_csv = read_csv_tables(dataset_folder)["vote_results"]
+        assert 95200005 not in from_csv["id"].values
+        pd.testing.assert_frame_equal(
+            snapshot.reset_index(drop=True), from_csv.reset_index(drop=True)
+        )
+
+    def test_append_rejects_stored_ids(self, dataset_folder, delta_folder):
+        call_command("build_snapshot", data_folder=str(dataset_folder), stdout=StringIO())
+        (delta_folder / "legislators.csv").write_text(
+            "id,name\n412211,Rep. John Yarmuth (D-KY-3)\n", encoding="utf-8"
+        )
+        votes_csv = (dataset_folder / "votes.csv").read_bytes()
+
+        with pytest.raises(CommandError, match="legislators row 412211 is already stored"):
+            call_command(
+                "ingest",
+                backend="snapshot",
+                data_folder=str(dataset_folder),
+                append=str(delta_folder),
+                stdout=StringIO(),
+            )
+        assert (dataset_folder / "votes.csv").read_bytes() == votes_csv
+
+    @pytest.mark.django_db
+    @pytest.mark.parametrize("backend", ["database", "snapshot"])
+    def test_append_rejects_stored_vote_results_ids(
+        self, backend, dataset_folder, delta_folder
+    ):
+        call_command(
+            "build_snapshot" if backend == "snapshot" else "ingest",
+            data_folder=str(dataset_folder),
+            stdout=StringIO(),
+        )
+        with open(delta_folder / "vote_results.csv", "a", encoding="utf-8") as file:
+            file.write("95200005,2,3500001,1\n")
+        stored_id = pd.read_csv(dataset_folder / "vote_results.csv")["id"].iloc[-1]
+        with open(delta_folder / "vote_results.csv", "a", encoding="utf-8") as file:
+            file.write(f"{stored_id},2,3500001,1\n")
+        votes_csv = (dataset_folder / "votes.csv").read_bytes()
+
+        with pytest.raises(
+            CommandError, match=f"vote_results row {stored_id} is already stored"
+        ):
+            call_command(
+                "ingest",
+                backend=backend,
+                data_folder=str(dataset_folder),
+                append=str(delta_folder),
+                chunksize=2,
+                stdout=StringIO(),
+            )
+        assert (dataset_folder / "votes.csv").read_bytes() == votes_csv
+        if backend == "database":
+            assert VoteResult.objects.count() == 38
+
+    @pytest.mark.django_db
+    def test_database_append_adds_rows(self, dataset_folder, delta_folder):
+        call_command("ingest", data_folder=str(dataset_folder), stdout=StringIO())
+        version = DatabaseLegislativeDataService().data_version()
+        call_command(
+            "ingest",
+            data_folder=str(dataset_folder),
+            append=str(delta_folder),
+            stdout=StringIO(),
+        )
+
+        assert VoteResult.objects.count() == 42
+        assert DatabaseLegislativeDataService().data_version() != version
+        record = DatabaseLegislativeDataService().get_bill_record(3000001)
+        assert (record["total_votes"], record["sponsor"]) == (
+            2,
+            "Rep. New Member (D-XX-1)",
+        )
+
+    @pytest.mark.django_db
+    def test_database_backend_stores_bills_without_sponsor(self, dataset_folder):
+        with open(dataset_folder / "bills.csv", "a", encoding="utf-8") as bills:
+            bills.write("\n3000000,H.R. 1: Unsponsored Act,\n")
+
+        call_command("ingest", data_folder=str(dataset_folder), stdout=StringIO())
+
+        assert Bill.objects.count() == 3
+        assert Bill.objects.get(id=3000000).sponsor_id is None
+        assert Bill.objects.get(id=2952375).sponsor_id == 412211
+
+    @pytest.mark.django_db
+    def test_database_backend_stores_64_bit_ids(self, dataset_folder):
+        with open(dataset_folder / "vote_results.csv", "a", encoding="utf-8") as file:
+            file.write("\n5000000000,412211,3314452,1\n")
+
+        call_command("ingest", data_folder=str(dataset_folder), stdout=StringIO())
+        assert VoteResult.objects.get(id=5_000_000_000).vote_id == 3314452
+
+        # The snapshot column files are int32
+        with pytest.raises(CommandError, match="does not fit its schema dtype int32"):
+            call_command(
+                "ingest",
+                backend="snapshot",
+                data_folder=str(dataset_folder),
+                stdout=StringIO(),
+            )
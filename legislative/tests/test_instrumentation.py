@@ -0,0 +1,164 @@
+import os
+
+import pytest
+from django.core.cache import caches
+
+from legislative.services.metrics import (BUCKETS, REGISTRY, MetricsRegistry,
+                                          Timer, collecting, record_cache,
+                                          timed_iter)
+
+
+@pytest.fixture
+def page_cache(settings):
+    caches[settings.LEGISLATIVE_PAGE_CACHE].clear()
+    yield caches[settings.LEGISLATIVE_PAGE_CACHE]
+    caches[settings.LEGISLATIVE_PAGE_CACHE].clear()
+
+
+@pytest.fixture
+def instrumented(settings):
+    """Server-Timing headers and the metrics endpoint, both off by default"""
+    settings.LEGISLATIVE_SERVER_TIMING = True
+    settings.LEGISLATIVE_METRICS = True
+    return settings
+
+
+def server_timing(response):
+    """{name: params} of the Server-Timing header"""
+    entries = {}
+    for entry in response["Server-Timing"].split(", "):
+        name, *params = entry.split(";")
+        entries[name] = dict(param.split("=", 1) for param in params)
+    return entries
+
+
+class TestMetrics:
+    """
+    Test class for the timers, counters and Prometheus text rendering behind
+    the instrumentation middleware.
+    """
+
+    def test_registry_renders_prometheus_text(self):
+        registry = MetricsRegistry()
+        registry.inc("legislative_rows_total", 5, operation="query_bills")
+        for seconds in (0.003, 0.003, 20):
+            registry.observe("legislative_operation_seconds", seconds, operation='a"b')
+
+        lines = registry.render().splitlines()
+
+        assert "# TYPE legislative_rows_total counter" in lines
+        assert 'legislative_rows_total{operation="query_bills"} 5' in lines
+        assert "# TYPE legislative_operation_seconds histogram" in lines
+        buckets = [line for line in lines if "_bucket" in line]
+        assert len(buckets) == len(BUCKETS) + 1
+        assert 'legislative_operation_seconds_bucket{operation="a\\"b",le="0.001"} 0' in lines
+        assert 'legislative_operation_seconds_bucket{operation="a\\"b",le="0.005"} 2' in lines
+        assert 'legislative_operation_seconds_bucket{operation="a\\"b",le="10.0"} 2' in lines
+        assert 'legislative_operation_seconds_bucket{operation="a\\"b",le="+Inf"} 3' in lines
+        assert 'legislative_operation_seconds_count{operation="a\\"b"} 3' in lines
+
+    def test_measurements_go_to_the_current_request(self):
+        with collecting() as timings:
+            with Timer("render_table", rows=3):
+                pass
+            with Timer("render_table", rows=4):
+                pass
+            record_cache("page", True)
+            frames = [[1, 2], [3]]
+            assert list(timed_iter("export_rows", frames, count_rows=True)) == frames
+
+        entries = timings.server_timing()
+        assert entries[0].startswith("render_table;dur=")
+        assert entries[0].endswith(';desc="7 rows in 2 calls"')
+        assert entries[1].endswith(';desc="3 rows"')
+        assert entries[2] == 'cache-page;desc="1 hit 0 miss"'
+
+        # Outside a request, measurements only reach the registry
+        with Timer("render_table"):
+            pass
+        assert timings.operations["render_table"][1] == 2
+
+
+class TestInstrumentationMiddleware:
+    """
+    Test class for the Server-Timing header, the metrics endpoint and the
+    per-request profiling hook.
+    """
+
+    def test_server_timing_covers_service_template_and_caches(
+        self, client, page_cache, instrumented
+    ):
+        entries = server_timing(client.get("/bills/"))
+
+        for name in ("query_bills", "render_table", "template", "total"):
+            assert float(entries[name]["dur"]) >= 0
+        assert entries["query_bills"]["desc"] == '"2 rows"'
+        assert entries["cache-page"]["desc"] == '"0 hit 1 miss"'
+
+        entries = server_timing(client.get("/bills/"))
+        assert entries["cache-page"]["desc"] == '"1 hit 0 miss"'
+        assert "query_bills" not in entries
+
+    def test_instrumentation_is_off_by_default(self, client, settings, tmp_path):
+        settings.LEGISLATIVE_PROFILE_DIR = tmp_path
+
+        assert "Server-Timing" not in client.get("/api/bills/")
+        assert client.get("/metrics/").status_code == 404
+        client.get("/api/bills/", headers={"X-Profile": "1"})
+        assert os.listdir(tmp_path) == []
+
+    def test_metrics_count_requests_per_route(self, client, instrumented):
+        before = REGISTRY.value(
+            "legislative_request_seconds", route="api_bill", status=200
+        )
+        client.get("/api/bills/2952375/")
+        download = client.get("/bills/download/")
+        b"".join(download.streaming_content)
+
+        response = client.get("/metrics/")
+        text = response.content.decode()
+
+        assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+        assert (
+            f'legislative_request_seconds_count{{route="api_bill",status="200"}} '
+            f"{before + 1}" in text
+        )
+        assert 'legislative_request_seconds_count{route="download_bills"' in text
+        assert 'legislative_rows_total{operation="export_rows"}' in text
+        assert 'legislative_cache_requests_total{cache="snapshot",result="hit"}' in text
+
+    def test_profile_on_request(self, client, settings, instrumented, tmp_path):
+        settings.LEGISLATIVE_PROFILE_DIR = tmp_path
+        settings.LEGISLATIVE_PROFILE_ON_REQUEST = True
+        settings.LEGISLATIVE_PROFILE_SAMPLE_RATE = 0.0
+
+        assert "profile" not in server_timing(client.get("/api/legislators/"))
+        entries = server_timing(
+            client.get("/api/legislators/", headers={"X-Profile": "1"})
+        )
+
+        profile = entries["profile"]["desc"].strip('"')
+        assert profile.startswith("api_legislators-")
+        assert os.listdir(tmp_path) == [profile]
+
+    def test_profile_sampling(self, client, settings, tmp_path):
+        settings.LEGISLATIVE_PROFILE_DIR = tmp_path
+        settings.LEGISLATIVE_PROFILE_ON_REQUEST = False
+        settings.LEGISLATIVE_PROFILE_SAMPLE_RATE = 1.0
+
+        client.get("/api/bills/", headers={"X-Profile": "1"})
+        client.get("/api/bills/")
+
+        assert len(os.listdir(tmp_path)) == 2
+
+    def test_profiles_are_capped(self, client, settings, tmp_path):
+        settings.LEGISLATIVE_PROFILE_DIR = tmp_path
+        settings.LEGISLATIVE_PROFILE_SAMPLE_RATE = 1.0
+        settings.LEGISLATIVE_PROFILE_MAX_FILES = 2
+        (tmp_path / "notes.txt").write_text("kept", encoding="utf-8")
+
+        for _ in range(4):
+            client.get("/api/bills/")
+
+        assert len([name for name in os.listdir(tmp_path) if name.endswith(".prof")]) == 2
+        assert (tmp_path / "notes.txt").exists()
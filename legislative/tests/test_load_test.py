@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+from django.urls import resolve
+
+from benchmarks.load_test import ROUTES, DatasetIds, parse_mix, summarize
+from legislative.urls import urlpatterns
+
+
+class TestLoadTest:
+    """
+    Test class for the route mix and report of the HTTP load test harness.
+    """
+
+    def test_routes_cover_every_url(self):
+        ids = DatasetIds(bills=np.array([7]), legislators=np.array([9]))
+        rng = np.random.default_rng(0)
+
+        assert set(ROUTES) == {pattern.name for pattern in urlpatterns}
+        for name, (_, path) in ROUTES.items():
+            assert resolve(path(ids, rng).partition("?")[0]).url_name == name
+
+    def test_parse_mix(self):
+        assert "download_votes" not in parse_mix("")
+        assert parse_mix("bills=2,bill_detail,index=0") == {
+            "bills": 2.0,
+            "bill_detail": 1.0,
+        }
+        for mix in ("bills=x", "bills=-1", "nope=1", "index=0"):
+            with pytest.raises(ValueError):
+                parse_mix(mix)
+
+    def test_summarize_reports_routes_and_errors(self):
+        results = [("bills", 200, 0.01 * n, 100) for n in range(1, 101)]
+        results += [("bill_detail", 404, 0.5, 10), ("bill_detail", 0, 1.0, 0)]
+
+        summary = summarize(results, duration=2)
+
+        assert list(summary) == ["bills", "bill_detail", "all"]
+        assert summary["bills"]["rps"] == 50
+        assert summary["bills"]["p50"] == pytest.approx(505)
+        assert summary["bills"]["p99"] == pytest.approx(990.1)
+        assert summary["bill_detail"]["errors"] == 2
+        assert summary["all"]["requests"] == 102
@@ -0,0 +1,185 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from legislative.services import legislative_service
+from legislative.services.base import TableQuery
+from legislative.services.records import BillDetail, LegislatorVote
+from legislative.services.rendering import table_html
+
+
+def apply_render(service, data, linkable_list):
+    """render_table as it was before link columns were vectorized"""
+    frame = pd.DataFrame(data)
+    for item in linkable_list:
+        should_link = item.get("should_link")
+        frame[item["column_name"]] = frame.apply(
+            lambda row: (
+                service.make_link(
+                    f"/{item['url_pattern']}/{row[item['item_id']]}/",
+                    row[item["item_id"]],
+                    row[item["name"]],
+                    item["css_class"],
+                )
+                if not should_link or should_link(row)
+                else row[item["name"]]
+            ),
+            axis=1,
+        )
+    frame = frame.drop(
+        columns=[col for col in frame.columns if col.endswith("_id") or col == "id"]
+    )
+    return frame.to_html(
+        classes="table table-striped table-hover",
+        justify="left",
+        escape=False,
+        index=False,
+        border=0,
+    )
+
+
+SPONSOR_LINK = {
+    "column_name": "sponsor",
+    "url_pattern": "legislators",
+    "name": "sponsor",
+    "item_id": "sponsor_id",
+    "css_class": "legislator-link",
+}
+TITLE_LINK = {
+    "column_name": "title",
+    "url_pattern": "bills",
+    "name": "title",
+    "item_id": "id",
+    "css_class": "bill-link",
+}
+
+
+class TestRenderTable:
+    """
+    Test class for the vectorized table renderer, checked against the
+    row-wise apply + DataFrame.to_html output it replaces.
+    """
+
+    @pytest.mark.parametrize(
+        "sponsor_link",
+        [
+            {**SPONSOR_LINK, "should_link": lambda row: row["sponsor"] != "Unknown Sponsor"},
+            {**SPONSOR_LINK, "link_when": lambda rows: rows["sponsor"] != "Unknown Sponsor"},
+        ],
+    )
+    def test_bills_table_matches_row_wise_rendering(self, sponsor_link):
+        bills = legislative_service.get_complete_bills_data()
+        expected = apply_render(
+            legislative_service,
+            bills,
+            [
+                {
+                    **SPONSOR_LINK,
+                    "should_link": lambda row: row["sponsor"] != "Unknown Sponsor",
+                },
+                TITLE_LINK,
+            ],
+        )
+
+        rendered = legislative_service.render_table(bills, [sponsor_link, TITLE_LINK])
+
+        assert rendered == expected
+        assert ">Unknown Sponsor</a>" not in rendered
+
+    def test_legislators_table_matches_row_wise_rendering(self):
+        legislators = legislative_service.get_complete_legislators_data()
+        link = {
+            "column_name": "legislator",
+            "url_pattern": "legislators",
+            "name": "legislator",
+            "item_id": "id",
+            "css_class": "legislator-link",
+        }
+
+        assert legislative_service.render_table(
+            legislators, [link]
+        ) == apply_render(legislative_service, legislators, [link])
+
+    @pytest.mark.parametrize(
+        "frame",
+        [
+            pd.DataFrame({"name": ["a", None], "count": [1, 2]}),
+            pd.DataFrame({"ratio": [0.5, np.nan], "flag": [True, False]}),
+            pd.DataFrame({"name": pd.Categorical(["x", "y"]), "count": [3, 4]}),
+            pd.DataFrame({"name": pd.Series([], dtype=object)}),
+            pd.DataFrame(),
+        ],
+    )
+    def test_table_html_matches_to_html(self, frame):
+        assert table_html(frame, "table") == frame.to_html(
+            classes="table", justify="left", escape=False, index=False, border=0
+        )
+
+    def test_stream_table_chunks_join_to_render_table(self):
+        page = legislative_service.query_legislators(TableQuery(page_size=None))
+        link = {
+            "column_name": "legislator",
+            "url_pattern": "legislators",
+            "name": "legislator",
+            "item_id": "id",
+            "css_class": "legislator-link",
+        }
+
+        chunks = list(legislative_service.stream_table(page.rows, [link], chunk_rows=3))
+
+        # head, one chunk per 3 rows, foot
+        assert len(chunks) == 2 + math.ceil(page.total / 3)
+        assert "".join(chunks) == legislative_service.render_table(
+            list(page.rows), [link]
+        )
+
+    def test_listing_view_streams_the_whole_listing(self, client):
+        response = client.get("/legislators/", {"page_size": "all", "sort": "-id"})
+        html = b"".join(response.streaming_content).decode()
+
+        assert response.streaming
+        assert html.count('class="legislator-link"') == 20
+        assert html.index("<table") < html.index("Page 1 of 1 (20 rows)")
+
+
+class TestDetailTemplates:
+    """Test class for the detail pages, rendered from plain detail records"""
+
+    def test_detail_records_hold_no_markup(self):
+        bill = legislative_service.get_bill_by_id(2952375)
+        assert isinstance(bill, BillDetail)
+        assert all(isinstance(row, LegislatorVote) for row in bill.vote_details)
+        assert "<" not in repr(bill)
+
+        legislator = legislative_service.get_legislator_by_id(412211)
+        assert "<" not in repr(legislator)
+
+    def test_detail_page_links_and_escapes_names(self, client, settings, monkeypatch):
+        settings.LEGISLATIVE_PAGE_CACHE = None
+        bill = BillDetail(
+            id=1,
+            title="Tom & <Jerry> Act",
+            sponsor_id=7,
+            sponsor_name=None,
+            total_votes=2,
+            supporters=1,
+            opposers=1,
+            vote_details=[
+                LegislatorVote(7, "Rep. <b>Bold</b>", "Yes"),
+                LegislatorVote(8, None, "No"),
+            ],
+        )
+        monkeypatch.setattr(legislative_service, "get_bill_by_id", lambda *args: bill)
+
+        page = client.get("/bills/1/").content.decode()
+
+        assert "Tom &amp; &lt;Jerry&gt; Act" in page
+        assert "Sponsored by:\n          Unknown Sponsor" in page
+        assert (
+            '<a href="/legislators/7/" class="legislator-link">'
+            "Rep. &lt;b&gt;Bold&lt;/b&gt;</a>" in page
+        )
+        assert "Unknown Legislator (8)" in page
+        assert '<span class="badge bg-danger">No</span>' in page
@@ -0,0 +1,96 @@
+import os
+from io import StringIO
+
+import numpy as np
+from django.core.management import call_command
+
+from legislative.services.csv_service import CSVLegislativeDataService
+from legislative.services.snapshot import SnapshotManager
+
+
+class TestDatasetSnapshot:
+    """
+    Test class for the hot-reloading dataset snapshot behind the CSV service.
+    """
+
+    def test_changed_files_are_swapped_in_with_fresh_aggregates(self, dataset_folder):
+        service = CSVLegislativeDataService(data_folder=dataset_folder, reload_interval=0)
+
+        old_snapshot = service.snapshot
+        assert service.get_stats()["votes_count"] == 38
+
+        with open(dataset_folder / "vote_results.csv", "a", encoding="utf-8") as file:
+            file.write("1,412211,3314452,1\n")
+
+        # The first read after the change still sees the old dataset while the
+        # new one loads in the background
+        assert service.get_stats()["votes_count"] == 38
+        service.datasets.wait_for_reload(timeout=10)
+
+        assert service.snapshot is not old_snapshot
+        assert service.snapshot.version != old_snapshot.version
+        assert service.get_stats()["votes_count"] == 39
+        yarmuth = [
+            row
+            for row in service.get_complete_legislators_data()
+            if row["id"] == 412211
+        ][0]
+        assert yarmuth["total_votes"] == 1
+
+    def test_unchanged_files_keep_the_snapshot(self, dataset_folder):
+        service = CSVLegislativeDataService(data_folder=dataset_folder, reload_interval=0)
+
+        snapshot = service.snapshot
+        service.get_complete_bills_data()
+        service.datasets.wait_for_reload(timeout=10)
+
+        assert service.snapshot is snapshot
+
+
+class TestColumnarSnapshot:
+    """
+    Test class for the binary columnar snapshot built from the CSVs.
+    """
+
+    def test_fresh_snapshot_is_preferred_over_csv(self, dataset_folder):
+        call_command("build_snapshot", data_folder=str(dataset_folder), stdout=StringIO())
+
+        snapshot = SnapshotManager(dataset_folder).load()
+        assert snapshot.vote_results["vote_type"].dtype == "int8"
+        assert snapshot.legislators["name"].dtype == "category"
+
+        from_snapshot = CSVLegislativeDataService(data_folder=dataset_folder)
+        from_csv = CSVLegislativeDataService()
+        assert (
+            from_snapshot.get_complete_bills_data()
+            == from_csv.get_complete_bills_data()
+        )
+
+    def test_stale_snapshot_is_ignored(self, dataset_folder):
+        call_command("build_snapshot", data_folder=str(dataset_folder), stdout=StringIO())
+
+        (dataset_folder / "bills.csv").write_text(
+            "id,title,sponsor_id\n1,H.R. 1: Newer Act,412211\n", encoding="utf-8"
+        )
+        manifest = os.path.join(dataset_folder, "snapshot", "manifest.json")
+        built = os.stat(manifest).st_mtime_ns
+        os.utime(dataset_folder / "bills.csv", ns=(built + 10**9, built + 10**9))
+
+        snapshot = SnapshotManager(dataset_folder).load()
+        assert list(snapshot.bills["title"]) == ["H.R. 1: Newer Act"]
+
+    def test_mmap_mode_maps_tables_and_index_from_the_snapshot(
+        self, dataset_folder, settings
+    ):
+        call_command("build_snapshot", data_folder=str(dataset_folder), stdout=StringIO())
+        settings.LEGISLATIVE_DATA_MMAP = True
+
+        service = CSVLegislativeDataService(data_folder=dataset_folder)
+        vote_ids = service.vote_results["vote_id"].to_numpy()
+
+        assert isinstance(vote_ids.base, np.memmap) or isinstance(vote_ids, np.memmap)
+        assert isinstance(service.index.results_by_vote.order, np.memmap)
+        assert (
+            service.get_legislator_by_id(412211)
+            == CSVLegislativeDataService().get_legislator_by_id(412211)
+        )
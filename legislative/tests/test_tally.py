@@ -0,0 +1,29 @@
+import numpy as np
+
+from legislative.services import legislative_service
+from legislative.services.tally import tally
+
+
+class TestTally:
+    """
+    Test class for the bincount-based vote tally engine.
+    """
+
+    def test_tally_counts_yea_nay_other_and_skips_unknown_keys(self):
+        counts = tally(np.array([0, 0, 1, -1, 1, 1]), np.array([1, 2, 1, 1, 3, 2]), 3)
+
+        assert counts["yea"].tolist() == [1, 1, 0]
+        assert counts["nay"].tolist() == [1, 1, 0]
+        assert counts["other"].tolist() == [0, 1, 0]
+        assert counts["total"].tolist() == [2, 3, 0]
+
+    def test_tallies_match_vote_results(self):
+        tallies = legislative_service.tallies
+        vote_results = legislative_service.vote_results
+
+        for legislator_id, row in tallies.by_legislator.iterrows():
+            votes = vote_results[vote_results["legislator_id"] == legislator_id]
+            assert row["total"] == len(votes)
+            assert row["yea"] == (votes["vote_type"] == 1).sum()
+
+        assert tallies.by_bill["total"].sum() == len(vote_results)
@@ -1,6 +1,6 @@
 from django.urls import path
 
-from legislative import views
+from legislative import api, views
 
 urlpatterns = [
     path("", views.index, name="index"),
@@ -15,4 +15,25 @@ urlpatterns = [
     path('legislator/download/', views.download_legislators_csv,
          name="download_legislators"),
     path('bills/download/', views.download_bills_csv, name="download_bills"),
+    path('votes/download/', views.download_votes, name="download_votes"),
+    path("metrics/", views.metrics, name="metrics"),
+    path("api/bills/", api.bills, name="api_bills"),
+    path("api/bills/<int:bill_id>/", api.bill, name="api_bill"),
+    path("api/bills/<int:bill_id>/votes/", api.bill_votes, name="api_bill_votes"),
+    path(
+        "api/bills/<int:bill_id>/roll-calls/",
+        api.bill_roll_calls,
+        name="api_bill_roll_calls",
+    ),
+    path("api/legislators/", api.legislators, name="api_legislators"),
+    path(
+        "api/legislators/<int:legislator_id>/",
+        api.legislator,
+        name="api_legislator",
+    ),
+    path(
+        "api/legislators/<int:legislator_id>/votes/",
+        api.legislator_votes,
+        name="api_legislator_votes",
+    ),
 ]
@@ -1,86 +1,209 @@
-from django.http import Http404, HttpResponse
+from django.conf import settings
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.shortcuts import render
+from django.template.loader import render_to_string
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence
 from datetime import datetime
+from itertools import chain
 
+from .cache import cache_per_dataset, cached_fragment, conditional_per_dataset
 from .services import legislative_service
+from .services.base import TableQuery
+from .services.export import EXPORT_FORMATS, negotiate_format
+from .services.metrics import REGISTRY, Timer, timed_iter
+
+MAX_PAGE_SIZE = 500
+# Stands in for the table while the page template is rendered, see streaming_table_page
+TABLE_PLACEHOLDER = "<!-- table rows -->"
+
+BILLS_SORT_COLUMNS = ["id", "title", "sponsor", "total_votes", "yea_votes", "nay_votes"]
+LEGISLATORS_SORT_COLUMNS = [
+    "id",
+    "legislator",
+    "total_votes",
+    "yes_votes",
+    "no_votes",
+    "bills_sponsored",
+]
+
+
+def positive_int(value, default):
+    try:
+        return max(1, int(value))
+    except (TypeError, ValueError):
+        return default
+
+
+def sort_param(request, sort_columns):
+    """(column, descending) from the sort parameter, prefix '-' to descend"""
+    sort = request.GET.get("sort", "")
+    descending = sort.startswith("-")
+    sort = sort.lstrip("-")
+    return (sort if sort in sort_columns else None), descending
+
+
+def table_query(request, sort_columns):
+    """TableQuery from the page, page_size, sort and q parameters"""
+    sort, descending = sort_param(request, sort_columns)
+
+    # page_size=all streams the whole listing instead of one page
+    page_size = request.GET.get("page_size")
+    if page_size != "all":
+        page_size = min(positive_int(page_size, 50), MAX_PAGE_SIZE)
+
+    return TableQuery(
+        page=positive_int(request.GET.get("page"), 1),
+        page_size=None if page_size == "all" else page_size,
+        sort=sort,
+        descending=descending,
+        search=request.GET.get("q", "").strip(),
+    )
+
 
+def pagination_context(request, page, sort_columns):
+    """Template context for the search form, sort options and page navigation"""
+
+    def page_url(number):
+        params = request.GET.copy()
+        params["page"] = number
+        return f"?{params.urlencode()}"
+
+    query = page.query
+    return {
+        "search": query.search,
+        "sort": f"{'-' if query.descending else ''}{query.sort or ''}",
+        "sort_columns": sort_columns,
+        "page_size": query.page_size or "all",
+        "page_number": query.page,
+        "num_pages": page.num_pages,
+        "total": page.total,
+        "previous_url": (
+            page_url(min(query.page - 1, page.num_pages)) if query.page > 1 else None
+        ),
+        "next_url": page_url(query.page + 1) if query.page < page.num_pages else None,
+    }
 
+
+def table_page_parts(request, context, table_chunks):
+    """
+    table.html with the table chunks in place: the template is rendered
+    around a placeholder and the chunks are sent between its two halves.
+    """
+    with Timer("template"):
+        page = render_to_string(
+            "table.html", {**context, "table": TABLE_PLACEHOLDER}, request
+        )
+    head, tail = page.split(TABLE_PLACEHOLDER, 1)
+    return chain([head], table_chunks, [tail])
+
+
+def table_page(request, view_name, query, build):
+    """
+    Listing response; build(query) returns the template context and table
+    chunks. A whole listing (page_size=all) is streamed, a single page is
+    rendered once per dataset version and then served from the page cache.
+    """
+    if query.page_size is None:
+        return StreamingHttpResponse(table_page_parts(request, *build(query)))
+
+    html = cached_fragment(
+        view_name,
+        request.GET.urlencode(),
+        lambda: "".join(table_page_parts(request, *build(query))),
+    )
+    return HttpResponse(html)
+
+
+@conditional_per_dataset()
 def index(request):
     stats = legislative_service.get_stats()
 
     context = {
         **stats,
     }
-    return render(request, "index.html", context)
+    with Timer("template"):
+        return render(request, "index.html", context)
 
 
+@conditional_per_dataset()
 def bills_view(request):
-    bills_data = legislative_service.get_complete_bills_data()
-    bills_table = legislative_service.render_table(
-        bills_data,
-        [
-            {
-                "column_name": "sponsor",
-                "url_pattern": "legislators",
-                "name": "sponsor",
-                "item_id": "sponsor_id",
-                "css_class": "legislator-link",
-                "should_link": lambda row: row["sponsor"] != "Unknown Sponsor",
-            },
-            {
-                "column_name": "title",
-                "url_pattern": "bills",
-                "name": "title",
-                "item_id": "id",
-                "css_class": "bill-link",
-            },
-        ],
-    )
-
-    context = {"table": bills_table, "views": "bills",
-               "download_url": "download_bills"}
-
-    return render(request, "table.html", context)
-
-
+    query = table_query(request, BILLS_SORT_COLUMNS)
+
+    def build(query):
+        page = legislative_service.query_bills(query)
+        bills_table = legislative_service.stream_table(
+            page.rows,
+            [
+                {
+                    "column_name": "sponsor",
+                    "url_pattern": "legislators",
+                    "name": "sponsor",
+                    "item_id": "sponsor_id",
+                    "css_class": "legislator-link",
+                    "link_when": lambda rows: rows["sponsor"] != "Unknown Sponsor",
+                },
+                {
+                    "column_name": "title",
+                    "url_pattern": "bills",
+                    "name": "title",
+                    "item_id": "id",
+                    "css_class": "bill-link",
+                },
+            ],
+        )
+        context = {"views": "bills",
+                   "download_url": "download_bills",
+                   **pagination_context(request, page, BILLS_SORT_COLUMNS)}
+        return context, bills_table
+
+    return table_page(request, "bills", query, build)
+
+
+@conditional_per_dataset()
 def legislators_view(request):
-    legislators_data = legislative_service.get_complete_legislators_data()
-    legislators_table = legislative_service.render_table(
-        legislators_data,
-        [
-            {
-                "column_name": "legislator",
-                "url_pattern": "legislators",
-                "name": "legislator",
-                "item_id": "id",
-                "css_class": "legislator-link",
-            }
-        ],
-    )
-
-    context = {"table": legislators_table, "views": "legislators",
-               "download_url": "download_legislators"}
-
-    return render(request, "table.html", context)
-
-
+    query = table_query(request, LEGISLATORS_SORT_COLUMNS)
+
+    def build(query):
+        page = legislative_service.query_legislators(query)
+        legislators_table = legislative_service.stream_table(
+            page.rows,
+            [
+                {
+                    "column_name": "legislator",
+                    "url_pattern": "legislators",
+                    "name": "legislator",
+                    "item_id": "id",
+                    "css_class": "legislator-link",
+                }
+            ],
+        )
+        context = {"views": "legislators",
+                   "download_url": "download_legislators",
+                   **pagination_context(request, page, LEGISLATORS_SORT_COLUMNS)}
+        return context, legislators_table
+
+    return table_page(request, "legislators", query, build)
+
+
+@conditional_per_dataset()
+@cache_per_dataset
 def bill_detail_view(request, bill_id):
-    bill = legislative_service.get_bill_by_id(int(bill_id))
+    # roll_call picks the roll call whose voting breakdown is shown
+    vote_id = positive_int(request.GET.get("roll_call"), None)
+    bill = legislative_service.get_bill_by_id(int(bill_id), vote_id)
 
     if not bill:
         raise Http404("Bill not found")
 
-    sponsor_link = (
-        f'<a href="/legislators/{bill["sponsor_id"]}/" class="legislator-link">{bill["sponsor_name"]}</a>'
-        if bill["sponsor_name"] != "Unknown Sponsor"
-        else bill["sponsor_name"]
-    )
-
-    context = {"bill": bill, "sponsor_link": sponsor_link, "view": "bills"}
+    context = {"bill": bill, "view": "bills"}
 
-    return render(request, "bill_detail.html", context)
+    with Timer("template"):
+        return render(request, "bill_detail.html", context)
 
 
+@conditional_per_dataset()
+@cache_per_dataset
 def legislator_detail_view(request, legislator_id):
     legislator = legislative_service.get_legislator_by_id(int(legislator_id))
 
@@ -89,33 +212,85 @@ def legislator_detail_view(request, legislator_id):
 
     context = {"legislator": legislator, "view": "legislators"}
 
-    return render(request, "legislator_detail.html", context)
+    with Timer("template"):
+        return render(request, "legislator_detail.html", context)
 
 
-def download_legislators_csv(request):
-    df = legislative_service.get_legislators_data_for_export()
+def export_download(request, frames, basename):
+    """
+    Streamed export attachment in the format picked by the format parameter
+    or the Accept header (CSV by default), gzip-encoded when the format is
+    text and the client accepts it.
+    """
+    export_format = negotiate_format(
+        request.GET.get("format", ""), request.headers.get("Accept", "")
+    )
+    if export_format is None:
+        return HttpResponse(
+            f"Unknown format, use one of: {', '.join(EXPORT_FORMATS)}",
+            status=400,
+            content_type="text/plain",
+        )
+    if not export_format.available:
+        return HttpResponse(
+            f"{export_format.name} export is not available on this server",
+            status=406,
+            content_type="text/plain",
+        )
 
     today = datetime.now().strftime('%Y-%m-%d')
-    filename = f"legislators_data_{today}.csv"
-
-    response = HttpResponse(content_type='text/csv')
+    filename = f"{basename}_{today}.{export_format.extension}"
+
+    # Measured while the response streams: export_rows is the time spent
+    # producing the rows, export the whole of it with serialization
+    frames = timed_iter("export_rows", frames, count_rows=True)
+    chunks = timed_iter("export", export_format.serialize(frames))
+    response = StreamingHttpResponse(content_type=export_format.content_type)
+    if export_format.compressible and "gzip" in request.headers.get(
+        "Accept-Encoding", ""
+    ):
+        chunks = compress_sequence(chunks)
+        response['Content-Encoding'] = 'gzip'
+    patch_vary_headers(response, ("Accept", "Accept-Encoding"))
     response['Content-Disposition'] = f'attachment; filename="{filename}"'
-    # response['Content-Disposition'] = 'attachment; filename="legislators_data.csv"'
-
-    df.to_csv(response, index=False)
+    response.streaming_content = chunks
 
     return response
 
 
+@conditional_per_dataset(vary=("Accept", "Accept-Encoding"))
+def download_legislators_csv(request):
+    return export_download(
+        request, legislative_service.iter_legislators_export(), "legislators_data"
+    )
+
+
+@conditional_per_dataset(vary=("Accept", "Accept-Encoding"))
 def download_bills_csv(request):
-    df = legislative_service.get_bills_data_for_export()
+    return export_download(
+        request, legislative_service.iter_bills_export(), "bills_data"
+    )
 
-    today = datetime.now().strftime('%Y-%m-%d')
-    filename = f"bills_data_{today}.csv"
 
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-    # response['Content-Disposition'] = 'attachment; filename="bills_data.csv"'
-    df.to_csv(response, index=False)
+@conditional_per_dataset(vary=("Accept", "Accept-Encoding"))
+def download_votes(request):
+    """
+    Every recorded vote, as one row per vote result (layout=sparse, the
+    default) or as a legislator x roll call matrix (layout=dense)
+    """
+    if request.GET.get("layout") == "dense":
+        return export_download(
+            request, legislative_service.iter_vote_matrix_export(), "vote_matrix"
+        )
+    return export_download(
+        request, legislative_service.iter_vote_positions_export(), "votes_data"
+    )
 
-    return response
+
+def metrics(request):
+    """Timers and counters of this worker process, in the Prometheus text format"""
+    if not getattr(settings, "LEGISLATIVE_METRICS", False):
+        raise Http404("Metrics are disabled")
+    return HttpResponse(
+        REGISTRY.render(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
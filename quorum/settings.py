@@ -43,6 +43,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'legislative.instrumentation.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -113,8 +114,68 @@ USE_I18N = True
 
 USE_TZ = True
 
+# 'csv' serves data/*.csv from memory; 'database' serves the legislative models
+# (load them with `manage.py ingest --backend database`)
 LEGISLATIVE_DATA_SERVICE = 'csv'
 
+# Folder holding legislators.csv, bills.csv, votes.csv and vote_results.csv
+# (and the binary snapshot) served by the 'csv' service
+LEGISLATIVE_DATA_FOLDER = BASE_DIR / 'data'
+
+# Seconds between checks of the data files for changes; a changed dataset is
+# reloaded in the background and swapped in. None disables hot reloading.
+LEGISLATIVE_DATA_RELOAD_INTERVAL = 5
+
+# Memory-map the binary snapshot (manage.py build_snapshot) instead of reading
+# it into each worker, so all workers on a node share the same pages.
+LEGISLATIVE_DATA_MMAP = False
+
+# Precompute every bill and legislator detail payload in a background thread
+# whenever a dataset is loaded, so detail lookups become dict hits. Payloads
+# are computed most-voted first and stop at the byte budget; the rest are
+# computed on request as usual.
+LEGISLATIVE_DETAIL_PRECOMPUTE = False
+LEGISLATIVE_DETAIL_PRECOMPUTE_MAX_BYTES = 256 * 1024 * 1024
+
+# Cache alias holding rendered detail pages and listing tables, keyed on the
+# dataset version so a reloaded dataset never serves stale pages. None disables
+# the cache.
+LEGISLATIVE_PAGE_CACHE = 'legislative_pages'
+
+# Server-Timing response header with the time spent per operation (service
+# calls, table rendering, templates) and the page, snapshot and detail cache
+# results of each request. With LEGISLATIVE_METRICS, the same timers, per
+# worker process, are served in the Prometheus text format at /metrics/ (a 404
+# otherwise). Both expose internals to any client, so they are off unless
+# enabled here.
+LEGISLATIVE_SERVER_TIMING = False
+LEGISLATIVE_METRICS = False
+
+# cProfile a random share of requests (0 disables) and, with
+# LEGISLATIVE_PROFILE_ON_REQUEST, any request sent with an X-Profile header.
+# Profiles are written as pstats files to LEGISLATIVE_PROFILE_DIR, keeping the
+# newest LEGISLATIVE_PROFILE_MAX_FILES; None disables profiling.
+LEGISLATIVE_PROFILE_DIR = BASE_DIR / 'profiles'
+LEGISLATIVE_PROFILE_SAMPLE_RATE = 0.0
+LEGISLATIVE_PROFILE_ON_REQUEST = False
+LEGISLATIVE_PROFILE_MAX_FILES = 100
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Per-process LRU bounded by entry count. To share pages between workers
+    # and restarts, use 'django.core.cache.backends.filebased.FileBasedCache'
+    # with a directory as LOCATION instead.
+    'legislative_pages': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'legislative-pages',
+        # Entries of an old dataset version are never read again and age out
+        'TIMEOUT': None,
+        'OPTIONS': {'MAX_ENTRIES': 2000, 'CULL_FREQUENCY': 4},
+    },
+}
+
 
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/5.2/howto/static-files/